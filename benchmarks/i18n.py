@@ -0,0 +1,116 @@
+"""
+Benchmark of the i18n catalog: startup time and ``t()`` throughput.
+
+The legacy loader and ``t()`` are reproduced here for the comparison.
+
+    python benchmarks/i18n.py
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+sys.path.append(os.getcwd())
+
+if True:
+    import orjson
+    from bot.languages import i18n
+
+LOCALIZATION = 'bot/languages/localization.json'
+NUMBER = 200_000
+
+
+class DictMissing(dict):
+    def __missing__(self, key: str) -> str:
+        return '{'+key+'}'
+
+
+def legacy_load(filename: str) -> dict:
+    "Flat and nested dicts of every locale, as the loader kept them before the catalog"
+    memoization, resources = {}, {}
+
+    def parser(data: dict, locale: str, prefix: str = '') -> None:
+        for key, value in data.items():
+            if isinstance(value, dict):
+                parser(value, locale, f"{prefix}{key}.")
+                continue
+            memoization.setdefault(locale, {})[prefix+key] = value
+            node = resources.setdefault(locale, {})
+            *parents, leaf = (prefix+key).split('.')
+            for name in parents:
+                if not isinstance(node.get(name), dict):
+                    node[name] = {}
+                node = node[name]
+            node[leaf] = value
+
+    with open(filename, 'rb') as file:
+        for locale, data in orjson.loads(file.read()).items():
+            parser(data, locale)
+    return memoization
+
+
+def legacy_t(memoization: dict, locale: str, path: str, **kwargs) -> str:
+    if locale not in memoization or path not in memoization[locale]:
+        locale = 'en'
+    data = memoization[locale][path]
+    if not data:
+        return ''
+    kwargs['Emoji'] = None
+    return data.format_map(DictMissing(kwargs))
+
+
+def import_time(module: str) -> float:
+    code = f'import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)'
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=os.getcwd())
+    return float(output)
+
+
+def best(func, number: int = 1, repeat: int = 5) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main() -> None:
+    print(f'import googletrans:        {import_time("googletrans") * 1e3:8.1f} ms (now only on translate)')
+    print(f'import bot.languages.i18n: {import_time("bot.languages.i18n") * 1e3:8.1f} ms')
+
+    with tempfile.TemporaryDirectory() as folder:
+        filename = shutil.copy(LOCALIZATION, folder)
+        catalog = os.path.splitext(filename)[0] + i18n.CATALOG_SUFFIX
+
+        def cold_load():
+            if os.path.exists(catalog):
+                os.remove(catalog)
+            i18n.memoization_dict.clear()
+            i18n.from_file(filename)
+
+        def warm_load():
+            i18n.memoization_dict.clear()
+            i18n.from_file(filename)
+
+        print(f'legacy load:     {best(lambda: legacy_load(LOCALIZATION)) * 1e3:8.1f} ms')
+        print(f'catalog compile: {best(cold_load) * 1e3:8.1f} ms (no catalog file)')
+        print(f'catalog load:    {best(warm_load) * 1e3:8.1f} ms')
+        print(f'first locale:    {best(lambda: (warm_load(), i18n.memoization_dict["en"])) * 1e3:8.1f} ms')
+
+    i18n.config['locale'] = 'en'
+    memoization = legacy_load(LOCALIZATION)
+    static = next(key for key, value in memoization['en'].items() if '{' not in value)
+    template = next(key for key, value in memoization['en'].items() if value.count('{') == 1)
+    print(f'static key {static!r}, template key {template!r}')
+
+    fields = {root: 'value' for root in i18n.memoization_dict['ru'][template][1]}
+    cases = (
+        ('static', static, {}),
+        ('template', template, fields),
+        ('missing field', template, {}),
+    )
+    for name, key, kwargs in cases:
+        old = best(lambda: legacy_t(memoization, 'ru', key, **kwargs), NUMBER)
+        new = best(lambda: i18n.t('ru', key, **kwargs), NUMBER)
+        print(f't() {name:>13}: legacy {old * 1e9:6.0f} ns, catalog {new * 1e9:6.0f} ns, {old / new:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
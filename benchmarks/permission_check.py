@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of the command permission check.
+
+Compares the check over the raw ``command_permissions`` column
+with the compiled CommandPlan, no database or Discord connection is needed.
+
+    python benchmarks/permission_check.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.append(os.getcwd())
+
+if True:
+    from bot.databases.handlers.commandHD import CommandPlan
+
+NUMBER = 200_000
+
+permissions = {
+    'operate': 1,
+    'distribution': {
+        'allow-role': list(range(1000, 1040)),
+        'deny-role': list(range(2000, 2020)),
+        'allow-channel': {'channels': list(range(3000, 3030)),
+                          'categories': list(range(4000, 4010))},
+        'deny-channel': {'channels': list(range(5000, 5010)), 'categories': []},
+    }
+}
+author_roles = list(range(900, 1001))
+channel_id, category_id = 3025, 4005
+
+
+def raw_check() -> bool:
+    "The check as it was done on every invocation before the plans"
+    if permissions.get('operate', 1) == 0:
+        return False
+    for kind, data in permissions.get('distribution', {}).items():
+        if kind == 'allow-role':
+            if data and not set(data) & set(author_roles):
+                return False
+        elif kind == 'deny-role':
+            if data and set(data) & set(author_roles):
+                return False
+        elif kind == 'allow-channel':
+            if not (channel_id in data.get('channels', [])
+                    or category_id in data.get('categories', [])):
+                return False
+        elif kind == 'deny-channel':
+            if (channel_id in data.get('channels', [])
+                    or category_id in data.get('categories', [])):
+                return False
+    return True
+
+
+plan = CommandPlan.compile(permissions)
+
+
+def plan_check() -> bool:
+    return plan.operate and plan.failed_rule(author_roles, channel_id, category_id) is None
+
+
+def main() -> None:
+    assert raw_check() and plan_check()
+    results = {}
+    for name, func in (('raw', raw_check), ('plan', plan_check)):
+        results[name] = min(timeit.repeat(func, number=NUMBER, repeat=5)) / NUMBER
+        print(f'{name:>5}: {results[name] * 1e6:.3f} us per check')
+    compile_time = timeit.timeit(lambda: CommandPlan.compile(permissions), number=10_000) / 10_000
+    print(f'compile: {compile_time * 1e6:.3f} us per command, once per guild load')
+    print(f'speedup: {results["raw"] / results["plan"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,8 @@ import orjson
 from typing import Callable, Dict, List, Optional, Tuple, TypedDict, Union, Literal
 
 
+from tortoise.transactions import in_transaction
+
 from bot.databases import EconomyMemberDB, GuildDateBases
 from bot.languages import i18n
 from bot.misc.plugins import logstool
@@ -324,12 +326,11 @@ class Economy(commands.Cog):
         economic_settings: dict = await gdb.get('economic_settings')
         currency_emoji = economic_settings.get('emoji')
         from_account = EconomyMemberDB(ctx.guild.id, ctx.author.id)
-        to_account = EconomyMemberDB(ctx.guild.id, member.id)
 
         if amount <= 0:
             await ctx.send(i18n.t(locale, 'economy.pay.error.negative'))
             return
-        elif amount > await from_account.get('balance', 0):
+        elif not await from_account.transfer(amount, member.id):
             await ctx.send(i18n.t(locale, 'economy.pay.error.unenough', prefix=prefix))
             return
 
@@ -341,9 +342,6 @@ class Economy(commands.Cog):
         )
         embed.set_thumbnail(ctx.author.display_avatar)
 
-        await from_account.decline("balance", amount)
-        await to_account.increment("balance", amount)
-
         await logstool.Logs(ctx.guild).add_currency(member, amount, reason=f'received from a {ctx.author.name} member')
         await logstool.Logs(ctx.guild).remove_currency(ctx.author, amount, reason=f'passed to the {member.name} participant')
         await ctx.send(embed=embed)
@@ -365,13 +363,10 @@ class Economy(commands.Cog):
         if amount <= 0:
             await ctx.send(i18n.t(locale, 'economy.deposit.error.negative'))
             return
-        if amount > balance:
+        if amount > balance or not await account.transfer(amount, key='balance', to_key='bank'):
             await ctx.send(i18n.t(locale, 'economy.deposit.error.unenough', prefix=prefix))
             return
 
-        await account.decline('balance', amount)
-        await account.increment('bank', amount)
-
         embed = nextcord.Embed(
             title=i18n.t(locale, 'economy.deposit.success.title'),
             color=color,
@@ -398,13 +393,10 @@ class Economy(commands.Cog):
         if amount <= 0:
             await ctx.send(i18n.t(locale, 'economy.withdraw.error.negative'))
             return
-        if amount > bank:
+        if amount > bank or not await account.transfer(amount, key='bank', to_key='balance'):
             await ctx.send(i18n.t(locale, 'economy.withdraw.error.unenough', prefix=prefix))
             return
 
-        await account.increment('balance', amount)
-        await account.decline('bank', amount)
-
         embed = nextcord.Embed(
             title=i18n.t(locale, 'economy.withdraw.success.title'),
             color=color,
@@ -432,11 +424,11 @@ class Economy(commands.Cog):
         if isinstance(member, nextcord.Role):
             member_ids = [m.id for m in member.members]
             if flags.get('bank'):
-                await EconomyMemberDB.increment_for_ids(ctx.guild.id, member_ids, 'bank', amount)
+                count = await EconomyMemberDB.increment_for_ids(ctx.guild.id, member_ids, 'bank', amount)
             else:
-                await EconomyMemberDB.increment_for_ids(ctx.guild.id, member_ids, 'balance', amount)
+                count = await EconomyMemberDB.increment_for_ids(ctx.guild.id, member_ids, 'balance', amount)
             await ctx.send(i18n.t(locale, 'economy.gift.success.role', amount=amount, emoji=currency_emoji, role=member.name))
-            await logstool.Logs(ctx.guild).add_currency_for_ids(member, amount, moderator=ctx.author)
+            await logstool.Logs(ctx.guild).add_currency_for_ids(member, amount, moderator=ctx.author, count=count)
         else:
             account = EconomyMemberDB(ctx.guild.id, member.id)
             if flags.get('bank'):
@@ -467,20 +459,16 @@ class Economy(commands.Cog):
         if flags.get('bank'):
             if amount == 'all':
                 amount = bank
-            if amount > bank:
+            if amount > bank or not await account.decline('bank', amount, check=True):
                 await ctx.send(i18n.t(locale, 'economy.take.error.bank.unenough'))
                 return
-
-            await account.decline('bank', amount)
         else:
             if amount == 'all':
                 amount = balance
-            if amount > balance:
+            if amount > balance or not await account.decline('balance', amount, check=True):
                 await ctx.send(i18n.t(locale, 'economy.take.error.balance.unenough'))
                 return
 
-            await account.decline('balance', amount)
-
         await ctx.send(i18n.t(locale, 'economy.take.success', amount=amount, emoji=currency_emoji, member=member.name))
         await logstool.Logs(ctx.guild).remove_currency(member, amount, moderator=ctx.author)
 
@@ -550,10 +538,22 @@ class Economy(commands.Cog):
                     color=color
                 )
 
-                await thief_account.increment('balance', calculated_debt)
-                await victim_account.decline('balance', debt)
+                async with in_transaction() as conn:
+                    await thief_account.increment('balance', calculated_debt, using_db=conn)
+                    await victim_account.decline('balance', debt, using_db=conn)
+                await thief_account.refresh_rank()
+                await victim_account.refresh_rank()
                 await logstool.Logs(ctx.guild).add_currency(ctx.author, calculated_debt, reason='a successful attempt at theft')
                 await logstool.Logs(ctx.guild).remove_currency(member, debt, reason='a successful attempt at theft')
+            elif not await victim_account.transfer(debt, ctx.author.id):
+                # The victim spent the money meanwhile
+                embed = nextcord.Embed(
+                    title=i18n.t(locale, 'economy.rob.title'),
+                    description=i18n.t(locale, 'economy.rob.error.missed',
+                                       author=ctx.author.name,
+                                       member=member.name),
+                    color=color
+                )
             else:
                 embed = nextcord.Embed(
                     title=i18n.t(locale, 'economy.rob.title'),
@@ -565,8 +565,6 @@ class Economy(commands.Cog):
                     color=color
                 )
 
-                await thief_account.increment('balance', debt)
-                await victim_account.decline('balance', debt)
                 await logstool.Logs(ctx.guild).add_currency(ctx.author, debt, reason='a successful attempt at theft')
                 await logstool.Logs(ctx.guild).remove_currency(member, debt, reason='a successful attempt at theft')
         else:
@@ -583,7 +581,7 @@ class Economy(commands.Cog):
             )
 
             await thief_account.set('conclusion', conclusion)
-            await victim_account.decline('balance', debt)
+            await thief_account.decline('balance', debt)
             await logstool.Logs(ctx.guild).remove_currency(ctx.author, debt, reason='a failed theft attempt')
         embed.set_thumbnail(ctx.author.display_avatar)
         await ctx.send(embed=embed)
@@ -29,7 +29,7 @@ class PermissionChecker:
         ctx = self.ctx
         command_name = ctx.command.qualified_name
         cdb = CommandDB(ctx.guild.id)
-        self.command_permissions = await cdb.get(command_name, {})
+        self.plan = await cdb.get_plan(command_name)
 
         enabled = await self.is_enabled()
         allowed = await self.is_allowed()
@@ -39,75 +39,26 @@ class PermissionChecker:
 
     async def is_enabled(self):
         "Checks whether it is enabled"
-        command_permissions = self.command_permissions
-        operate = command_permissions.get("operate", 1)
-
-        if operate == 0:
+        if not self.plan.operate:
             raise errors.DisabledCommand()
         return True
 
     async def is_allowed(self):
-        "Checks if there are permissions to use the command"
-        command_permissions = self.command_permissions
-        distribution: dict = command_permissions.get("distribution", {})
-
-        for type, data in distribution.items():
-            meaning = self.allowed_types[type]
-            value = await meaning(self, data)
-            if not value:
-                return False
-        return True
-
-    async def _is_allowed_role(self, data: dict) -> bool:
-        "The `is_allowed` subsection is needed to verify roles"
-        ctx = self.ctx
-        author = ctx.author
-        aut_roles_ids = author._roles
-
-        if not data:
-            return True
-
-        common = set(data) & set(aut_roles_ids)
-        if not common:
-            raise MissingRole()
-        return True
-
-    async def _is_allowed_channel(self, data: dict) -> bool:
-        "The `is_allowed` subsection is needed to verify channels"
-        ctx = self.ctx
-        channel = ctx.channel
-        channels_ids = data.get("channels", [])
-        categories_ids = data.get("categories", [])
-
-        if not (channel.id in channels_ids or
-                channel.category_id in categories_ids):
-            raise MissingChannel()
-        return True
-
-    async def _is_denyed_role(self, data: dict) -> bool:
-        "The `is_allowed` subsection is needed to verify roles"
-        ctx = self.ctx
-        author = ctx.author
-        aut_roles_ids = author._roles
-
-        if not data:
-            return True
-
-        common = set(data) & set(aut_roles_ids)
-        if common:
-            raise MissingRole()
-        return True
-
-    async def _is_denyed_channel(self, data: dict) -> bool:
-        "The `is_allowed` subsection is needed to verify channels"
+        """
+        Checks if there are permissions to use the command,
+        the cooldown is only spent once the roles and channels are allowed
+        """
         ctx = self.ctx
-        channel = ctx.channel
-        channels_ids = data.get("channels", [])
-        categories_ids = data.get("categories", [])
+        failed = self.plan.failed_rule(
+            ctx.author._roles,
+            ctx.channel.id,
+            getattr(ctx.channel, 'category_id', None)
+        )
+        if failed is not None:
+            raise self.failed_types[failed]()
 
-        if (channel.id in channels_ids or
-                channel.category_id in categories_ids):
-            raise MissingChannel()
+        if self.plan.cooldown is not None:
+            return await self._is_cooldown(self.plan.cooldown)
         return True
 
     async def _is_cooldown(self, data: dict) -> bool:
@@ -119,7 +70,7 @@ class PermissionChecker:
             ctx.message
         )
         ctx.cooldown = cooldown
-        retry = cooldown.get()
+        retry = await cooldown.get()
 
         if retry is None:
             return True
@@ -128,12 +79,11 @@ class PermissionChecker:
         else:
             raise TypeError(retry)
 
-    allowed_types = {
-        'allow-role': _is_allowed_role,
-        'allow-channel': _is_allowed_channel,
-        'deny-channel': _is_denyed_channel,
-        'deny-role': _is_denyed_role,
-        'cooldown': _is_cooldown
+    failed_types = {
+        'allow-role': MissingRole,
+        'deny-role': MissingRole,
+        'allow-channel': MissingChannel,
+        'deny-channel': MissingChannel,
     }
 
 
@@ -224,7 +174,7 @@ class CommandEvent(commands.Cog):
 
     async def after_invoke(self, ctx: commands.Context) -> None:
         if cooldown := getattr(ctx, 'cooldown', None):
-            cooldown.add()
+            await cooldown.add()
 
 
 def setup(bot):
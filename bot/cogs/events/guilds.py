@@ -12,23 +12,33 @@ _log = logging.getLogger(__name__)
 class GuildsEvent(commands.Cog):
     def __init__(self, bot: LordBot) -> None:
         self.bot = bot
+        bot.lord_handler_timer.register('guild-deleted', self.process_guild_delete)
         super().__init__()
 
+    async def process_guild_delete(self, payload: dict) -> None:
+        if self.bot.get_guild(payload['guild_id']) is not None:
+            return
+        await GuildDateBases(payload['guild_id']).delete()
+
     @commands.Cog.listener()
     async def on_guild_available(self, guild: nextcord.Guild):
-        self.bot.lord_handler_timer.close(f'guild-deleted:{guild.id}')
+        await self.bot.lord_handler_timer.cancel(f'guild-deleted:{guild.id}')
 
     @commands.Cog.listener()
     async def on_guild_join(self, guild: nextcord.Guild):
-        self.bot.lord_handler_timer.close(f'guild-deleted:{guild.id}')
+        await self.bot.lord_handler_timer.cancel(f'guild-deleted:{guild.id}')
 
     @commands.Cog.listener()
     async def on_guild_remove(self, guild: nextcord.Guild):
         gdb = GuildDateBases(guild.id)
         delay = 60 * 60 * 24 * 3
         await gdb.set('delete_task', int(time.time()+delay))
-        self.bot.lord_handler_timer.create(
-            delay, gdb.delete(), f'guild-deleted:{guild.id}')
+        await self.bot.lord_handler_timer.schedule(
+            'guild-deleted',
+            f'guild-deleted:{guild.id}',
+            time.time()+delay,
+            {'guild_id': guild.id}
+        )
 
 
 def setup(bot):
@@ -43,8 +43,7 @@ class MembersEvent(commands.Cog):
 
         content: str = farewell_message.get('message')
 
-        message_format = utils.lord_format(content, payload)
-        message_data = utils.generate_message(message_format)
+        message_data = utils.render_message(content, payload)
 
         await channel.send(**message_data)
 
@@ -93,8 +92,7 @@ class MembersEvent(commands.Cog):
             return
 
         payload = utils.get_payload(member=member)
-        message_format = utils.lord_format(content, payload)
-        message_data = utils.generate_message(message_format)
+        message_data = utils.render_message(content, payload)
 
         if image_config and isinstance(image_config, dict):
             wig = WelcomeImageGenerator(member, self.bot.session, image_config)
@@ -7,12 +7,14 @@ import math
 from nextcord.ext import commands
 
 from bot.databases import GuildDateBases
-from bot.databases.datastore import DataStore
+from bot.databases.activity import activity_counter
 from bot.misc.plugins import logstool
 from bot.misc.lordbot import LordBot
 from bot.misc.moderation.spam import parse_message
+from bot.misc.plugins.giveaway import Giveaway
 from bot.misc.plugins.tickettools import ModuleTicket
 from bot.misc.utils import is_emoji
+from bot.views.ideas import delete_idea
 from bot.languages import i18n
 from bot.views.translate import AutoTranslateView
 
@@ -112,35 +114,27 @@ class MessageEvent(commands.Cog):
                     reat), name=f'auto-reaction:{message.guild.id}:{message.channel.id}:{message.id}')
 
     async def process_mention(self, message: nextcord.Message) -> None:
-        gdb = GuildDateBases(message.guild.id)
-
-        color = await gdb.get('color')
-        locale = await gdb.get('language')
-        prefix = await gdb.get('prefix')
+        if message.content.strip() != self.bot.user.mention:
+            return
 
-        if message.content.strip() == self.bot.user.mention:
-            embed = nextcord.Embed(
-                title=i18n.t(locale, 'bot-info.title',
-                             name=self.bot.user.display_name),
-                description=i18n.t(
-                    locale, 'bot-info.description', prefix=prefix),
-                color=color
-            )
-            embed.add_field(name='Assembly Information', value=i18n.t(
-                locale, 'bot-info.assembly', version=self.bot.release_tag,
-                hash=self.bot.release_sha, time=self.bot.release_date))
+        gdb = GuildDateBases(message.guild.id)
+        color, locale, prefix = await gdb.get_many(['color', 'language', 'prefix'])
+
+        embed = nextcord.Embed(
+            title=i18n.t(locale, 'bot-info.title',
+                         name=self.bot.user.display_name),
+            description=i18n.t(
+                locale, 'bot-info.description', prefix=prefix),
+            color=color
+        )
+        embed.add_field(name='Assembly Information', value=i18n.t(
+            locale, 'bot-info.assembly', version=self.bot.release_tag,
+            hash=self.bot.release_sha, time=self.bot.release_date))
 
-            asyncio.create_task(message.channel.send(embed=embed))
+        asyncio.create_task(message.channel.send(embed=embed))
 
     async def give_message_score(self, message: nextcord.Message) -> None:
-        gdb = GuildDateBases(message.guild.id)
-        guild_state = await gdb.get('message_state', {})
-        guild_state[message.author.id] = guild_state.get(
-            message.author.id, 0) + 1
-        await gdb.set('message_state', guild_state)
-
-        state = DataStore('messages')
-        await state.increment(message.author.id)
+        activity_counter.add(message.guild.id, message.author.id, messages=1)
 
     async def give_score(self, message: nextcord.Message) -> None:
         if message.author.bot:
@@ -156,14 +150,7 @@ class MessageEvent(commands.Cog):
         score = random.randint(
             0, 10) * multiplier / math.sqrt(user_level)
 
-        gdb = GuildDateBases(message.guild.id)
-        guild_state = await gdb.get('score_state', {})
-        guild_state[message.author.id] = guild_state.get(
-            message.author.id, 0) + score
-        await gdb.set('score_state', guild_state)
-
-        state = DataStore('score')
-        await state.increment(message.author.id, score)
+        activity_counter.add(message.guild.id, message.author.id, score=score)
 
         BETWEEN_MESSAGES_TIME[message.author.id] = time.time() + 10
 
@@ -175,6 +162,19 @@ class MessageEvent(commands.Cog):
     async def on_message_delete(self, message: nextcord.Message):
         await logstool.pre_message_delete_log(message)
 
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: nextcord.RawMessageDeleteEvent):
+        guild = payload.guild_id and self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+
+        # Only giveaways and ideas keep data of their message, anything else ends here
+        gdb = GuildDateBases(guild.id)
+        if await gdb.get_item('giveaways', payload.message_id) is not None:
+            await Giveaway(guild, payload.message_id).delete()
+        elif payload.channel_id == await gdb.get_item('ideas', 'channel_offers_id'):
+            await delete_idea(payload.message_id)
+
     @commands.Cog.listener()
     async def on_guild_audit_log_entry_create(self, entry: nextcord.AuditLogEntry):
         if entry.action != nextcord.AuditLogAction.message_delete or entry.target is None:
@@ -5,10 +5,12 @@ from typing import Dict
 from nextcord.ext import commands
 import orjson
 
+from bot.databases.datastore import DataStore
 from bot.databases.handlers.guildHD import GuildDateBases
+from bot.databases.models import GuildModel
 from bot.databases.varstructs import GiveawayData
 from bot.languages.help import get_command
-from bot.databases import RoleDateBases, BanDateBases
+from bot.databases import RoleDateBases, BanDateBases, MigrationsDB
 from bot.misc.plugins.giveaway import Giveaway
 from bot.misc.lordbot import LordBot
 from bot.misc.utils import AsyncSterilization
@@ -18,7 +20,6 @@ from bot.views.delete_message import DeleteMessageView
 from bot.views.giveaway import GiveawayView
 from bot.views.ideas import ConfirmView, IdeaView, ReactionConfirmView
 
-import time
 import asyncio
 
 from bot.views.tempvoice.view import TempVoiceView
@@ -32,6 +33,8 @@ _log = logging.getLogger(__name__)
 class ReadyEvent(commands.Cog):
     def __init__(self, bot: LordBot) -> None:
         self.bot = bot
+        self.started = False
+        bot.lord_handler_timer.register('giveaway', self.process_giveaway)
         bot.set_event(self.on_shard_disconnect)
         bot.set_event(self.on_disconnect)
         super().__init__()
@@ -44,14 +47,18 @@ class ReadyEvent(commands.Cog):
 
     @commands.Cog.listener()
     async def on_ready(self):
+        # on_ready is dispatched again after every new session, the startup work is done once
+        if self.started:
+            _log.info(f"The bot is registered as {self.bot.user}")
+            return
+        self.started = True
+
+        await self.bot.wait_extensions()
         results = await asyncio.gather(
             self.add_views(),
             self.get_emojis(),
             self.find_not_data_commands(),
-            self.process_temp_roles(),
-            self.process_temp_bans(),
-            self.process_giveaways(),
-            self.process_guild_delete_tasks(),
+            self.process_legacy_timers(),
             self.process_auto_load_commands_data(),
             return_exceptions=True
         )
@@ -160,31 +167,59 @@ class ReadyEvent(commands.Cog):
 
         _log.debug('Loaded commands data')
 
+    async def process_giveaway(self, payload: dict) -> None:
+        guild = self.bot.get_guild(payload['guild_id'])
+        if guild is None:
+            return
+        await Giveaway(guild, payload['message_id']).complete()
+
+    async def process_legacy_timers(self):
+        """
+        Timers created before the timer_jobs table existed were kept only in memory
+        and rebuilt from their own tables on every start. They are imported once,
+        an empty timer_jobs table is the normal idle state and doesn't mean a new import.
+        """
+        await MigrationsDB.run_once('legacy_timers', self.import_legacy_timers)
+
+    async def import_legacy_timers(self):
+        # Scheduling replaces jobs with the same key, a failed import is simply repeated
+        results = await asyncio.gather(
+            self.process_temp_roles(),
+            self.process_temp_bans(),
+            self.process_giveaways(),
+            self.process_timeouts(),
+            self.process_guild_delete_tasks(),
+            return_exceptions=True
+        )
+        for res in results:
+            if isinstance(res, Exception):
+                raise res
+
     async def process_temp_bans(self):
         bsdb = BanDateBases()
         data = await bsdb.get_all()
 
         for (guild_id, member_id, ban_time) in data:
-            mbrsd = BanDateBases(guild_id, member_id)
-            self.bot.lord_handler_timer.create(
-                ban_time-time.time(), mbrsd.remove_ban(self.bot._connection), f"ban:{guild_id}:{member_id}")
+            await self.bot.lord_handler_timer.schedule(
+                'ban',
+                f"ban:{guild_id}:{member_id}",
+                ban_time,
+                {'guild_id': guild_id, 'member_id': member_id}
+            )
 
     async def process_temp_roles(self):
         rsdb = RoleDateBases()
         data = await rsdb.get_all()
 
         for (guild_id, member_id, role_id, role_time) in data:
-            if not (
-                (guild := self.bot.get_guild(guild_id))
-                and (member := guild.get_member(member_id))
-                and (role := guild.get_role(role_id))
-            ):
+            if role_time is None:
                 continue
-
-            mrsdb = RoleDateBases(guild_id, member_id)
-
-            self.bot.lord_handler_timer.create(
-                role_time-time.time(), mrsdb.remove_role(member, role), f"role:{guild_id}:{member_id}:{role_id}")
+            await self.bot.lord_handler_timer.schedule(
+                'role',
+                f"role:{guild_id}:{member_id}:{role_id}",
+                role_time,
+                {'guild_id': guild_id, 'member_id': member_id, 'role_id': role_id}
+            )
 
     async def process_giveaways(self):
         for guild in self.bot.guilds:
@@ -193,16 +228,37 @@ class ReadyEvent(commands.Cog):
             for id, data in giveaways.items():
                 if data['completed']:
                     continue
-                gw = Giveaway(guild, id)
-                gw.giveaway_data = data
-                self.bot.lord_handler_timer.create(
-                    gw.giveaway_data.get('date_end')-time.time(),
-                    gw.complete(),
-                    f'giveaway:{id}'
+                await self.bot.lord_handler_timer.schedule(
+                    'giveaway',
+                    f'giveaway:{id}',
+                    data.get('date_end'),
+                    {'guild_id': guild.id, 'message_id': id}
+                )
+
+    async def process_timeouts(self):
+        timeout_db = DataStore('timeout')
+
+        for guild_id, data in (await timeout_db.fetch()).items():
+            for user_id, timeout_data in data.items():
+                await self.bot.lord_handler_timer.schedule(
+                    'timeout',
+                    f'timeout:{guild_id}:{user_id}',
+                    timeout_data[1],
+                    {'guild_id': guild_id, 'member_id': user_id}
                 )
 
     async def process_guild_delete_tasks(self):
-        ...
+        data = await GuildModel.filter(delete_task__gt=0).values_list('id', 'delete_task')
+
+        for (guild_id, delete_task) in data:
+            if self.bot.get_guild(guild_id) is not None:
+                continue
+            await self.bot.lord_handler_timer.schedule(
+                'guild-deleted',
+                f'guild-deleted:{guild_id}',
+                delete_task,
+                {'guild_id': guild_id}
+            )
 
 
 def setup(bot):
@@ -9,6 +9,7 @@ from bot.misc.lordbot import LordBot
 class MemberTimeoutEvent(commands.Cog):
     def __init__(self, bot: LordBot) -> None:
         self.bot = bot
+        bot.lord_handler_timer.register('timeout', self.process_untimeout)
         super().__init__()
 
     @commands.Cog.listener()
@@ -33,10 +34,11 @@ class MemberTimeoutEvent(commands.Cog):
             self.bot.dispatch(
                 "timeout", entry.target, duration, entry.user, entry.reason)
 
-            self.bot.lord_handler_timer.create(
-                duration,
-                self.process_untimeout(entry.target),
-                f'timeout:{guild_id}:{user_id}'
+            await self.bot.lord_handler_timer.schedule(
+                'timeout',
+                f'timeout:{guild_id}:{user_id}',
+                mute_time,
+                {'guild_id': guild_id, 'member_id': user_id}
             )
 
             timeout_data[user_id] = (loctime, mute_time, duration)
@@ -46,8 +48,8 @@ class MemberTimeoutEvent(commands.Cog):
             try:
                 data = timeout_data[user_id]
                 duration = data[2]
-                self.bot.lord_handler_timer.close(
-                    f'timeout:{guild_id}:{entry.user.id}')
+                await self.bot.lord_handler_timer.cancel(
+                    f'timeout:{guild_id}:{user_id}')
             except (KeyError, IndexError, AttributeError):
                 duration = None
 
@@ -57,46 +59,29 @@ class MemberTimeoutEvent(commands.Cog):
             timeout_data.pop(user_id, None)
             await timeout_db.set(guild_id, timeout_data)
 
-    async def process_untimeout(self, member: nextcord.Member):
+    async def process_untimeout(self, payload: dict):
+        guild_id = payload['guild_id']
+        member_id = payload['member_id']
         timeout_db = DataStore('timeout')
-        timeout_data = await timeout_db.get(member.guild.id, {})
+        timeout_data = await timeout_db.get(guild_id, {})
 
         try:
-            data = timeout_data[member.id]
+            data = timeout_data[member_id]
             duration = data[2]
         except (KeyError, IndexError):
             duration = None
 
-        timeout_data.pop(member.id, None)
-        await timeout_db.set(member.guild.id, timeout_data)
+        timeout_data.pop(member_id, None)
+        await timeout_db.set(guild_id, timeout_data)
+
+        guild = self.bot.get_guild(guild_id)
+        member = guild and guild.get_member(member_id)
+        if member is None:
+            return
 
         setattr(member, '_timeout', None)
         self.bot.dispatch("untimeout", member, duration, None, None)
 
-    @commands.Cog.listener()
-    async def on_ready(self) -> None:
-        timeout_db = DataStore('timeout')
-
-        for guild_id, data in (await timeout_db.fetch()).items():
-            guild = self.bot.get_guild(guild_id)
-
-            if guild is None:
-                continue
-
-            for user_id, timeout_data in data.items():
-                member = guild.get_member(user_id)
-
-                if member is None:
-                    continue
-
-                data = timeout_data[user_id]
-                mute_time = data[1]
-                self.bot.lord_handler_timer.create(
-                    mute_time-time.time(),
-                    self.process_untimeout(member),
-                    f'timeout:{guild_id}:{user_id}'
-                )
-
 
 def setup(bot):
     bot.add_cog(MemberTimeoutEvent(bot))
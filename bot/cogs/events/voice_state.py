@@ -4,8 +4,8 @@ import math
 import nextcord
 from nextcord.ext import commands
 
+from bot.databases.activity import activity_counter
 from bot.databases.datastore import DataStore
-from bot.databases.handlers.guildHD import GuildDateBases
 from bot.misc.plugins import logstool
 from bot.misc.lordbot import LordBot
 from bot.misc.music import current_players
@@ -67,8 +67,6 @@ class VoiceStateEvent(commands.Cog):
         await state.set(member.id, time.time())
 
     async def disconnect_from_voice(self, member: nextcord.Member) -> None:
-        gdb = GuildDateBases(member.guild.id)
-        state = DataStore('voice_state')
         temp_state = DataStore('temp_voice_state')
         member_started_at = await temp_state.get(member.id)
         await temp_state.delete(member.id)
@@ -77,29 +75,18 @@ class VoiceStateEvent(commands.Cog):
             return
 
         voice_time = time.time()-member_started_at
-
-        guild_state = await gdb.get('voice_time_state', {})
-        guild_state[member.id] = guild_state.get(member.id, 0) + voice_time
-        await gdb.set('voice_time_state', guild_state)
-
-        await state.increment(member.id, voice_time)
+        activity_counter.add(member.guild.id, member.id,
+                             voice_time=voice_time)
 
         await self.give_score(member, voice_time)
 
     async def give_score(self, member: nextcord.Member, voice_time: float) -> None:
-        state = DataStore('score')
-        gdb = GuildDateBases(member.guild.id)
-
         multiplier = 1
         user_level = 1
         score = voice_time * 0.5 \
             * multiplier / math.sqrt(user_level)
 
-        guild_state = await gdb.get('score_state', {})
-        guild_state[member.id] = guild_state.get(member.id, 0) + score
-        await gdb.set('score_state', guild_state)
-
-        await state.increment(member.id, score)
+        activity_counter.add(member.guild.id, member.id, score=score)
 
 
 def setup(bot: LordBot):
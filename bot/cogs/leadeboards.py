@@ -1,51 +1,35 @@
-
+import math
 import nextcord
 from nextcord.ext import commands
 
-from typing import List, Optional, Self, TypeVar
+from typing import Optional, Self, TypeVar
 
 from bot.languages import i18n
 from bot.misc.lordbot import LordBot
-from bot.misc.utils import get_award,  AsyncSterilization,  parse_fission
+from bot.misc.utils import get_award,  AsyncSterilization
 
 from bot.misc.time_transformer import display_time
 from bot.views import menus
-from bot.databases import GuildDateBases, EconomyMemberDB
+from bot.databases import GuildDateBases, EconomyMemberDB, MemberStatsDB
+from bot.databases.misc import rank_index as rank_indexes
+from bot.databases.misc.rank_index import RankIndex
 
 PEDESTAL_IMAGE_URL = 'https://i.postimg.cc/CKGc5k1d/pedestal.png'
+LEADERBOARD_PAGE_SIZE = 6
 T = TypeVar("T")
 
 state_parameters = {
-    'messages': 'message_state',
-    'score': 'score_state',
-    'voicetime': 'voice_time_state',
+    'messages': 'messages',
+    'score': 'score',
+    'voicetime': 'voice_seconds',
 }
 
 
-def clear_empty_leaderboard_economy(guild: nextcord.Guild, leaderboard: list):
-    for (member_id, balance, bank, total) in leaderboard.copy():
-        member = guild._state.get_user(member_id)
-        if not member or 0 >= total:
-            try:
-                leaderboard.remove(
-                    (member_id, balance, bank, total))
-            except ValueError:
-                pass
-
-
-def clear_empty_leaderboard(guild: nextcord.Guild, leaderboard: dict):
-    get_user = guild._state.get_user
-    for member_id, value in leaderboard.copy().items():
-        member = get_user(member_id)
-        if not member or 0 >= value:
-            leaderboard.pop(member_id, None)
-
-
 @AsyncSterilization
 class PartialLeaderboardView(menus.Menus):
     embed: nextcord.Embed
 
-    async def __init__(self, member: nextcord.Member, leaderboards: list, leaderboard_indexs: List[int], model: str) -> Self:
+    async def __init__(self, member: nextcord.Member, leaderboards: list, user_index: int, model: str) -> Self:
         guild = member.guild
 
         self.gdb = GuildDateBases(guild.id)
@@ -54,12 +38,7 @@ class PartialLeaderboardView(menus.Menus):
 
         self.member = member
         self.guild = guild
-        self.leaderboard_indexs = leaderboard_indexs
-
-        try:
-            self.user_index = leaderboard_indexs.index(member.id)+1
-        except ValueError:
-            self.user_index = len(leaderboard_indexs) + 1
+        self.user_index = user_index
 
         super().__init__(leaderboards, timeout=300)
 
@@ -81,8 +60,13 @@ class PartialLeaderboardView(menus.Menus):
 
 @AsyncSterilization
 class EconomyLeaderboardView(PartialLeaderboardView.cls):
-    async def __init__(self, *args) -> None:
-        await super().__init__(*args, 'balance')
+    async def __init__(self, member: nextcord.Member, rank_index: RankIndex) -> None:
+        self.rank_index = rank_index
+        count = len(rank_index)
+        pages = max(1, math.ceil(count / LEADERBOARD_PAGE_SIZE))
+        user_index = rank_index.rank(member.id) or count + 1
+
+        await super().__init__(member, range(pages), user_index, 'balance')
 
         economic_settings: dict = await self.gdb.get('economic_settings')
         self.currency_emoji = economic_settings.get('emoji')
@@ -101,12 +85,13 @@ class EconomyLeaderboardView(PartialLeaderboardView.cls):
             icon_url=self.guild.icon
         )
 
-        leaderboard_indexs = self.leaderboard_indexs
-        get_user = self.guild._state.get_user
         currency_emoji = self.currency_emoji
-        for (member_id, balance, bank, total) in self.value[self.index]:
-            member = get_user(member_id)
-            index = leaderboard_indexs.index(member_id)+1
+        page = self.rank_index.page(self.index*LEADERBOARD_PAGE_SIZE,
+                                    LEADERBOARD_PAGE_SIZE)
+        for index, (member_id, balance, bank, total) in enumerate(page, start=self.index*LEADERBOARD_PAGE_SIZE+1):
+            member = self.guild.get_member(member_id)
+            if member is None:
+                continue
             award = get_award(index)
             embed.add_field(
                 name=f"{award}. {member.display_name}",
@@ -121,10 +106,28 @@ class EconomyLeaderboardView(PartialLeaderboardView.cls):
 
 @AsyncSterilization
 class StateLeaderboardView(PartialLeaderboardView.cls):
-    async def __init__(self, state: str, *args) -> None:
-        await super().__init__(*args, state)
-
+    async def __init__(self, state: str, member: nextcord.Member) -> None:
         self.state = state
+        self.field = state_parameters[state]
+        self.stats_db = MemberStatsDB(member.guild.id, member.id)
+
+        count = await self.stats_db.count(self.field)
+        pages = max(1, math.ceil(count / LEADERBOARD_PAGE_SIZE))
+        user_index = await self.stats_db.get_rank(self.field) or count + 1
+
+        await super().__init__(member, range(pages), user_index, state)
+        await self.load_page()
+
+    async def load_page(self) -> None:
+        self.page = await self.stats_db.get_ranked(
+            self.field,
+            LEADERBOARD_PAGE_SIZE,
+            self.index * LEADERBOARD_PAGE_SIZE
+        )
+
+    async def callback(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+        await self.load_page()
+        await super().callback(button, interaction)
 
     @property
     def embed(self) -> nextcord.Embed:
@@ -142,12 +145,11 @@ class StateLeaderboardView(PartialLeaderboardView.cls):
             icon_url=self.guild.icon
         )
 
-        get_user = self.guild._state.get_user
-        leaderboard_indexs = self.leaderboard_indexs
         results = []
-        for member_id, value in self.value[self.index]:
-            member = get_user(member_id)
-            index = leaderboard_indexs.index(member_id)+1
+        for index, (member_id, value) in enumerate(self.page, start=self.index*LEADERBOARD_PAGE_SIZE+1):
+            member = self.guild.get_member(member_id)
+            if member is None:
+                continue
             award = get_award(index)
             parsed_value = self.parse_value(value)
             results.append(i18n.t(self.locale, 'leaderboard.state.embed.field.value',
@@ -177,18 +179,9 @@ class LeaderboardTypes:
 
     async def parse_balance_lb(self):
         emdb = EconomyMemberDB(self.guild.id, self.member.id)
-        leaderboard = await emdb.get_leaderboards()
+        rank_index = await emdb.get_rank_index()
 
-        clear_empty_leaderboard_economy(self.guild, leaderboard)
-        fission_leaderboards = parse_fission(leaderboard, 6)
-        leaderboard_indexs = [self.member_id for (
-            self.member_id, *_) in leaderboard]
-
-        view = await EconomyLeaderboardView(
-            self.member,
-            fission_leaderboards,
-            leaderboard_indexs
-        )
+        view = await EconomyLeaderboardView(self.member, rank_index)
         await self.message.edit(content=None, embed=view.embed, view=view)
 
     async def parse_voicetime_lb(self):
@@ -201,22 +194,7 @@ class LeaderboardTypes:
         await self._parse_state('score')
 
     async def _parse_state(self, state: str):
-        gdb = GuildDateBases(self.guild.id)
-        state_db = await gdb.get(state_parameters[state])
-
-        state_db = dict(sorted(state_db.items(),
-                               key=lambda item: item[1],
-                               reverse=True))
-        clear_empty_leaderboard(self.guild, state_db)
-        fission_leaderboards = parse_fission(state_db.items(), 6)
-        leaderboard_indexs = list(state_db.keys())
-
-        view = await StateLeaderboardView(
-            state,
-            self.member,
-            fission_leaderboards,
-            leaderboard_indexs
-        )
+        view = await StateLeaderboardView(state, self.member)
         await self.message.edit(content=None, embed=view.embed, view=view)
 
 
@@ -252,6 +230,25 @@ class LeaderboardDropDown(nextcord.ui.StringSelect):
 class Leaderboards(commands.Cog):
     def __init__(self, bot: LordBot) -> None:
         self.bot = bot
+        rank_indexes.set_member_filter(self.is_member)
+
+    def cog_unload(self) -> None:
+        rank_indexes.set_member_filter(None)
+
+    def is_member(self, guild_id: int, member_id: int) -> bool:
+        guild = self.bot.get_guild(guild_id)
+        if guild is None or not guild.chunked:
+            return True
+        return guild.get_member(member_id) is not None
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: nextcord.Member):
+        rank_indexes.remove_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: nextcord.Member):
+        await EconomyMemberDB(member.guild.id, member.id).refresh_rank()
+        await MemberStatsDB(member.guild.id, member.id).refresh_rank()
 
     @commands.command(name="leaderboard", aliases=["lb", "leaders", "top"])
     async def leaderboard(self, ctx: commands.Context):
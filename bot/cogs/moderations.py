@@ -31,6 +31,23 @@ async def _single_delete(messages: List[nextcord.Message]):
 class Moderations(commands.Cog):
     def __init__(self, bot: LordBot):
         self.bot = bot
+        bot.lord_handler_timer.register('ban', self.process_temp_ban)
+        bot.lord_handler_timer.register('role', self.process_temp_role)
+
+    async def process_temp_ban(self, payload: dict) -> None:
+        bsdb = BanDateBases(payload['guild_id'], payload['member_id'])
+        await bsdb.remove_ban(self.bot._connection)
+
+    async def process_temp_role(self, payload: dict) -> None:
+        rsdb = RoleDateBases(payload['guild_id'], payload['member_id'])
+        guild = self.bot.get_guild(payload['guild_id'])
+        member = guild and guild.get_member(payload['member_id'])
+        role = guild and guild.get_role(payload['role_id'])
+
+        if member is None or role is None:
+            await rsdb.remove(payload['role_id'])
+            return
+        await rsdb.remove_role(member, role)
 
     @commands.command(name='give-role-all', aliases=["give-role-everyone", "give-role"], enabled=False)
     @commands.has_permissions(manage_roles=True)
@@ -173,7 +190,7 @@ class Moderations(commands.Cog):
         locale = await gdb.get('language')
         color = await gdb.get('color')
 
-        self.bot.lord_handler_timer.close(
+        await self.bot.lord_handler_timer.cancel(
             f"ban:{ctx.guild.id}:{member.id}")
 
         embed = nextcord.Embed(
@@ -195,10 +212,17 @@ class Moderations(commands.Cog):
                 inline=False
             )
         if ftime is not None:
-            self.bot.lord_handler_timer.create(
-                ftime, bsdb.remove_ban(ctx.guild._state), f"ban:{ctx.guild.id}:{member.id}")
-
-            bsdb.insert(ftime+time.time())
+            if await bsdb.get_as_member():
+                await bsdb.update(int(ftime+time.time()))
+            else:
+                await bsdb.insert(int(ftime+time.time()))
+
+            await self.bot.lord_handler_timer.schedule(
+                'ban',
+                f"ban:{ctx.guild.id}:{member.id}",
+                ftime+time.time(),
+                {'guild_id': ctx.guild.id, 'member_id': member.id}
+            )
 
         await member.ban(reason=reason)
 
@@ -244,7 +268,7 @@ class Moderations(commands.Cog):
         _role_time = await rsdb.get_as_role(role.id)
 
         if _role_time is not None:
-            self.bot.lord_handler_timer.close(
+            await self.bot.lord_handler_timer.cancel(
                 f"role:{ctx.guild.id}:{member.id}:{role.id}")
             embed = nextcord.Embed(
                 title=i18n.t(locale, 'temprole.change.title'),
@@ -276,8 +300,12 @@ class Moderations(commands.Cog):
 
         await rsdb.set_role(role.id, ftime+time.time())
 
-        self.bot.lord_handler_timer.create(
-            ftime, rsdb.remove_role(member, role), f"role:{ctx.guild.id}:{member.id}:{role.id}")
+        await self.bot.lord_handler_timer.schedule(
+            'role',
+            f"role:{ctx.guild.id}:{member.id}:{role.id}",
+            ftime+time.time(),
+            {'guild_id': ctx.guild.id, 'member_id': member.id, 'role_id': role.id}
+        )
 
         await member.add_roles(role)
 
@@ -12,6 +12,7 @@ from bot.misc.utils import translate_to_timestamp, randquan
 class Reminder(commands.Cog):
     def __init__(self, bot: LordBot):
         self.bot = bot
+        bot.lord_handler_timer.register('reminder', self.process_reminder)
 
     @commands.command()
     async def reminder(self, ctx: commands.Context, time_now: translate_to_timestamp, *, text: str) -> None:
@@ -21,14 +22,26 @@ class Reminder(commands.Cog):
         if time.time() > time_now:
             await ctx.send(i18n.t(locale, 'reminder.error.time'))
             return
-        self.bot.lord_handler_timer.create(
-            time_now-time.time(),
-            self.process_reminder(time.time(), ctx.author, ctx.channel, text),
-            f"reminder:{ctx.guild.id}:{ctx.author.id}:{time_now :.0f}:{randquan(17)}"
+        await self.bot.lord_handler_timer.schedule(
+            'reminder',
+            f"reminder:{ctx.guild.id}:{ctx.author.id}:{time_now :.0f}:{randquan(17)}",
+            time_now,
+            {
+                'created_at': time.time(),
+                'channel_id': ctx.channel.id,
+                'member_id': ctx.author.id,
+                'text': text
+            }
         )
         await ctx.send(f"🛎️ OK, I'll mention you here on <t:{time_now :.0f}:f> (<t:{time_now :.0f}:R>)")
 
-    async def process_reminder(self, time_old: float, member: nextcord.Member, channel: nextcord.TextChannel, text: str) -> None:
+    async def process_reminder(self, payload: dict) -> None:
+        channel = self.bot.get_channel(payload['channel_id'])
+        if channel is None:
+            return
+        time_old = payload['created_at']
+        text = payload['text']
+
         gdb = GuildDateBases(channel.guild.id)
         locale = await gdb.get('language')
         color = await gdb.get('color')
@@ -43,7 +56,7 @@ class Reminder(commands.Cog):
             value=text
         )
 
-        await channel.send(member.mention, embed=embed)
+        await channel.send(f"<@{payload['member_id']}>", embed=embed)
 
 
 def setup(bot):
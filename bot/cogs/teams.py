@@ -6,11 +6,13 @@ from typing import Literal, Optional
 import nextcord
 from nextcord.ext import commands
 
+from bot.databases.activity import activity_counter
 from bot.databases.datastore import cache
 from bot.databases.handlers.economyHD import EconomyMemberDB
 from bot.databases.models import EconomicModel
 from bot.misc.lordbot import LordBot
 from bot.misc.moderation import spam
+from bot.misc.plugins import logstool
 from bot.resources import errors
 from bot.resources.ether import Emoji
 
@@ -51,6 +53,8 @@ class Teams(commands.Cog):
 
     @commands.command()
     async def shutdown(self, ctx: commands.Context):
+        await activity_counter.close()
+        await logstool.flush_logs()
         await cache.close(close_connection_pool=True)
         await ctx.send("The bot has activated the completion process!")
         await self.bot.close()
@@ -118,6 +122,17 @@ class Teams(commands.Cog):
             f'Youtube: {ytnoti.running} (<t:{ytnoti.last_heartbeat:.0f}:R>)'
         )
 
+    @commands.command(aliases=['logs_info'])
+    async def get_logs_info(self, ctx: commands.Context):
+        stats = logstool.log_queue_stats()
+
+        await ctx.send(
+            f'Log channels: {stats["channels"]}\n'
+            f'Queue depth: {stats["depth"]}\n'
+            f'Sent: {stats["sent_logs"]} logs in {stats["sent_messages"]} messages\n'
+            f'Dropped: {stats["dropped"]}'
+        )
+
     @commands.command()
     async def restart_notifi(self, ctx: commands.Context, service: Literal['twnoti', 'ytnoti']):
         noti = getattr(self.bot, service)
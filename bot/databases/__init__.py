@@ -3,5 +3,9 @@ from .handlers import (
     EconomyMemberDB,
     CommandDB,
     RoleDateBases,
-    BanDateBases
+    BanDateBases,
+    MemberStatsDB,
+    GiveawayEntriesDB,
+    IdeaVotesDB,
+    MigrationsDB
 )
@@ -0,0 +1,176 @@
+from __future__ import annotations
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+
+from bot.databases.datastore import DataStore
+from bot.databases.handlers.statsHD import MemberStatsDB
+
+_log = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 30
+FLUSH_MAX_EVENTS = 1000
+
+# Counter name, MemberStatsModel field, DataStore table
+COUNTERS: Tuple[Tuple[str, str, str], ...] = (
+    ('messages', 'messages', 'messages'),
+    ('voice_time', 'voice_seconds', 'voice_state'),
+    ('score', 'score', 'score'),
+)
+
+
+class ActivityCounter:
+    """
+    Accumulates member activity deltas in memory and writes them
+    in bulk: a few statements per guild and one pipeline per
+    DataStore table on every flush.
+    """
+
+    def __init__(
+        self,
+        interval: float = FLUSH_INTERVAL,
+        max_events: int = FLUSH_MAX_EVENTS
+    ) -> None:
+        self.interval = interval
+        self.max_events = max_events
+
+        self._pending: Dict[Tuple[int, int], List[int | float]] = {}
+        self._retry: Dict[Tuple[int, int], List[int | float]] = {}
+        # Deltas of the DataStore tables that failed to flush, kept apart
+        # from _retry so the database doesn't get them twice
+        self._store_retry: Dict[Tuple[int, int], List[int | float]] = {}
+        self._events = 0
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.flushed_events = 0
+
+    def add(
+        self,
+        guild_id: int,
+        member_id: int,
+        *,
+        messages: int = 0,
+        voice_time: float = 0,
+        score: float = 0
+    ) -> None:
+        deltas = self._pending.get((guild_id, member_id))
+        if deltas is None:
+            deltas = self._pending[(guild_id, member_id)] = [0, 0, 0]
+        deltas[0] += messages
+        deltas[1] += voice_time
+        deltas[2] += score
+
+        self._events += 1
+        if self._events >= self.max_events and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = loop or asyncio.get_event_loop()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(), name='activity-counter')
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as exc:
+                _log.error('Failed to flush activity counters', exc_info=exc)
+
+    @staticmethod
+    def _merge(
+        target: Dict[Tuple[int, int], List[int | float]],
+        source: Dict[Tuple[int, int], List[int | float]]
+    ) -> None:
+        for key, deltas in source.items():
+            current = target.setdefault(key, [0, 0, 0])
+            for index, delta in enumerate(deltas):
+                current[index] += delta
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not (self._pending or self._retry or self._store_retry):
+                return
+            pending, self._pending = self._pending, {}
+            retry, self._retry = self._retry, {}
+            store_retry, self._store_retry = self._store_retry, {}
+            events, self._events = self._events, 0
+
+            self._merge(store_retry, pending)
+            await self._flush_store(store_retry)
+
+            # Guilds that failed last time are written together with the new deltas
+            self._merge(retry, pending)
+            by_guild: Dict[int, Dict[Tuple[int, int], List[int | float]]] = defaultdict(dict)
+            for key, deltas in retry.items():
+                by_guild[key[0]][key] = deltas
+
+            for guild_id, guild_pending in by_guild.items():
+                await self._flush_guild(guild_id, guild_pending)
+
+            self.flushes += 1
+            self.flushed_events += events
+            _log.debug('Flushed %d activity events for %d members',
+                       events, len(pending))
+
+    async def _flush_guild(
+        self,
+        guild_id: int,
+        pending: Dict[Tuple[int, int], List[int | float]]
+    ) -> None:
+        try:
+            await MemberStatsDB(guild_id).increment_many(
+                {member_id: tuple(values)
+                 for (_, member_id), values in pending.items()}
+            )
+        except Exception as exc:
+            _log.error('Failed to flush activity of guild %s',
+                       guild_id, exc_info=exc)
+            self._merge(self._retry, pending)
+
+    async def _flush_store(self, pending: Dict[Tuple[int, int], List[int | float]]) -> None:
+        for index, (_, _, table) in enumerate(COUNTERS):
+            totals: Dict[int, int | float] = defaultdict(int)
+            for (_, member_id), values in pending.items():
+                if values[index]:
+                    totals[member_id] += values[index]
+            if not totals:
+                continue
+
+            try:
+                await DataStore(table).multi_increment(totals.items())
+            except Exception as exc:
+                _log.error("Failed to flush activity into '%s'",
+                           table, exc_info=exc)
+                for key, values in pending.items():
+                    if values[index]:
+                        self._store_retry.setdefault(key, [0, 0, 0])[index] += values[index]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'pending_members': len(self._pending),
+            'pending_events': self._events,
+            'flushes': self.flushes,
+            'flushed_events': self.flushed_events,
+        }
+
+
+activity_counter = ActivityCounter()
@@ -1,7 +1,12 @@
+import asyncio
+import functools
 import logging
+from collections import defaultdict
 from redis.asyncio import ConnectionPool, StrictRedis
-from typing import Optional
+from redis.exceptions import ResponseError
+from typing import Any, Dict, Iterable, List, Tuple, Union
 from bot.databases.misc import adapter
+from bot.databases.misc.adapter import NumberFormating
 from bot.misc.env import REDIS_HOST, REDIS_PASSWORD, REDIS_PORT
 
 # Логгер
@@ -18,86 +23,247 @@ if REDIS_HOST is not None:
 else:
     POOL = cache = None
 
+HASH_PREFIX = 'datastore:'
+
+# In-memory fallback: table name -> {encoded key: encoded value}
+_memory: Dict[str, Dict[str, str]] = defaultdict(dict)
+_migrated_tables = set()
+# Table name -> migration in progress, shared by the concurrent callers
+_migrations: Dict[str, asyncio.Future] = {}
+
+
+def encode_key(key: Union[int, float, str]) -> str:
+    return NumberFormating.encode_number(key)
+
+
+def decode_key(key: Union[bytes, str]) -> Union[int, float, str]:
+    if isinstance(key, bytes):
+        key = key.decode()
+    return NumberFormating.decode_number(key, False)
+
+
+def encode_value(value: Any) -> str:
+    return adapter.dumps(value)
+
+
+def decode_value(value: Union[bytes, str]) -> Any:
+    return adapter.loads(value)
+
 
 class DataStore:
+    """
+    Key-value table stored per key.
+
+    With Redis every table is a hash, so reading, writing and incrementing
+    a single key never touches the other keys of the table.
+    Without Redis the same layout is kept in the process memory.
+    """
+
     def __init__(self, table_name: str):
         self.table_name = table_name
+        self.hash_name = HASH_PREFIX + table_name
 
         self.__with_redis = bool(cache)
         if not self.__with_redis:
-            self.__cache = {}
+            self.__cache = _memory[self.table_name]
 
-    async def _get_data(self) -> Optional[dict]:
-        """
-        Получаем данные из Redis для конкретной таблицы базы данных.
-        Ожидаем, что данные будут в формате JSON.
-        """
-        if self.__with_redis:
-            data = await cache.get(self.table_name)
-        else:
-            data = self.__cache.get(self.table_name)
+    async def _ensure_migrated(self) -> None:
+        if not self.__with_redis or self.table_name in _migrated_tables:
+            return
 
-        if data:
-            return adapter.loads(data)
-        return {}
+        task = _migrations.get(self.table_name)
+        if task is None:
+            task = _migrations[self.table_name] = asyncio.ensure_future(self.migrate())
+            task.add_done_callback(functools.partial(_migration_done, self.table_name))
+        # The table is marked as migrated only once the migration succeeded,
+        # a failed one is started again by the next call
+        await asyncio.shield(task)
 
-    async def _set_data(self, data: dict) -> None:
+    async def migrate(self) -> bool:
         """
-        Сохраняем данные в Redis для конкретной таблицы базы данных.
-        Преобразуем данные в формат JSON перед сохранением.
+        Moves a table stored in the old format (the whole table as one
+        JSON string under the table name) into the hash.
+
+        The table is renamed to ``<hash>:migrating`` first, a migration
+        interrupted after that is resumed from it. The copy and the removal
+        of the renamed table are one transaction, values already written
+        to the hash are newer than the old table and are kept.
         """
-        serialized_data = adapter.dumps(data)
+        if not self.__with_redis:
+            return False
+
+        temp_name = f'{self.hash_name}:migrating'
+        if not await cache.exists(temp_name):
+            if await cache.type(self.table_name) not in (b'string', 'string'):
+                return False
+
+            blob = await cache.get(self.table_name)
+            if not isinstance(adapter.loads(blob, ignore=True), dict):
+                return False
+
+            try:
+                await cache.rename(self.table_name, temp_name)
+            except ResponseError:
+                # Another process has already taken the table
+                return False
+
+        blob = await cache.get(temp_name)
+        if blob is None:
+            # Another process has finished the migration
+            return False
+        data = adapter.loads(blob, ignore=True)
+        if not isinstance(data, dict):
+            _log.warning("DataStore table '%s' can't be migrated: %s is not a table",
+                         self.table_name, temp_name)
+            return False
+
+        async with cache.pipeline(transaction=True) as pipe:
+            for key, value in data.items():
+                pipe.hsetnx(self.hash_name, encode_key(key), encode_value(value))
+            pipe.delete(temp_name)
+            await pipe.execute()
+
+        _log.info("DataStore table '%s' migrated to hash (%d keys)",
+                  self.table_name, len(data))
+        return True
+
+    async def _get_data(self) -> dict:
+        await self._ensure_migrated()
         if self.__with_redis:
-            await cache.set(self.table_name, serialized_data)
+            raw = await cache.hgetall(self.hash_name)
         else:
-            self.__cache[self.table_name] = serialized_data
+            raw = self.__cache
+
+        return {decode_key(key): decode_value(value)
+                for key, value in raw.items()}
 
     async def get(self, key, default=None):
-        data = await self._get_data()
-        if not data:
-            _log.trace(f"No cached data found for table '{self.table_name}'.")
+        await self._ensure_migrated()
+        if self.__with_redis:
+            value = await cache.hget(self.hash_name, encode_key(key))
+        else:
+            value = self.__cache.get(encode_key(key))
 
-        return data.get(key, default)
+        if value is None:
+            _log.trace(f"No cached data found for '{key}' in table '{self.table_name}'.")
+            return default
+        return decode_value(value)
 
     async def set(self, key, value) -> None:
-        current_data = await self._get_data()
-        current_data[key] = value
+        await self._ensure_migrated()
+        if self.__with_redis:
+            await cache.hset(self.hash_name, encode_key(key), encode_value(value))
+        else:
+            self.__cache[encode_key(key)] = encode_value(value)
 
-        await self._set_data(current_data)
+    async def multi_set(self, pairs: Iterable[Tuple[Any, Any]]):
+        await self._ensure_migrated()
+        mapping = {encode_key(key): encode_value(value)
+                   for key, value in pairs}
+        if not mapping:
+            return
+        if self.__with_redis:
+            await cache.hset(self.hash_name, mapping=mapping)
+        else:
+            self.__cache.update(mapping)
 
-    async def multi_set(self, pairs):
-        current_data = await self._get_data()
-        for key, value in pairs:
-            current_data[key] = value
+    async def multi_get(self, keys) -> List[Any]:
+        await self._ensure_migrated()
+        keys = list(keys)
+        if not keys:
+            return []
+
+        encoded_keys = [encode_key(key) for key in keys]
+        if self.__with_redis:
+            raw_values = await cache.hmget(self.hash_name, encoded_keys)
+        else:
+            raw_values = [self.__cache.get(key) for key in encoded_keys]
 
-        await self._set_data(current_data)
-    
-    async def multi_get(self, keys):
-        current_data = await self._get_data()
         values = []
-        for key in keys:
-            try:
-                values.append(current_data[key])
-            except KeyError as exc:
-                _log.exception("Error in datastore",
-                               exc_info=exc)
+        for key, value in zip(keys, raw_values):
+            if value is None:
+                _log.error("Error in datastore: key '%s' not found in table '%s'",
+                           key, self.table_name)
                 continue
+            values.append(decode_value(value))
         return values
 
-    async def increment(self, key, delta=1):
-        value = await self.get(key, 0)
-        await self.set(key, value+delta)
+    async def increment(self, key, delta=1) -> Union[int, float]:
+        await self._ensure_migrated()
+        field = encode_key(key)
+
+        if not self.__with_redis:
+            value = self.__cache.get(field)
+            value = (decode_value(value) if value is not None else 0) + delta
+            self.__cache[field] = encode_value(value)
+            return value
+
+        if isinstance(delta, int):
+            try:
+                return await cache.hincrby(self.hash_name, field, delta)
+            except ResponseError:
+                # The stored value is a float
+                pass
+        return await cache.hincrbyfloat(self.hash_name, field, delta)
+
+    async def multi_increment(self, pairs: Iterable[Tuple[Any, Union[int, float]]]) -> None:
+        await self._ensure_migrated()
+        pairs = [(encode_key(key), delta) for key, delta in pairs]
+        if not pairs:
+            return
+
+        if not self.__with_redis:
+            for field, delta in pairs:
+                value = self.__cache.get(field)
+                value = (decode_value(value) if value is not None else 0) + delta
+                self.__cache[field] = encode_value(value)
+            return
+
+        pipe = cache.pipeline(transaction=False)
+        for field, delta in pairs:
+            if isinstance(delta, int):
+                pipe.hincrby(self.hash_name, field, delta)
+            else:
+                pipe.hincrbyfloat(self.hash_name, field, delta)
+        results = await pipe.execute(raise_on_error=False)
+
+        # Integer increments of fields that already hold a float
+        failed = [(field, delta) for (field, delta), result in zip(pairs, results)
+                  if isinstance(result, ResponseError)]
+        if failed:
+            pipe = cache.pipeline(transaction=False)
+            for field, delta in failed:
+                pipe.hincrbyfloat(self.hash_name, field, delta)
+            await pipe.execute()
 
     async def delete(self, key) -> bool:
-        current_data = await self._get_data()
-        if key in current_data:
-            current_data.pop(key)
-            await self._set_data(current_data)
-            return True
-        return False
+        await self._ensure_migrated()
+        if self.__with_redis:
+            return bool(await cache.hdel(self.hash_name, encode_key(key)))
+        return self.__cache.pop(encode_key(key), None) is not None
 
     async def exists(self, key) -> bool:
-        current_data = await self._get_data()
-        return key in current_data
+        await self._ensure_migrated()
+        if self.__with_redis:
+            return bool(await cache.hexists(self.hash_name, encode_key(key)))
+        return encode_key(key) in self.__cache
 
     fetch = _get_data
+
+
+def _migration_done(table_name: str, task: asyncio.Future) -> None:
+    _migrations.pop(table_name, None)
+    if not task.cancelled() and task.exception() is None:
+        _migrated_tables.add(table_name)
+
+
+async def migrate_all(table_names: Iterable[str]) -> List[str]:
+    "One-shot migration of the given old-format tables"
+    if cache is None:
+        return []
+
+    migrated = []
+    for name in table_names:
+        if await DataStore(name).migrate():
+            migrated.append(name)
+    return migrated
@@ -3,3 +3,7 @@ from .economyHD import EconomyMemberDB
 from .commandHD import CommandDB
 from .rolesHD import RoleDateBases
 from .bansHD import BanDateBases
+from .statsHD import MemberStatsDB
+from .giveawayHD import GiveawayEntriesDB
+from .ideasHD import IdeaVotesDB
+from .migrationHD import MigrationsDB
@@ -1,14 +1,131 @@
 from __future__ import annotations
-from typing import Optional, TypeVar, overload
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple, TypeVar, Union, overload
 from ..models import GuildModel
+from ..misc.guild_cache import guild_cache
 
 T = TypeVar('T')
 
+PLAN_CACHE_SIZE = 10_000
+
+RuleData = Union[FrozenSet[int], Tuple[FrozenSet[int], FrozenSet[int]]]
+
+
+def _ids(values: Optional[Iterable]) -> FrozenSet[int]:
+    return frozenset(map(int, values or ()))
+
+
+class CommandPlan:
+    """
+    Compiled permissions of one command.
+    Role rules hold frozensets of role ids and channel rules hold
+    (channels, categories) frozensets, in the order they were configured.
+    """
+    __slots__ = ('operate', 'rules', 'cooldown')
+
+    def __init__(
+        self,
+        operate: bool = True,
+        rules: Tuple[Tuple[str, RuleData], ...] = (),
+        cooldown: Optional[dict] = None
+    ) -> None:
+        self.operate = operate
+        self.rules = rules
+        self.cooldown = cooldown
+
+    @classmethod
+    def compile(cls, permissions: Optional[dict]) -> CommandPlan:
+        if not permissions:
+            return EMPTY_PLAN
+
+        rules = []
+        cooldown = None
+        for kind, data in permissions.get('distribution', {}).items():
+            if kind in ('allow-role', 'deny-role'):
+                if data:
+                    rules.append((kind, _ids(data)))
+            elif kind in ('allow-channel', 'deny-channel'):
+                data = data or {}
+                rules.append((kind, (_ids(data.get('channels')),
+                                     _ids(data.get('categories')))))
+            elif kind == 'cooldown':
+                cooldown = data
+
+        return cls(permissions.get('operate', 1) != 0, tuple(rules), cooldown)
+
+    def failed_rule(
+        self,
+        role_ids: Iterable[int],
+        channel_id: int,
+        category_id: Optional[int]
+    ) -> Optional[str]:
+        "Returns the first rule the author doesn't pass"
+        for kind, data in self.rules:
+            if kind == 'allow-role':
+                if data.isdisjoint(role_ids):
+                    return kind
+            elif kind == 'deny-role':
+                if not data.isdisjoint(role_ids):
+                    return kind
+            else:
+                channels, categories = data
+                matched = channel_id in channels or category_id in categories
+                if matched is (kind == 'deny-channel'):
+                    return kind
+        return None
+
+
+EMPTY_PLAN = CommandPlan()
+
+
+class CommandPlanCache:
+    "Compiled command plans per guild, dropped by CommandDB.update"
+
+    def __init__(self, maxsize: int = PLAN_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._guilds: OrderedDict[int, Dict[str, CommandPlan]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id: int) -> Optional[Dict[str, CommandPlan]]:
+        plans = self._guilds.get(guild_id)
+        if plans is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._guilds.move_to_end(guild_id)
+        return plans
+
+    def put(self, guild_id: int, permissions: Optional[dict]) -> Dict[str, CommandPlan]:
+        plans = {command: CommandPlan.compile(data)
+                 for command, data in (permissions or {}).items()}
+        self._guilds[guild_id] = plans
+        while len(self._guilds) > self.maxsize:
+            self._guilds.popitem(last=False)
+        return plans
+
+    def invalidate(self, guild_id: int) -> None:
+        self._guilds.pop(guild_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {'guilds': len(self._guilds), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses}
+
+
+command_plans = CommandPlanCache()
+
 
 class CommandDB:
     def __init__(self, guild_id: int) -> None:
         self.guild_id = guild_id
 
+    async def _load(self) -> Optional[dict]:
+        return await (GuildModel
+                      .filter(id=self.guild_id)
+                      .first()
+                      .values_list('command_permissions', flat=True))
+
     @overload
     async def get(self, command: str) -> Optional[dict]: ...
 
@@ -16,13 +133,21 @@ class CommandDB:
     async def get(self, command: str, default: T) -> T: ...
 
     async def get(self, command: str, default: T = None) -> dict | T:
-        gm = await GuildModel.get(id=self.guild_id)
-        data = gm.command_permissions
+        data = await self._load()
         if not data:
             return default
         return data.get(command, default)
 
+    async def get_plan(self, command: str) -> CommandPlan:
+        "Compiled permissions of the command, the database is read once per guild"
+        plans = command_plans.get(self.guild_id)
+        if plans is None:
+            plans = command_plans.put(self.guild_id, await self._load())
+        return plans.get(command, EMPTY_PLAN)
+
     async def update(self, key: str, value: dict) -> None:
         gm = await GuildModel.get(id=self.guild_id)
         gm.command_permissions[key] = value
-        gm.save()
+        await gm.save(update_fields=['command_permissions'])
+        guild_cache.invalidate(self.guild_id, ['command_permissions'])
+        command_plans.invalidate(self.guild_id)
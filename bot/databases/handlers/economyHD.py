@@ -1,16 +1,34 @@
 from __future__ import annotations
 import functools
 import logging
-from typing import Any, Optional
+from typing import Any, Iterable, List, Optional, Tuple
 
+from tortoise.expressions import F
+from tortoise.functions import Count
+from tortoise.transactions import in_transaction
 
+from ..misc.rank_index import RankIndex, RankIndexCache, RankRow
 from ..models import EconomicModel
-from tortoise.functions import Sum
 
 reserved: dict[int, list[int]] = {}
 tasks = []
 _log = logging.getLogger(__name__)
 
+RANKED_FIELDS = frozenset({'balance', 'bank'})
+# Cooldown and prison timestamps, duplicated accounts keep the latest ones
+TIMESTAMP_FIELDS = ('daily', 'weekly', 'monthly', 'rob', 'conclusion', 'work')
+UNIQUE_INDEX_NAME = 'uid_economic_guild_member'
+BULK_CHUNK_SIZE = 500
+
+
+async def load_economy_ranks(guild_id: int) -> List[Tuple[int, int, int]]:
+    return await (EconomicModel
+                  .filter(guild_id=guild_id)
+                  .values_list('member_id', 'balance', 'bank'))
+
+
+economy_ranks = RankIndexCache(load_economy_ranks)
+
 
 def check_registration(func):
     @functools.wraps(func)
@@ -28,20 +46,62 @@ class EconomyMemberDB:
         self.member_id = member_id
 
     async def register(self) -> None:
-        self.economic, ok = await EconomicModel.get_or_create(
-            guild_id=self.guild_id,
-            member_id=self.member_id
-        )
+        """
+        Existing accounts take a single SELECT. A missing one is inserted and read back:
+        the conflicting INSERT doesn't return a row on sqlite, and an upsert that
+        always returns it would turn every read into a write.
+        """
+        economic = await EconomicModel.get_or_none(guild_id=self.guild_id,
+                                                   member_id=self.member_id)
+        if economic is None:
+            await self.ensure()
+            economic = await EconomicModel.get(guild_id=self.guild_id,
+                                               member_id=self.member_id)
+        self.economic = economic
 
-    async def get_leaderboards(self):
-        economics = (
-            await EconomicModel
-            .filter(guild_id=self.guild_id)
-            .annotate(total=Sum('bank', 'balance'))
-            .order_by('total')
+    async def ensure(self, member_id: Optional[int] = None, using_db=None) -> None:
+        "Creates the account unless it exists, a single INSERT that ignores the conflict"
+        await EconomicModel.bulk_create(
+            [EconomicModel(guild_id=self.guild_id,
+                           member_id=member_id or self.member_id)],
+            ignore_conflicts=True,
+            using_db=using_db
         )
 
-        return [(eco.member_id, eco.balance, eco.bank, eco.balance+eco.bank) for eco in economics]
+    def _sync_rank(self, fields: Iterable[str] = RANKED_FIELDS) -> None:
+        if RANKED_FIELDS.intersection(fields):
+            economy_ranks.update(self.guild_id, self.member_id,
+                                 self.economic.balance, self.economic.bank)
+
+    async def _refresh_rank(self, member_ids: Iterable[int]) -> None:
+        """
+        Rows changed by SQL expressions are only read back for guilds with a loaded rank index.
+        Called after the commit, so the index never holds rolled back values.
+        """
+        if not economy_ranks.is_loaded(self.guild_id):
+            return
+        rows = await (EconomicModel
+                      .filter(guild_id=self.guild_id, member_id__in=list(member_ids))
+                      .values_list('member_id', 'balance', 'bank'))
+        for member_id, balance, bank in rows:
+            economy_ranks.update(self.guild_id, member_id, balance, bank)
+
+    async def _apply(self, member_id: int, changes: dict, checks: dict, using_db=None) -> bool:
+        "UPDATE of the account with the conditions in its WHERE clause"
+        return bool(await (EconomicModel
+                           .filter(guild_id=self.guild_id, member_id=member_id, **checks)
+                           .using_db(using_db)
+                           .update(**changes)))
+
+    async def refresh_rank(self) -> None:
+        await self._refresh_rank((self.member_id,))
+
+    async def get_rank_index(self) -> RankIndex:
+        return await economy_ranks.get(self.guild_id)
+
+    async def get_leaderboards(self) -> List[RankRow]:
+        index = await self.get_rank_index()
+        return index.page(0, len(index))
 
     @check_registration
     async def get_service(self, service: str):
@@ -51,19 +111,58 @@ class EconomyMemberDB:
     async def update(self, arg: str, value: Any):
         setattr(self.economic, arg, value)
         await self.economic.save()
+        self._sync_rank((arg,))
 
     @check_registration
     async def update_dict(self, data: Optional[dict] = None, **kwargs: Any):
         if data is not None and len(kwargs) > 0:
             raise TypeError("You can't use kwargs in conjunction with data")
-        await self.economic.update_from_dict(data or kwargs).save()
+        data = data or kwargs
+        await self.economic.update_from_dict(data).save()
+        self._sync_rank(data)
 
     @check_registration
     async def delete(self):
         await self.economic.delete()
+        economy_ranks.remove(self.guild_id, self.member_id)
+
+    @staticmethod
+    async def migrate_unique_index() -> int:
+        """
+        Merges duplicated accounts and adds the unique (guild_id, member_id) index
+        to databases created before it was declared. Run once through MigrationsDB.
+        """
+        duplicates = await (EconomicModel
+                            .annotate(count=Count('id'))
+                            .group_by('guild_id', 'member_id')
+                            .filter(count__gt=1)
+                            .values_list('guild_id', 'member_id'))
+
+        for guild_id, member_id in duplicates:
+            accounts = await EconomicModel.filter(guild_id=guild_id,
+                                                  member_id=member_id).order_by('id')
+            account, *others = accounts
+            account.balance = sum(acc.balance for acc in accounts)
+            account.bank = sum(acc.bank for acc in accounts)
+            for field in TIMESTAMP_FIELDS:
+                setattr(account, field, max(getattr(acc, field) for acc in accounts))
+
+            async with in_transaction() as conn:
+                await account.save(using_db=conn)
+                await EconomicModel.filter(id__in=[acc.id for acc in others]).using_db(conn).delete()
+        if duplicates:
+            _log.info('Merged %d duplicated economy accounts', len(duplicates))
+
+        conn = EconomicModel._meta.db
+        await conn.execute_script(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "{UNIQUE_INDEX_NAME}" '
+            'ON "economic" ("guild_id", "member_id")'
+        )
+        return len(duplicates)
 
     async def delete_guild(self):
         await EconomicModel.filter(guild_id=self.guild_id).delete()
+        economy_ranks.invalidate(self.guild_id)
 
     async def get(self, __name, __default=None):
         data = await self.get_service(__name)
@@ -72,20 +171,101 @@ class EconomyMemberDB:
     async def set(self, key, value):
         await self.update(key, value)
 
-    @check_registration
-    async def increment(self, key, value):
-        setattr(self.economic, key, getattr(self.economic, key)+value)
-        await self.economic.save()
+    async def increment(self, key: str, value: int, using_db=None) -> None:
+        """
+        Inside the transaction of ``using_db`` the caller refreshes
+        the rank with ``refresh_rank`` once it is committed.
+        """
+        changes = {key: F(key) + value}
+        if not await self._apply(self.member_id, changes, {}, using_db):
+            await self.ensure(using_db=using_db)
+            await self._apply(self.member_id, changes, {}, using_db)
+        if using_db is None and key in RANKED_FIELDS:
+            await self._refresh_rank((self.member_id,))
 
-    @check_registration
-    async def decline(self, key, value):
-        setattr(self.economic, key, getattr(self.economic, key)-value)
-        await self.economic.save()
+    async def decline(self, key: str, value: int, check: bool = False, using_db=None) -> bool:
+        """
+        With ``check`` the value is only taken if the account has enough of it,
+        returns False when nothing was changed. Inside the transaction of ``using_db``
+        the caller refreshes the rank with ``refresh_rank`` once it is committed.
+        """
+        checks = {f'{key}__gte': value} if check else {}
+        changes = {key: F(key) - value}
+        updated = await self._apply(self.member_id, changes, checks, using_db)
+        if not updated and not check:
+            await self.ensure(using_db=using_db)
+            updated = await self._apply(self.member_id, changes, checks, using_db)
+        if updated and using_db is None and key in RANKED_FIELDS:
+            await self._refresh_rank((self.member_id,))
+        return updated
+
+    async def transfer(
+        self,
+        amount: int,
+        member_id: Optional[int] = None,
+        key: str = 'balance',
+        to_key: Optional[str] = None
+    ) -> bool:
+        """
+        Moves the amount from ``key`` of this account to ``to_key`` of the member account
+        in one transaction. Without a member it moves the amount between the fields of this account
+        (deposit, withdraw). The balance check is a part of the UPDATE statement,
+        returns False if the account doesn't have enough.
+        """
+        to_key = to_key or key
+        if member_id is None or member_id == self.member_id:
+            if key == to_key:
+                return await EconomicModel.exists(guild_id=self.guild_id, member_id=self.member_id,
+                                                  **{f'{key}__gte': amount})
+            async with in_transaction() as conn:
+                moved = await self._apply(
+                    self.member_id,
+                    {key: F(key) - amount, to_key: F(to_key) + amount},
+                    {f'{key}__gte': amount},
+                    conn
+                )
+            if moved:
+                await self._refresh_rank((self.member_id,))
+            return moved
+
+        async with in_transaction() as conn:
+            if not await self._apply(self.member_id, {key: F(key) - amount},
+                                     {f'{key}__gte': amount}, conn):
+                return False
+            await self.ensure(member_id, using_db=conn)
+            await self._apply(member_id, {to_key: F(to_key) + amount}, {}, conn)
+        await self._refresh_rank((self.member_id, member_id))
+        return True
+
+    @staticmethod
+    async def _update_for_ids(guild_id: int, member_ids: Iterable[int], key: str, change: F) -> int:
+        """
+        Creates the missing accounts and updates the rest with one
+        INSERT and one UPDATE per chunk of members, returns the number of members.
+        """
+        member_ids = list(dict.fromkeys(member_ids))
+        async with in_transaction() as conn:
+            for start in range(0, len(member_ids), BULK_CHUNK_SIZE):
+                chunk = member_ids[start:start+BULK_CHUNK_SIZE]
+                await EconomicModel.bulk_create(
+                    [EconomicModel(guild_id=guild_id, member_id=member_id)
+                     for member_id in chunk],
+                    ignore_conflicts=True,
+                    using_db=conn
+                )
+                await (EconomicModel
+                       .filter(guild_id=guild_id, member_id__in=chunk)
+                       .using_db(conn)
+                       .update(**{key: change}))
+
+        if member_ids and key in RANKED_FIELDS:
+            economy_ranks.invalidate(guild_id)
+        return len(member_ids)
 
     @staticmethod
-    async def increment_for_ids(guild_id, member_ids, key, value):
-        pass
+    async def increment_for_ids(guild_id: int, member_ids: Iterable[int], key: str, value: int) -> int:
+        return await EconomyMemberDB._update_for_ids(guild_id, member_ids, key, F(key) + value)
 
     @staticmethod
-    async def decline_for_ids(guild_id, member_ids, key, value):
-        pass
+    async def decline_for_ids(guild_id: int, member_ids: Iterable[int], key: str, value: int) -> int:
+        return await EconomyMemberDB._update_for_ids(guild_id, member_ids, key, F(key) - value)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+import logging
+from typing import List
+
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.transactions import in_transaction
+
+from ..misc.guild_cache import guild_cache
+from ..models import GiveawayEntryModel, GuildModel
+
+_log = logging.getLogger(__name__)
+
+
+class GiveawayEntriesDB:
+    def __init__(self, guild_id: int, giveaway_id: int) -> None:
+        self.guild_id = guild_id
+        self.giveaway_id = giveaway_id
+
+    async def add(self, member_id: int) -> bool:
+        "Returns False if the member already takes part"
+        try:
+            await GiveawayEntryModel.create(guild_id=self.guild_id,
+                                            giveaway_id=self.giveaway_id,
+                                            member_id=member_id)
+        except IntegrityError:
+            return False
+        return True
+
+    async def remove(self, member_id: int) -> bool:
+        return bool(await GiveawayEntryModel.filter(giveaway_id=self.giveaway_id,
+                                                    member_id=member_id).delete())
+
+    async def has(self, member_id: int) -> bool:
+        return await GiveawayEntryModel.exists(giveaway_id=self.giveaway_id,
+                                               member_id=member_id)
+
+    async def count(self) -> int:
+        return await GiveawayEntryModel.filter(giveaway_id=self.giveaway_id).count()
+
+    async def get_ids(self) -> List[int]:
+        "Member ids in the order they joined"
+        return await (GiveawayEntryModel
+                      .filter(giveaway_id=self.giveaway_id)
+                      .order_by('id')
+                      .values_list('member_id', flat=True))
+
+    async def clear(self) -> None:
+        await GiveawayEntryModel.filter(giveaway_id=self.giveaway_id).delete()
+
+    @staticmethod
+    async def migrate_from_guilds() -> int:
+        """
+        Moves the entries_ids lists out of the GuildModel giveaways column.
+        Migrated giveaways have no entries_ids key, so it is safe to run on every start.
+        """
+        guilds = await GuildModel.filter(~Q(giveaways={})).only('id', 'giveaways')
+        migrated = 0
+
+        for guild in guilds:
+            giveaways = guild.giveaways or {}
+            legacy = {giveaway_id: data.pop('entries_ids')
+                      for giveaway_id, data in giveaways.items()
+                      if 'entries_ids' in data}
+            if not legacy:
+                continue
+
+            entries = [
+                GiveawayEntryModel(guild_id=guild.id,
+                                   giveaway_id=giveaway_id,
+                                   member_id=member_id)
+                for giveaway_id, member_ids in legacy.items()
+                for member_id in dict.fromkeys(member_ids)
+            ]
+            async with in_transaction() as conn:
+                await GiveawayEntryModel.bulk_create(entries, ignore_conflicts=True,
+                                                     using_db=conn)
+                await GuildModel.filter(id=guild.id).using_db(conn).update(
+                    giveaways=giveaways)
+            guild_cache.invalidate(guild.id, ['giveaways'])
+
+            migrated += len(legacy)
+            _log.info('Migrated entries of %d giveaways of guild %s',
+                      len(legacy), guild.id)
+
+        return migrated
@@ -1,14 +1,18 @@
 from __future__ import annotations
-from collections import defaultdict
 import functools
 import logging
-from typing import Any, Optional
-from ..models import GuildModel
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+from ..models import GiveawayEntryModel, GuildModel, JSONField, MemberStatsModel
+from ..misc import adapter
+from ..misc.guild_cache import MISSING, guild_cache
+from .commandHD import command_plans
 
 _log = logging.getLogger(__name__)
 
 
-cache = defaultdict(dict)
+GUILD_FIELDS = tuple(GuildModel._meta.fields_map)
+JSON_FIELDS = frozenset(name for name, field in GuildModel._meta.fields_map.items()
+                        if isinstance(field, JSONField))
 
 
 def check_registration(func):
@@ -40,10 +44,7 @@ class AwaitableGDBGet:
         return self
 
     async def submit(self):
-        await self.gdb.register()
-
-        data = getattr(self.gdb.guild, self.service, self.default)
-        cache[self.gdb.guild_id][self.service] = data
+        data = await self.gdb.fetch_service(self.service, self.default)
 
         for name, args, kwds in self.operations:
             if name == '__getattr__':
@@ -58,25 +59,95 @@ class AwaitableGDBGet:
 
 
 class GuildDateBases:
-    guild: GuildModel
-
     def __init__(self, guild_id: int) -> None:
         self.guild_id = guild_id
 
+    async def _create(self) -> Dict[str, Any]:
+        guild, _ = await GuildModel.get_or_create(id=self.guild_id)
+        fields = {name: getattr(guild, name) for name in GUILD_FIELDS}
+        guild_cache.put_many(self.guild_id, fields)
+        return fields
+
+    async def _load(self, services: Iterable[str]) -> Dict[str, Any]:
+        "Fetches only the requested columns, JSON columns are decoded only for them"
+        columns = [name for name in dict.fromkeys(services)
+                   if name in GUILD_FIELDS]
+        if not columns:
+            return {}
+
+        rows = await GuildModel.filter(id=self.guild_id).values(*columns)
+        if not rows:
+            return await self._create()
+
+        guild_cache.put_many(self.guild_id, rows[0])
+        return rows[0]
+
     async def register(self) -> bool:
-        self.guild, ok = await GuildModel.get_or_create(id=self.guild_id)
-        return ok
+        if self.guild_id in guild_cache:
+            return False
+        if await GuildModel.exists(id=self.guild_id):
+            # Known from now on, until the entry expires or is invalidated
+            guild_cache.put_many(self.guild_id, {})
+            return False
+        await self._create()
+        return True
+
+    async def fetch_service(self, service: str, default: Any = None) -> Any:
+        data = guild_cache.get(self.guild_id, service)
+        if data is MISSING:
+            fields = await self._load([service])
+            data = fields.get(service, default)
+        return data
+
+    async def get_many(
+        self,
+        services: Sequence[str],
+        defaults: Optional[Sequence[Any]] = None
+    ) -> Tuple[Any, ...]:
+        """
+        Returns the values of several services at once,
+        everything missing from the cache is loaded with one narrow query.
+        """
+        if defaults is None:
+            defaults = [None] * len(services)
+
+        values = {}
+        missing = []
+        for service in services:
+            data = guild_cache.get(self.guild_id, service)
+            if data is MISSING:
+                missing.append(service)
+            else:
+                values[service] = data
+
+        if missing:
+            values.update(await self._load(missing))
+
+        return tuple(values.get(service, default)
+                     for service, default in zip(services, defaults))
 
     def get(self, service: str, default: Any = None) -> AwaitableGDBGet:
         return AwaitableGDBGet(self, service, default)
 
+    async def get_item(self, service: str, key: Any, default: Any = None) -> Any:
+        "Looks up one key of a mapping service without copying the whole value"
+        data = guild_cache.peek_item(self.guild_id, service, key, default)
+        if data is MISSING:
+            fields = await self._load([service])
+            data = (fields.get(service) or {}).get(key, default)
+        return data
+
     def get_cache(self, service: str, default: Any = None) -> Any:
-        return cache[self.guild_id].get(service, default)
+        return guild_cache.peek(self.guild_id, service, default)
 
     @check_registration
     async def set(self, service, value):
-        setattr(self.guild, service, value)
-        await self.guild.save()
+        await GuildModel.filter(id=self.guild_id).update(**{service: value})
+
+        if service in JSON_FIELDS:
+            # Keep the cached value identical to what the database returns
+            value = adapter.loads(adapter.dumps(value))
+        guild_cache.put(self.guild_id, service, value)
 
     @check_registration
     async def set_on_json(self, service, key, value):
@@ -99,7 +170,15 @@ class GuildDateBases:
         await self.set(service, data)
 
     async def delete(self):
-        await self.guild.delete()
+        await GuildModel.filter(id=self.guild_id).delete()
+        await MemberStatsModel.filter(guild_id=self.guild_id).delete()
+        await GiveawayEntryModel.filter(guild_id=self.guild_id).delete()
+        guild_cache.invalidate(self.guild_id)
+        command_plans.invalidate(self.guild_id)
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        return guild_cache.stats()
 
     def __eq__(self, value: object) -> bool:
         return (isinstance(value, GuildDateBases)
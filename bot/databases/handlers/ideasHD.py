@@ -0,0 +1,64 @@
+from __future__ import annotations
+from typing import Iterable, Literal, Optional, Tuple
+
+from tortoise.exceptions import IntegrityError
+from tortoise.functions import Count
+
+from ..models import IdeaVoteModel
+
+Vote = Literal[1, -1]
+PROMOTE: Vote = 1
+DEMOTE: Vote = -1
+
+
+class IdeaVotesDB:
+    def __init__(self, message_id: int) -> None:
+        self.message_id = message_id
+
+    async def toggle(self, member_id: int, vote: Vote) -> Optional[Vote]:
+        """
+        Takes the same vote back, replaces the opposite one or adds a new one.
+        Every step is a single statement on the member's own row, so concurrent
+        votes of other members are never lost.
+        Returns the member's vote after the toggle.
+        """
+        query = IdeaVoteModel.filter(message_id=self.message_id,
+                                     member_id=member_id)
+        if await query.filter(vote=vote).delete():
+            return None
+        if await query.update(vote=vote):
+            return vote
+
+        try:
+            await IdeaVoteModel.create(message_id=self.message_id,
+                                       member_id=member_id,
+                                       vote=vote)
+        except IntegrityError:
+            # A concurrent click of the same member created the row first
+            await query.update(vote=vote)
+        return vote
+
+    async def get_counts(self) -> Tuple[int, int]:
+        "Returns the count of promoted and demoted votes"
+        counts = dict(await (IdeaVoteModel
+                             .filter(message_id=self.message_id)
+                             .annotate(count=Count('id'))
+                             .group_by('vote')
+                             .values_list('vote', 'count')))
+        return counts.get(PROMOTE, 0), counts.get(DEMOTE, 0)
+
+    async def import_lists(self, promoted: Iterable[int], demoted: Iterable[int]) -> None:
+        "Imports the votes kept as lists inside the idea data by older versions"
+        votes = {member_id: PROMOTE for member_id in promoted}
+        votes.update({member_id: DEMOTE for member_id in demoted})
+        if not votes:
+            return
+        await IdeaVoteModel.bulk_create([
+            IdeaVoteModel(message_id=self.message_id,
+                          member_id=member_id,
+                          vote=vote)
+            for member_id, vote in votes.items()
+        ], ignore_conflicts=True)
+
+    async def clear(self) -> None:
+        await IdeaVoteModel.filter(message_id=self.message_id).delete()
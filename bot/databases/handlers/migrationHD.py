@@ -0,0 +1,41 @@
+from __future__ import annotations
+import logging
+from typing import Any, Awaitable, Callable, Set
+
+from ..models import MigrationModel
+
+_log = logging.getLogger(__name__)
+
+
+class MigrationsDB:
+    "Markers of the one-shot data migrations, kept in the database"
+
+    _applied: Set[str] = set()
+
+    @classmethod
+    async def is_applied(cls, name: str) -> bool:
+        if name in cls._applied:
+            return True
+        if await MigrationModel.exists(name=name):
+            cls._applied.add(name)
+            return True
+        return False
+
+    @classmethod
+    async def mark_applied(cls, name: str) -> None:
+        await MigrationModel.bulk_create([MigrationModel(name=name)],
+                                         ignore_conflicts=True)
+        cls._applied.add(name)
+
+    @classmethod
+    async def run_once(cls, name: str, func: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Runs the migration unless it has already succeeded once,
+        the marker is only set after it returns without an error.
+        """
+        if await cls.is_applied(name):
+            return False
+        await func()
+        await cls.mark_applied(name)
+        _log.info('Migration %s is applied', name)
+        return True
@@ -0,0 +1,170 @@
+from __future__ import annotations
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+
+from tortoise.expressions import F, Q
+from tortoise.transactions import in_transaction
+
+from ..misc.guild_cache import guild_cache
+from ..misc.rank_index import RankIndex, RankIndexCache
+from ..models import GuildModel, MemberStatsModel
+
+_log = logging.getLogger(__name__)
+
+StatsField = Literal['messages', 'voice_seconds', 'score']
+STATS_FIELDS: Tuple[StatsField, ...] = ('messages', 'voice_seconds', 'score')
+
+# Old guild column -> stats field
+GUILD_STATE_COLUMNS: Dict[str, StatsField] = {
+    'message_state': 'messages',
+    'voice_time_state': 'voice_seconds',
+    'score_state': 'score',
+}
+
+BATCH_SIZE = 500
+
+
+def _stats_loader(field: StatsField):
+    async def load_stats_ranks(guild_id: int) -> List[Tuple[int, int | float]]:
+        return await (MemberStatsModel
+                      .filter(guild_id=guild_id, **{f'{field}__gt': 0})
+                      .values_list('member_id', field))
+    return load_stats_ranks
+
+
+stats_ranks: Dict[StatsField, RankIndexCache] = {
+    field: RankIndexCache(_stats_loader(field))
+    for field in STATS_FIELDS
+}
+
+
+class MemberStatsDB:
+    def __init__(self, guild_id: int, member_id: Optional[int] = None) -> None:
+        self.guild_id = guild_id
+        self.member_id = member_id
+
+    async def get(self, field: StatsField, default: int | float = 0) -> int | float:
+        value = await (MemberStatsModel
+                       .filter(guild_id=self.guild_id, member_id=self.member_id)
+                       .first()
+                       .values_list(field, flat=True))
+        return default if value is None else value
+
+    async def get_rank_index(self, field: StatsField) -> RankIndex:
+        return await stats_ranks[field].get(self.guild_id)
+
+    async def count(self, field: StatsField) -> int:
+        return len(await self.get_rank_index(field))
+
+    async def get_ranked(
+        self,
+        field: StatsField,
+        limit: int,
+        offset: int = 0
+    ) -> List[Tuple[int, int | float]]:
+        index = await self.get_rank_index(field)
+        return [(member_id, value) for member_id, value, _ in index.page(offset, limit)]
+
+    async def get_rank(self, field: StatsField) -> Optional[int]:
+        index = await self.get_rank_index(field)
+        return index.rank(self.member_id)
+
+    async def refresh_rank(self) -> None:
+        await self._refresh_ranks((self.member_id,))
+
+    async def _refresh_ranks(self, member_ids: Iterable[int]) -> None:
+        "Rows changed by SQL expressions are only read back for guilds with a loaded rank index"
+        loaded = [field for field in STATS_FIELDS
+                  if stats_ranks[field].is_loaded(self.guild_id)]
+        if not loaded:
+            return
+        member_ids = list(member_ids)
+        for start in range(0, len(member_ids), BATCH_SIZE):
+            rows = await (MemberStatsModel
+                          .filter(guild_id=self.guild_id,
+                                  member_id__in=member_ids[start:start+BATCH_SIZE])
+                          .values_list('member_id', *loaded))
+            for member_id, *values in rows:
+                for field, value in zip(loaded, values):
+                    stats_ranks[field].update(self.guild_id, member_id, value)
+
+    async def increment_many(
+        self,
+        deltas: Dict[int, Tuple[int, float, float]],
+        using_db=None
+    ) -> None:
+        """
+        Adds (messages, voice_seconds, score) deltas for many members of the guild.
+        Missing rows are inserted empty, then the counters are added by UPDATE
+        statements, one per distinct delta, so concurrent writers don't lose increments.
+        Without `using_db` it runs in its own transaction and refreshes the loaded
+        rank indexes after the commit, otherwise that is up to the caller.
+        """
+        if using_db is None:
+            async with in_transaction() as conn:
+                await self.increment_many(deltas, using_db=conn)
+            await self._refresh_ranks(deltas)
+            return
+
+        member_ids = list(deltas)
+        for start in range(0, len(member_ids), BATCH_SIZE):
+            chunk = member_ids[start:start+BATCH_SIZE]
+            await MemberStatsModel.bulk_create(
+                [MemberStatsModel(guild_id=self.guild_id, member_id=member_id)
+                 for member_id in chunk],
+                ignore_conflicts=True,
+                using_db=using_db
+            )
+
+            groups: Dict[Tuple[int | float, ...], List[int]] = defaultdict(list)
+            for member_id in chunk:
+                groups[tuple(deltas[member_id])].append(member_id)
+
+            for values, group in groups.items():
+                changes = {field: F(field) + value
+                           for field, value in zip(STATS_FIELDS, values)
+                           if value}
+                if not changes:
+                    continue
+                await (MemberStatsModel
+                       .filter(guild_id=self.guild_id, member_id__in=group)
+                       .using_db(using_db)
+                       .update(**changes))
+
+    async def delete_guild(self) -> None:
+        await MemberStatsModel.filter(guild_id=self.guild_id).delete()
+
+    @staticmethod
+    async def migrate_from_guilds() -> int:
+        """
+        Moves the per-member counters out of the GuildModel JSON columns.
+        It scans every guild, so it is run once through MigrationsDB.
+        """
+        query = Q(*(~Q(**{column: {}}) for column in GUILD_STATE_COLUMNS),
+                  join_type=Q.OR)
+        guilds = await GuildModel.filter(query).only('id', *GUILD_STATE_COLUMNS)
+
+        for guild in guilds:
+            deltas: Dict[int, List[int | float]] = {}
+            for column, field in GUILD_STATE_COLUMNS.items():
+                index = STATS_FIELDS.index(field)
+                for member_id, value in (getattr(guild, column) or {}).items():
+                    deltas.setdefault(int(member_id), [0, 0, 0])[index] += value
+
+            async with in_transaction() as conn:
+                await MemberStatsDB(guild.id).increment_many(
+                    {member_id: tuple(values)
+                     for member_id, values in deltas.items()},
+                    using_db=conn
+                )
+                await GuildModel.filter(id=guild.id).using_db(conn).update(
+                    **{column: {} for column in GUILD_STATE_COLUMNS})
+            guild_cache.invalidate(guild.id, GUILD_STATE_COLUMNS)
+            for cache in stats_ranks.values():
+                cache.invalidate(guild.id)
+
+            _log.info('Migrated stats of %d members of guild %s',
+                      len(deltas), guild.id)
+
+        return len(guilds)
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import copy
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+DEFAULT_MAXSIZE = 10_000
+
+MISSING = object()
+IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
+
+class GuildCacheEntry:
+    __slots__ = ('fields', 'expires_at')
+
+    def __init__(self, expires_at: float) -> None:
+        self.fields: Dict[str, Any] = {}
+        self.expires_at = expires_at
+
+
+class GuildSettingsCache:
+    """
+    In-process guild settings cache with TTL and LRU eviction.
+    Values are stored already decoded, mutable values are copied
+    on read so callers can't change the cached state in place.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, GuildCacheEntry] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, guild_id: int) -> bool:
+        return self._get_entry(guild_id, touch=False) is not None
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        if isinstance(value, IMMUTABLE_TYPES):
+            return value
+        return copy.deepcopy(value)
+
+    def _get_entry(self, guild_id: int, touch: bool = True) -> Optional[GuildCacheEntry]:
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._entries.pop(guild_id, None)
+            self.expirations += 1
+            return None
+        if touch:
+            self._entries.move_to_end(guild_id)
+        return entry
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.maxsize:
+            guild_id, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            _log.debug('Evicted guild %s from settings cache', guild_id)
+
+    def get(self, guild_id: int, service: str, default: Any = MISSING) -> Any:
+        entry = self._get_entry(guild_id)
+        if entry is None or service not in entry.fields:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return self._copy(entry.fields[service])
+
+    def peek(self, guild_id: int, service: str, default: Any = None) -> Any:
+        "Returns a copy of the cached value without touching the hit counters and the LRU order"
+        entry = self._get_entry(guild_id, touch=False)
+        if entry is None or service not in entry.fields:
+            return default
+        return self._copy(entry.fields[service])
+
+    def peek_item(self, guild_id: int, service: str, key: Any, default: Any = None) -> Any:
+        """
+        Returns a copy of one item of a cached mapping, the rest of it isn't copied.
+        MISSING when the service isn't cached.
+        """
+        entry = self._get_entry(guild_id, touch=False)
+        if entry is None or service not in entry.fields:
+            return MISSING
+        data = entry.fields[service]
+        if not data:
+            return default
+        return self._copy(data.get(key, default))
+
+    def has(self, guild_id: int, service: str) -> bool:
+        entry = self._get_entry(guild_id, touch=False)
+        return entry is not None and service in entry.fields
+
+    def put(self, guild_id: int, service: str, value: Any) -> None:
+        self.put_many(guild_id, {service: value})
+
+    def put_many(self, guild_id: int, values: Dict[str, Any]) -> None:
+        entry = self._get_entry(guild_id)
+        if entry is None:
+            entry = GuildCacheEntry(time.monotonic() + self.ttl)
+            self._entries[guild_id] = entry
+        entry.fields.update({key: self._copy(value)
+                            for key, value in values.items()})
+        self._evict()
+
+    def invalidate(self, guild_id: int, services: Optional[Iterable[str]] = None) -> None:
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return
+        self.invalidations += 1
+        if services is None:
+            self._entries.pop(guild_id, None)
+            return
+        for service in services:
+            entry.fields.pop(service, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
+
+
+guild_cache = GuildSettingsCache()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+DEFAULT_TTL = 600
+DEFAULT_MAXSIZE = 256
+
+# member id, ranked values..., score
+RankRow = Tuple[int, ...]
+Loader = Callable[[int], Awaitable[Iterable[Tuple[int, ...]]]]
+# guild id, member id -> whether the member is still in the guild
+MemberFilter = Callable[[int, int], bool]
+
+_member_filter: Optional[MemberFilter] = None
+_caches: List[RankIndexCache] = []
+
+
+def set_member_filter(member_filter: Optional[MemberFilter]) -> None:
+    "Members rejected by the filter are left out of every rank index"
+    global _member_filter
+    _member_filter = member_filter
+
+
+def is_member(guild_id: int, member_id: int) -> bool:
+    return _member_filter is None or _member_filter(guild_id, member_id)
+
+
+def remove_member(guild_id: int, member_id: int) -> None:
+    for cache in _caches:
+        cache.remove(guild_id, member_id)
+
+
+class RankIndex:
+    """
+    Members of a guild sorted by score descending, then by member id.
+    The score is the sum of the ranked values of a member.
+    Keys live in a sorted list, so updates, rank lookups and pages are O(log n).
+    Members with a score of zero or less are not ranked.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, ...]] = ()) -> None:
+        self._values: Dict[int, Tuple[int, ...]] = {}
+        for member_id, *values in rows:
+            if sum(values) > 0:
+                self._values[member_id] = tuple(values)
+        self._keys: SortedList[Tuple[int, int]] = SortedList(
+            (-sum(values), member_id)
+            for member_id, values in self._values.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self._values
+
+    def _key(self, member_id: int) -> Optional[Tuple[int, int]]:
+        values = self._values.get(member_id)
+        if values is None:
+            return None
+        return (-sum(values), member_id)
+
+    def update(self, member_id: int, *values: int) -> None:
+        key = self._key(member_id)
+        if key is not None:
+            self._keys.remove(key)
+            del self._values[member_id]
+        if sum(values) > 0:
+            self._values[member_id] = values
+            self._keys.add((-sum(values), member_id))
+
+    def remove(self, member_id: int) -> None:
+        self.update(member_id)
+
+    def rank(self, member_id: int) -> Optional[int]:
+        key = self._key(member_id)
+        if key is None:
+            return None
+        return self._keys.bisect_left(key) + 1
+
+    def page(self, offset: int, limit: int) -> List[RankRow]:
+        rows = []
+        for score, member_id in self._keys.islice(offset, offset+limit):
+            rows.append((member_id, *self._values[member_id], -score))
+        return rows
+
+
+class RankIndexCache:
+    """
+    Per-guild rank indexes with TTL and LRU eviction.
+    Writers update a loaded index in place or invalidate it,
+    a missing index is loaded once and shared by the readers.
+    Only members accepted by the member filter are ranked.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        ttl: float = DEFAULT_TTL,
+        maxsize: int = DEFAULT_MAXSIZE
+    ) -> None:
+        self.loader = loader
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[int, Tuple[RankIndex, float]] = OrderedDict()
+        self._locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Writes seen while the index of the guild is being loaded
+        self._writes: Dict[int, int] = defaultdict(int)
+
+        self.loads = 0
+        self.hits = 0
+
+        _caches.append(self)
+
+    def _get_loaded(self, guild_id: int) -> Optional[RankIndex]:
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return None
+        if entry[1] < time.monotonic():
+            self._entries.pop(guild_id, None)
+            return None
+        return entry[0]
+
+    async def get(self, guild_id: int) -> RankIndex:
+        index = self._get_loaded(guild_id)
+        if index is not None:
+            self.hits += 1
+            self._entries.move_to_end(guild_id)
+            return index
+
+        async with self._locks[guild_id]:
+            index = self._get_loaded(guild_id)
+            if index is not None:
+                return index
+
+            writes = self._writes[guild_id]
+            rows = await self.loader(guild_id)
+            index = RankIndex(row for row in rows
+                              if is_member(guild_id, row[0]))
+            self.loads += 1
+
+            # A write raced with the load, the index is only good for this reader
+            if self._writes[guild_id] == writes:
+                self._entries[guild_id] = (index, time.monotonic() + self.ttl)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+            self._writes.pop(guild_id, None)
+            self._locks.pop(guild_id, None)
+            return index
+
+    def is_loaded(self, guild_id: int) -> bool:
+        return self._get_loaded(guild_id) is not None
+
+    def _track_write(self, guild_id: int) -> None:
+        if guild_id in self._locks:
+            self._writes[guild_id] += 1
+
+    def update(self, guild_id: int, member_id: int, *values: int) -> None:
+        self._track_write(guild_id)
+        index = self._get_loaded(guild_id)
+        if index is None:
+            return
+        if is_member(guild_id, member_id):
+            index.update(member_id, *values)
+        else:
+            index.remove(member_id)
+
+    def remove(self, guild_id: int, member_id: int) -> None:
+        self.update(guild_id, member_id)
+
+    def invalidate(self, guild_id: int) -> None:
+        self._track_write(guild_id)
+        self._entries.pop(guild_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'guilds': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'loads': self.loads,
+            'hits': self.hits,
+        }
@@ -83,6 +83,8 @@ class GuildModel(Model):
 class EconomicModel(Model):
     class Meta:
         table = "economic"
+        # Databases created before the constraint get it from EconomyMemberDB.migrate_unique_index
+        unique_together = (("guild_id", "member_id"),)
 
     guild_id = fields.BigIntField()
     member_id = fields.BigIntField()
@@ -96,6 +98,46 @@ class EconomicModel(Model):
     work = fields.BigIntField(default=0)
 
 
+class MemberStatsModel(Model):
+    class Meta:
+        table = "member_stats"
+        unique_together = (("guild_id", "member_id"),)
+        indexes = (
+            ("guild_id", "messages"),
+            ("guild_id", "voice_seconds"),
+            ("guild_id", "score"),
+        )
+
+    guild_id = fields.BigIntField()
+    member_id = fields.BigIntField()
+    messages = fields.BigIntField(default=0)
+    voice_seconds = fields.FloatField(default=0)
+    score = fields.FloatField(default=0)
+
+
+class GiveawayEntryModel(Model):
+    class Meta:
+        table = "giveaway_entries"
+        unique_together = (("giveaway_id", "member_id"),)
+
+    id = fields.BigIntField(primary_key=True)
+    guild_id = fields.BigIntField(db_index=True)
+    giveaway_id = fields.BigIntField()
+    member_id = fields.BigIntField()
+
+
+class IdeaVoteModel(Model):
+    class Meta:
+        table = "idea_votes"
+        unique_together = (("message_id", "member_id"),)
+        indexes = (("message_id", "vote"),)
+
+    id = fields.BigIntField(primary_key=True)
+    message_id = fields.BigIntField()
+    member_id = fields.BigIntField()
+    vote = fields.SmallIntField()
+
+
 class RoleModel(Model):
     class Meta:
         table = "roles"
@@ -116,6 +158,25 @@ class BanModel(Model):
     time = fields.BigIntField(null=True)
 
 
+class TimerJobModel(Model):
+    class Meta:
+        table = "timer_jobs"
+
+    key = fields.CharField(255, primary_key=True)
+    kind = fields.CharField(64)
+    due_at = fields.FloatField(db_index=True)
+    payload = JSONField(default={})
+
+
+class MigrationModel(Model):
+    "One-shot data migrations that already ran"
+    class Meta:
+        table = "migrations"
+
+    name = fields.CharField(255, primary_key=True)
+    applied_at = fields.DatetimeField(auto_now_add=True)
+
+
 if __name__ == '__main__':
     async def main():
         await Tortoise.init(
@@ -28,9 +28,10 @@ class GiveawayData(TypedDict):
     quantity: int
     date_end: int | float
     types: List[int]
-    entries_ids: List[int]
     completed: bool
     winners: NotRequired[List[int]]
+    # Number of entries of a completed giveaway, they are cleared once the winners are drawn
+    entries: NotRequired[int]
     key: str
     token: str
 
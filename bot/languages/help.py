@@ -1,6 +1,5 @@
 from collections import defaultdict
 from typing import List, Dict, Tuple, TypedDict, Union, NotRequired
-import jmespath
 import orjson
 import os
 
@@ -28,16 +27,18 @@ class CommandsPayload(TypedDict):
 categories_emoji: Dict[str, str]
 categories: Dict[str, List[CommandOption]]
 commands: List[CommandOption]
+# Name and alias -> command, the first command in the file wins
+commands_index: Dict[str, CommandOption]
 
 reactions_command = ['airkiss', 'angrystare', 'bite', 'bleh', 'blush', 'brofist', 'celebrate', 'cheers', 'clap', 'confused', 'cool', 'cry', 'cuddle', 'dance', 'drool', 'evillaugh', 'facepalm', 'handhold', 'happy', 'headbang', 'hug', 'kiss', 'laugh', 'lick', 'love', 'mad', 'nervous', 'no', 'nom', 'nosebleed', 'nuzzle',
                      'nyah', 'pat', 'peek', 'pinch', 'poke', 'pout', 'punch', 'roll', 'run', 'sad', 'scared', 'shout', 'shrug', 'shy', 'sigh', 'sip', 'slap', 'sleep', 'slowclap', 'smack', 'smile', 'smug', 'sneeze', 'sorry', 'stare', 'surprised', 'sweat', 'thumbsup', 'tickle', 'tired', 'wave', 'wink', 'woah', 'yawn', 'yay', 'yes']
+reactions_set = frozenset(reactions_command)
 
 
 def get_command(name: str, with_reactions: bool = False) -> CommandOption:
-    if not with_reactions and name in reactions_command:
+    if not with_reactions and name in reactions_set:
         name = 'reactions'
-    expression = f"[?name == '{name}'||contains(aliases, '{name}')]|[0]"
-    result = jmespath.search(expression, commands)
+    result = commands_index.get(name)
     if result is not None:
         return CommandOption(result)
 
@@ -49,12 +50,16 @@ with open("bot/languages/commands_data.json", "rb") as file:
     commands = _commands["commands"]
 
     categories = {}
+    commands_index = {}
     for cmd in _commands["commands"]:
         cmd_category = cmd["category"]
         if cmd_category not in categories:
             categories[cmd_category] = []
         categories[cmd_category].append(CommandOption(cmd))
 
+        for key in (cmd["name"], *(cmd.get("aliases") or ())):
+            commands_index.setdefault(key, cmd)
+
 
 if __name__ == "__main__":
     folder = 'interactions'
@@ -1,12 +1,15 @@
+import _string
 import contextlib
 from functools import lru_cache
+import logging
+import marshal
 import os
 import random
 import shutil
 import string
-import googletrans
+import sys
 import orjson
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, FrozenSet, List, Tuple, Union
 
 
 try:
@@ -14,12 +17,15 @@ try:
 except ImportError:
     Emoji = None
 
-config = {}
-default_languages = ["da", "de", "en", "es", "fr",  "pl", "ru", "tr"]
-memoization_dict = {}
-resource_dict = {}
+_log = logging.getLogger(__name__)
+
+# Bumped whenever the compiled entry format changes, old catalog files are rebuilt
+CATALOG_VERSION = 1
+CATALOG_SUFFIX = '.catalog'
 
-translator = googletrans.Translator()
+# A plain text or (format string, root names of its fields),
+# the names are None when the format string can't be parsed
+Entry = Union[str, Tuple[str, Optional[FrozenSet[Any]]]]
 
 
 class DictMissing(dict):
@@ -27,8 +33,92 @@ class DictMissing(dict):
         return '{'+key+'}'
 
 
+class Catalog(dict):
+    """
+    Compiled entries per locale.
+    A locale is kept as a marshalled blob until its first lookup.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._pending: Dict[str, bytes] = {}
+
+    def __missing__(self, locale: str) -> Dict[str, Entry]:
+        blob = self._pending.pop(locale, None)
+        if blob is None:
+            raise KeyError(locale)
+        entries = self[locale] = marshal.loads(blob)
+        return entries
+
+    def __contains__(self, locale: object) -> bool:
+        return dict.__contains__(self, locale) or locale in self._pending
+
+    def setdefault(self, locale: str, default: Optional[dict] = None) -> Dict[str, Entry]:
+        if locale in self._pending:
+            return self[locale]
+        return super().setdefault(locale, default)
+
+    def set_pending(self, locale: str, blob: bytes) -> None:
+        self.pop(locale, None)
+        self._pending[locale] = blob
+
+    def load_all(self) -> None:
+        for locale in list(self._pending):
+            self[locale]
+
+    def clear(self) -> None:
+        super().clear()
+        self._pending.clear()
+
+
+config = {}
+default_languages = ["da", "de", "en", "es", "fr",  "pl", "ru", "tr"]
+memoization_dict = Catalog()
+# Nested translations, only built for the tooling by build_resources
+resource_dict = {}
+# Changes on every load and added translation, for caches of translated data
+revision = 0
+
+_translator = None
+
+
+def _field_roots(value: str) -> FrozenSet[Any]:
+    roots = set()
+    for _, field_name, format_spec, _ in string.Formatter().parse(value):
+        if field_name is not None:
+            roots.add(_string.formatter_field_name_split(field_name)[0])
+        if format_spec and '{' in format_spec:
+            roots.update(_field_roots(format_spec))
+    return frozenset(roots)
+
+
+def compile_entry(value: str) -> Entry:
+    if not isinstance(value, str) or ('{' not in value and '}' not in value):
+        return value
+    try:
+        return (value, _field_roots(value))
+    except ValueError:
+        # Raised again by format_map, the same as before the catalog
+        return (value, None)
+
+
+def entry_text(entry: Entry) -> str:
+    "The source text of an entry"
+    if isinstance(entry, tuple):
+        return entry[0]
+    return entry
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        import googletrans
+        _translator = googletrans.Translator()
+    return _translator
+
+
 def translate(text, dest, src='auto'):
-    return translator.translate(text, dest, src).text
+    return get_translator().translate(text, dest, src).text
 
 
 def _load_file(filename: str) -> bytes:
@@ -58,10 +148,20 @@ def add_translation(
     value: str,
     locale: Optional[str] = None
 ) -> None:
+    global revision
     locale = locale or config.get("locale")
     memoization_dict.setdefault(locale, {})
-    memoization_dict[locale][key] = value
-    add_res_translation(key, value, locale)
+    memoization_dict[locale][sys.intern(key)] = compile_entry(value)
+    revision += 1
+
+
+def build_resources() -> dict:
+    "Fills resource_dict with the nested translations of every locale"
+    memoization_dict.load_all()
+    for locale, entries in memoization_dict.items():
+        for key, entry in entries.items():
+            add_res_translation(key, entry_text(entry), locale)
+    return resource_dict
 
 
 def add_dict_translations(path: str, data: Dict[str, str]):
@@ -112,7 +212,7 @@ def _parser_foo_any_locales(locale: str, data: dict, new_data: dict):
 
 def to_any_locales() -> dict:
     new_data = {}
-    for loc, data in resource_dict.items():
+    for loc, data in build_resources().items():
         _parser_foo_any_locales(loc, data, new_data)
     return new_data
 
@@ -136,21 +236,62 @@ def from_folder(foldername: str) -> None:
 
 
 def to_folder(foldername: str) -> str:
-    for lang, data in resource_dict.items():
+    for lang, data in build_resources().items():
         with open(f"{foldername}/{lang}.json", "+wb") as file:
             jsondata = orjson.dumps(data)
             file.write(jsondata)
 
 
+def _flatten(data: dict, entries: Dict[str, Entry], prefix: str = '') -> Dict[str, Entry]:
+    for key, value in data.items():
+        if isinstance(value, dict):
+            _flatten(value, entries, f"{prefix}{key}.")
+        else:
+            entries[sys.intern(prefix+key)] = compile_entry(value)
+    return entries
+
+
+def _catalog_stamp(filename: str) -> Tuple[int, int, int]:
+    stat = os.stat(filename)
+    return (CATALOG_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+def compile_catalog(filename: str) -> Dict[str, bytes]:
+    """
+    Compiled locales of the localization file.
+    They are read from the catalog file next to it while it matches the file,
+    otherwise the JSON is compiled and the catalog file is written again.
+    """
+    catalog_filename = os.path.splitext(filename)[0] + CATALOG_SUFFIX
+    stamp = _catalog_stamp(filename)
+
+    with contextlib.suppress(OSError, EOFError, ValueError, TypeError):
+        with open(catalog_filename, 'rb') as file:
+            cached_stamp, locales = marshal.load(file)
+        if tuple(cached_stamp) == stamp:
+            return locales
+
+    json_resource = _parse_json(_load_file(filename))
+    locales = {lang: marshal.dumps(_flatten(data, {}))
+               for lang, data in json_resource.items()}
+
+    try:
+        with open(catalog_filename, 'wb') as file:
+            marshal.dump((stamp, locales), file)
+    except OSError as exc:
+        _log.debug("Couldn't write the i18n catalog %s: %s", catalog_filename, exc)
+    return locales
+
+
 def from_file(filename: str) -> None:
-    filecontent = _load_file(filename)
-    json_resource = _parse_json(filecontent)
-    for lang, data in json_resource.items():
-        parser(data, lang)
+    global revision
+    for lang, blob in compile_catalog(filename).items():
+        memoization_dict.set_pending(lang, blob)
+    revision += 1
 
 
 def to_file(filename: str) -> str:
-    jsondata = orjson.dumps(resource_dict)
+    jsondata = orjson.dumps(build_resources())
     with open(filename, 'wb+') as file:
         file.write(jsondata)
 
@@ -193,7 +334,8 @@ def to_folders(folder_name: str, lang: str):
     if not os.path.exists(folder_name):
         os.mkdir(folder_name)
 
-    for path, value in memoization_dict[lang].items():
+    for path, entry in memoization_dict[lang].items():
+        value = entry_text(entry)
         pathes: list[str] = path.split('.')
 
         if pathes[0] in ('settings', 'economy'):
@@ -248,7 +390,7 @@ def parser(
 
 def get(path: str):
     lang = config.get('locale')
-    return memoization_dict[lang][path]
+    return entry_text(memoization_dict[lang][path])
 
 
 def get_dict(path: str, lang_mapping: Optional[dict] = None):
@@ -256,7 +398,7 @@ def get_dict(path: str, lang_mapping: Optional[dict] = None):
 
     for lang in default_languages:
         with contextlib.suppress(KeyError):
-            text = memoization_dict[lang][path]
+            text = entry_text(memoization_dict[lang][path])
             lang = lang_mapping.get(lang, lang)
             data[lang] = text
 
@@ -277,24 +419,26 @@ def t(locale: Optional[str] = None, path: Optional[str] = None, mapping: Optiona
     if path is None:
         return ''
 
-    lang = locale
-
-    if locale not in memoization_dict or path not in memoization_dict[locale]:
-        locale = config.get("locale")
-
     try:
-        data = memoization_dict[locale][path]
+        entry = memoization_dict[locale][path]
     except KeyError:
-        return f'{lang}.{path}'
+        try:
+            entry = memoization_dict[config.get("locale")][path]
+        except KeyError:
+            return f'{locale}.{path}'
 
-    if not data:
-        return ''
+    if not isinstance(entry, tuple):
+        return entry or ''
 
+    value, roots = entry
     kwargs['Emoji'] = Emoji
     if mapping is not None:
         kwargs.update(mapping)
 
-    return data.format_map(DictMissing(kwargs))
+    # Every field is given, no need for the placeholders of the missing ones
+    if roots is not None and kwargs.keys() >= roots:
+        return value.format_map(kwargs)
+    return value.format_map(DictMissing(kwargs))
 
 
 if __name__ == "__main__":
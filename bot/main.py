@@ -2,33 +2,54 @@ import sys
 import os
 import asyncio
 import nextcord
+from typing import List
+from bot.misc.boot import boot_profiler
 from bot.misc import env
 from bot.misc.lordbot import LordBot
 
 
 release = sys.platform != 'win32'
 
-bot = LordBot(
-    loop=asyncio.get_event_loop(),
-    chunk_guilds_at_startup=release,
-    release=release
-)
-
-
-def load_dir(dirpath: str) -> None:
+# Cogs with prefix commands only: no slash commands to sync on connect,
+# no timer handlers and no startup listeners. They are loaded while the gateway connects.
+DEFERRED_EXTENSIONS = frozenset({
+    'bot.cogs.economy',
+    'bot.cogs.help',
+    'bot.cogs.ideas_mod',
+    'bot.cogs.interactions',
+    'bot.cogs.leadeboards',
+    'bot.cogs.teams',
+})
+
+with boot_profiler.phase('bot'):
+    bot = LordBot(
+        loop=asyncio.get_event_loop(),
+        chunk_guilds_at_startup=release,
+        release=release
+    )
+
+
+def load_dir(dirpath: str, deferred: List[str]) -> None:
     for filename in os.listdir(dirpath):
         if (os.path.isfile(f'{dirpath}/{filename}')
                 and filename.endswith(".py")):
             fmp = filename[:-3]
             supath = dirpath[2:].replace("/", ".")
+            name = f"{supath}.{fmp}"
 
-            bot.load_extension(f"{supath}.{fmp}")
+            if name in DEFERRED_EXTENSIONS:
+                deferred.append(name)
+            else:
+                bot.load_extension(name)
         elif os.path.isdir(f'{dirpath}/{filename}'):
-            load_dir(f'{dirpath}/{filename}')
+            load_dir(f'{dirpath}/{filename}', deferred)
 
 
 def start_bot():
-    load_dir("./bot/cogs")
+    deferred = []
+    with boot_profiler.phase('extensions'):
+        load_dir("./bot/cogs", deferred)
+    bot.defer_extensions(deferred)
 
     try:
         token = env.Tokens.token
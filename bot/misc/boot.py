@@ -0,0 +1,77 @@
+from __future__ import annotations
+import contextlib
+import logging
+import sys
+import time
+from typing import Dict, Iterator, Tuple
+
+_log = logging.getLogger(__name__)
+
+REPORT_LIMIT = 10
+
+
+class BootProfiler:
+    """
+    Times of the start of the bot: phases, extensions
+    and marks measured from the creation of the profiler.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        # Extension -> (seconds, modules imported by it)
+        self.extensions: Dict[str, Tuple[float, int]] = {}
+        self.marks: Dict[str, float] = {}
+        self.reported = False
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def extension(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        modules = len(sys.modules)
+        try:
+            yield
+        finally:
+            self.extensions[name] = (time.perf_counter() - start,
+                                     len(sys.modules) - modules)
+
+    def mark(self, name: str) -> float:
+        "Seconds since the start, only the first mark of a name is kept"
+        return self.marks.setdefault(name, time.perf_counter() - self.started)
+
+    def report(self, limit: int = REPORT_LIMIT) -> str:
+        lines = ['Boot profile:']
+        for name, seconds in self.marks.items():
+            lines.append(f'  at {seconds:8.3f}s  {name}')
+        for name, seconds in sorted(self.phases.items(), key=lambda item: -item[1]):
+            lines.append(f'  {seconds:10.3f}s  phase {name}')
+
+        extensions = sorted(self.extensions.items(), key=lambda item: -item[1][0])
+        total = sum(seconds for seconds, _ in self.extensions.values())
+        lines.append(f'  {total:10.3f}s  {len(extensions)} extensions, slowest:')
+        for name, (seconds, modules) in extensions[:limit]:
+            lines.append(f'  {seconds:10.3f}s  {name} (+{modules} modules)')
+        return '\n'.join(lines)
+
+    def log_report(self) -> None:
+        if self.reported:
+            return
+        self.reported = True
+        _log.info(self.report())
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **{f'mark:{name}': seconds for name, seconds in self.marks.items()},
+            **{f'phase:{name}': seconds for name, seconds in self.phases.items()},
+            'extensions': sum(seconds for seconds, _ in self.extensions.values()),
+        }
+
+
+boot_profiler = BootProfiler()
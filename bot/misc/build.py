@@ -0,0 +1,94 @@
+"""
+Release information of the running build.
+
+GitPython walks every tag of the repository, so the result is kept in
+a build stamp file and reused while it matches the checked out commit.
+Deployments without the repository can write the stamp beforehand:
+
+    python -m bot.misc.build
+"""
+from __future__ import annotations
+import logging
+import os
+from typing import NamedTuple, Optional
+
+import orjson
+
+_log = logging.getLogger(__name__)
+
+BUILD_STAMP = 'build_stamp.json'
+
+
+class BuildInfo(NamedTuple):
+    sha: str
+    date: int
+    tag: str
+
+
+def read_head_sha(git_dir: str = '.git') -> Optional[str]:
+    "Commit of HEAD read straight from the git files, None if it can't be resolved"
+    try:
+        with open(os.path.join(git_dir, 'HEAD')) as file:
+            head = file.read().strip()
+        if not head.startswith('ref: '):
+            return head
+
+        ref = head[5:]
+        ref_path = os.path.join(git_dir, *ref.split('/'))
+        if os.path.exists(ref_path):
+            with open(ref_path) as file:
+                return file.read().strip()
+
+        with open(os.path.join(git_dir, 'packed-refs')) as file:
+            for line in file:
+                sha, _, name = line.strip().partition(' ')
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+def git_build_info() -> BuildInfo:
+    import git
+
+    repo = git.Repo(search_parent_directories=True)
+    tags_dt = {tag.commit.committed_date: tag for tag in repo.tags}
+    return BuildInfo(
+        sha=repo.head.object.hexsha,
+        date=repo.head.object.committed_date,
+        tag=tags_dt[max(tags_dt)].name
+    )
+
+
+def read_build_stamp(path: str = BUILD_STAMP) -> Optional[BuildInfo]:
+    try:
+        with open(path, 'rb') as file:
+            return BuildInfo(**orjson.loads(file.read()))
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def write_build_stamp(info: BuildInfo, path: str = BUILD_STAMP) -> None:
+    with open(path, 'wb') as file:
+        file.write(orjson.dumps(info._asdict()))
+
+
+def get_build_info(path: str = BUILD_STAMP) -> BuildInfo:
+    stamp = read_build_stamp(path)
+    head = read_head_sha()
+    if stamp is not None and (head is None or head == stamp.sha):
+        return stamp
+
+    info = git_build_info()
+    try:
+        write_build_stamp(info, path)
+    except OSError as exc:
+        _log.debug("Couldn't write the build stamp %s: %s", path, exc)
+    return info
+
+
+if __name__ == '__main__':
+    info = git_build_info()
+    write_build_stamp(info)
+    print(info)
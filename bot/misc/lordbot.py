@@ -1,15 +1,13 @@
 from __future__ import annotations
 import asyncio
-from collections import deque
 import aiogram
-import git
 import logging
 import os
 import aiohttp
 import nextcord
 import re
 from aiohttp_socks import ProxyConnector
-from typing import TYPE_CHECKING, Any, Coroutine, List, Optional, Dict
+from typing import TYPE_CHECKING, Any, Coroutine, Iterable, List, Optional, Dict
 
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
@@ -18,8 +16,13 @@ from nextcord.ext import commands
 from tortoise import Tortoise
 from cordlog import setup_storage
 
-from bot.databases import GuildDateBases
+from bot.databases import EconomyMemberDB, GiveawayEntriesDB, GuildDateBases, MemberStatsDB, MigrationsDB
+from bot.databases.activity import activity_counter
+from bot.misc.boot import boot_profiler
+from bot.misc.build import get_build_info
 from bot.misc.env import API_URL, PROXY, TELEGRAM_TOKEN, LOG_WEBHOOK
+from bot.misc.message_cache import LordConnectionState, MessageCache
+from bot.misc.ratelimit import get_cooldown_store
 from bot.misc.sites.site import ApiSite
 from bot.resources.info import DEFAULT_PREFIX, SITE
 from bot.misc.utils import LordTimeHandler
@@ -55,7 +58,8 @@ class LordBot(commands.AutoShardedBot):
         loop: Optional[asyncio.AbstractEventLoop] = None,
         chunk_guilds_at_startup: bool = True,
         bot_command: Optional[bool] = None,
-        release: Optional[bool] = None
+        release: Optional[bool] = None,
+        message_cache: Optional[MessageCache] = None
     ) -> None:
         if bot_command is None:
             allow_bot_command = not release
@@ -66,6 +70,8 @@ class LordBot(commands.AutoShardedBot):
         self.release = release
         self.allow_bot_command = allow_bot_command
 
+        self.message_cache = message_cache or MessageCache()
+
         intents = nextcord.Intents.all()
         intents.presences = False
 
@@ -86,15 +92,13 @@ class LordBot(commands.AutoShardedBot):
             connector=connector
         )
 
-        _messages = deque(
-            self._connection._messages,
-            maxlen=None
-        )
-        self._connection._messages = _messages
-        self._connection.max_messages = None
+        with boot_profiler.phase('i18n'):
+            self.load_i18n_config()
+        with boot_profiler.phase('build info'):
+            self.get_git_info()
 
-        self.load_i18n_config()
-        self.get_git_info()
+        self.deferred_extensions: List[str] = []
+        self.__deferred_task: Optional[asyncio.Task] = None
 
         self.activity = nextcord.CustomActivity(
             name=f'{DEFAULT_PREFIX}help | {self.release_tag}')
@@ -121,6 +125,10 @@ class LordBot(commands.AutoShardedBot):
         self.add_listener(self.listen_on_ready, 'on_ready')
         self.loop.create_task(self.api_site.run())
 
+    def _get_state(self, *args, **kwargs) -> LordConnectionState:
+        state = super()._get_state(*args, **kwargs)
+        return LordConnectionState.install(state, self.message_cache)
+
     async def wait_api_state(self, state: str, timeout: Optional[int] = None) -> bool:
         return await self.__wait_api_state(state, timeout=timeout)
 
@@ -132,12 +140,38 @@ class LordBot(commands.AutoShardedBot):
         self.__wait_api_state = wait
 
     def get_git_info(self):
-        repo = git.Repo(search_parent_directories=True)
-
-        self.release_sha = repo.head.object.hexsha[:8]
-        self.release_date = repo.head.object.committed_date
-        tags_dt = {tag.commit.committed_date: tag for tag in repo.tags}
-        self.release_tag = tags_dt[max(tags_dt)].name
+        info = get_build_info()
+
+        self.release_sha = info.sha[:8]
+        self.release_date = info.date
+        self.release_tag = info.tag
+
+    def load_extension(self, name: str, **kwargs: Any) -> None:
+        with boot_profiler.extension(name):
+            super().load_extension(name, **kwargs)
+
+    def defer_extensions(self, names: Iterable[str]) -> None:
+        "The extensions are loaded once the loop runs, while the gateway connects"
+        self.deferred_extensions.extend(names)
+        if self.__deferred_task is None:
+            self.__deferred_task = self.loop.create_task(
+                self.load_deferred_extensions(), name='deferred-extensions')
+
+    async def load_deferred_extensions(self) -> None:
+        with boot_profiler.phase('deferred extensions'):
+            while self.deferred_extensions:
+                name = self.deferred_extensions.pop(0)
+                try:
+                    self.load_extension(name)
+                except Exception as exc:
+                    _log.error("Couldn't load the extension %s", name, exc_info=exc)
+                # Lets the connection go on between the imports
+                await asyncio.sleep(0)
+        boot_profiler.mark('deferred extensions loaded')
+
+    async def wait_extensions(self) -> None:
+        if self.__deferred_task is not None:
+            await asyncio.shield(self.__deferred_task)
 
     def load_i18n_dir(self, dirname: str) -> None:
         if not os.path.exists(dirname) or self.release:
@@ -246,7 +280,19 @@ class LordBot(commands.AutoShardedBot):
 
         setattr(self, name, coro)
 
+    async def close(self) -> None:
+        try:
+            await activity_counter.close()
+        except Exception as exc:
+            _log.error("Couldn't flush the activity counters", exc_info=exc)
+        await get_cooldown_store().close()
+        await super().close()
+
     async def listen_on_ready(self) -> None:
+        await self.wait_extensions()
+        boot_profiler.mark('ready')
+        boot_profiler.log_report()
+
         self.loop.create_task(self.twnoti.parse())
         self.loop.create_task(self.ytnoti.parse())
 
@@ -262,6 +308,7 @@ class LordBot(commands.AutoShardedBot):
             _log.info("[DEV MODE] Start")
 
         _log.debug('Listen on connect')
+        boot_profiler.mark('connect')
 
         try:
             await Tortoise.init(
@@ -269,6 +316,9 @@ class LordBot(commands.AutoShardedBot):
                 modules={'models': ['bot.databases.models']},
             )
             await Tortoise.generate_schemas()
+            await MigrationsDB.run_once('economy_unique_index', EconomyMemberDB.migrate_unique_index)
+            await MigrationsDB.run_once('member_stats', MemberStatsDB.migrate_from_guilds)
+            await GiveawayEntriesDB.migrate_from_guilds()
         except Exception as exc:
             _log.error("Couldn't connect to the database", exc_info=exc)
             await self.close()
@@ -276,3 +326,7 @@ class LordBot(commands.AutoShardedBot):
             return
         else:
             _log.debug('Database is ready')
+            boot_profiler.mark('database')
+            activity_counter.start(self.loop)
+            get_cooldown_store().start(self.loop)
+            await self.lord_handler_timer.start()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import logging
+import sys
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from nextcord.shard import AutoShardedConnectionState
+from nextcord.utils import DISCORD_EPOCH
+
+if TYPE_CHECKING:
+    from nextcord import Message
+
+_log = logging.getLogger(__name__)
+
+DEFAULT_MAX_MESSAGES = 50_000
+DEFAULT_MAX_GUILD_MESSAGES = 5_000
+DEFAULT_MAX_CHANNEL_MESSAGES = 1_000
+DEFAULT_MESSAGE_TTL: Optional[float] = None
+
+# Rough weight of a cached Message object without its content
+MESSAGE_OVERHEAD = 1024
+EMBED_OVERHEAD = 512
+ATTACHMENT_OVERHEAD = 256
+
+
+def estimate_message_size(message: Message) -> int:
+    return (
+        MESSAGE_OVERHEAD
+        + sys.getsizeof(message.content or '')
+        + EMBED_OVERHEAD * len(message.embeds)
+        + ATTACHMENT_OVERHEAD * len(message.attachments)
+    )
+
+
+def message_timestamp(message_id: int) -> float:
+    return ((message_id >> 22) + DISCORD_EPOCH) / 1000
+
+
+class MessageCache:
+    """
+    Bounded message store that replaces the connection state deque.
+
+    Messages are kept in arrival order and evicted from the oldest one
+    when the global, per-guild or per-channel limit is exceeded or when
+    they are older than ``ttl`` seconds. Lookups by id are O(1).
+    """
+
+    def __init__(
+        self,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        max_guild_messages: Optional[int] = DEFAULT_MAX_GUILD_MESSAGES,
+        max_channel_messages: Optional[int] = DEFAULT_MAX_CHANNEL_MESSAGES,
+        ttl: Optional[float] = DEFAULT_MESSAGE_TTL
+    ) -> None:
+        self.max_messages = max_messages
+        self.max_guild_messages = max_guild_messages
+        self.max_channel_messages = max_channel_messages
+        self.ttl = ttl
+
+        # message id -> (message, approximate size)
+        self._messages: OrderedDict[int, Tuple[Message, int]] = OrderedDict()
+        self._guilds: Dict[int, OrderedDict[int, None]] = {}
+        self._channels: Dict[int, OrderedDict[int, None]] = {}
+        self._bytes = 0
+
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def maxlen(self) -> int:
+        return self.max_messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __bool__(self) -> bool:
+        return bool(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return (message for message, _ in list(self._messages.values()))
+
+    def __reversed__(self) -> Iterator[Message]:
+        return (message for message, _ in reversed(list(self._messages.values())))
+
+    def __getitem__(self, index: int) -> Message:
+        return list(self)[index]
+
+    def __contains__(self, message: Message) -> bool:
+        return message.id in self._messages
+
+    @staticmethod
+    def _guild_key(message: Message) -> int:
+        guild = message.guild
+        return guild.id if guild is not None else 0
+
+    def _discard(self, message_id: int) -> Optional[Message]:
+        item = self._messages.pop(message_id, None)
+        if item is None:
+            return None
+        message, size = item
+        self._bytes -= size
+
+        for index, key in ((self._guilds, self._guild_key(message)),
+                           (self._channels, message.channel.id)):
+            ids = index.get(key)
+            if ids is None:
+                continue
+            ids.pop(message_id, None)
+            if not ids:
+                del index[key]
+        return message
+
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        deadline = time.time() - self.ttl
+        while self._messages:
+            message_id = next(iter(self._messages))
+            if message_timestamp(message_id) >= deadline:
+                break
+            self._discard(message_id)
+            self.expirations += 1
+
+    def _shrink(self, ids: Optional[OrderedDict[int, None]], limit: Optional[int]) -> None:
+        if ids is None or limit is None:
+            return
+        while len(ids) > limit:
+            self._discard(next(iter(ids)))
+            self.evictions += 1
+
+    def append(self, message: Message) -> None:
+        self._discard(message.id)
+
+        size = estimate_message_size(message)
+        self._messages[message.id] = (message, size)
+        self._bytes += size
+
+        guild_key = self._guild_key(message)
+        self._guilds.setdefault(guild_key, OrderedDict())[message.id] = None
+        self._channels.setdefault(
+            message.channel.id, OrderedDict())[message.id] = None
+
+        self._shrink(self._channels.get(message.channel.id),
+                     self.max_channel_messages)
+        self._shrink(self._guilds.get(guild_key), self.max_guild_messages)
+        self._shrink(self._messages, self.max_messages)
+        self._expire()
+
+    def remove(self, message: Message) -> None:
+        self._discard(message.id)
+
+    def get(self, message_id: Optional[int]) -> Optional[Message]:
+        item = self._messages.get(message_id)
+        if item is None:
+            return None
+        if self.ttl is not None and message_timestamp(message_id) < time.time() - self.ttl:
+            self._discard(message_id)
+            self.expirations += 1
+            return None
+        return item[0]
+
+    def reset(self, messages: Iterable[Message] = ()) -> None:
+        self._messages.clear()
+        self._guilds.clear()
+        self._channels.clear()
+        self._bytes = 0
+        for message in messages:
+            self.append(message)
+
+    def clear(self) -> None:
+        self.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._messages),
+            'guilds': len(self._guilds),
+            'channels': len(self._channels),
+            'approx_bytes': self._bytes,
+            'max_messages': self.max_messages,
+            'max_guild_messages': self.max_guild_messages,
+            'max_channel_messages': self.max_channel_messages,
+            'ttl': self.ttl,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+class LordConnectionState(AutoShardedConnectionState):
+    """
+    Connection state that keeps messages in a :class:`MessageCache`.
+    Nextcord reassigns ``_messages`` with a plain deque when clearing the state
+    or removing a guild, the property turns it back into the bounded cache.
+    """
+
+    message_cache: MessageCache
+
+    @property
+    def _messages(self) -> MessageCache:
+        return self.message_cache
+
+    @_messages.setter
+    def _messages(self, value: Optional[Iterable[Message]]) -> None:
+        if isinstance(value, MessageCache):
+            self.message_cache = value
+        else:
+            self.message_cache.reset(value or ())
+
+    def _get_message(self, msg_id: Optional[int]) -> Optional[Message]:
+        return self.message_cache.get(msg_id)
+
+    @classmethod
+    def install(cls, state: AutoShardedConnectionState, cache: MessageCache) -> LordConnectionState:
+        state.__class__ = cls
+        state.__dict__.pop('_messages', None)
+        state.message_cache = cache
+        state.max_messages = cache.max_messages
+        return state
@@ -5,14 +5,14 @@ from collections import defaultdict
 import os
 import time
 import logging
-from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
 from aiohttp.web_exceptions import HTTPUnauthorized
 
 from bot.databases.handlers.guildHD import GuildDateBases
 from bot.databases.models import GuildModel, Q
 from bot.misc.env import TWITCH_CLIENT_ID, TWITCH_CLIENT_SECRET
 from bot.misc.noti.base import Notification, NotificationApi
-from bot.misc.utils import get_payload, generate_message, lord_format
+from bot.misc.utils import get_payload, render_message
 from bot.resources.info import DEFAULT_TWITCH_MESSAGE
 
 try:
@@ -25,6 +25,10 @@ if TYPE_CHECKING:
 
 _log = logging.getLogger(__name__)
 
+# Helix /streams accepts up to 100 user_login parameters per request
+STREAMS_CHUNK_SIZE = 100
+MAX_CONCURRENT_REQUESTS = 4
+
 
 def refresh_token(func):
     if isinstance(func, staticmethod):
@@ -113,23 +117,62 @@ class TwNotiAPI(NotificationApi):
             return user
 
     @refresh_token
-    async def is_streaming(self, username: str) -> Tuple[bool, Optional[Stream]]:
+    async def get_streams(self, usernames: List[str]) -> Optional[Dict[str, Stream]]:
+        "Returns live streams of up to 100 users by lowercase login, None if the request failed"
         await self.check_token()
 
         url = 'https://api.twitch.tv/helix/streams'
-        params = {
-            'user_login': username
-        }
+        params = [('user_login', username) for username in usernames]
+        params.append(('first', STREAMS_CHUNK_SIZE))
         headers = {
             'Client-ID': self.client_id,
             'Authorization': 'Bearer ' + self.twitch_api_access_token
         }
         data = await self.request('GET', url, params=params, headers=headers)
 
-        if data is not None and len(data['data']) > 0:
-            return True, Stream(**data['data'][0])
-        else:
-            return False, None
+        if data is None:
+            return None
+        return {item['user_login'].lower(): Stream(**item) for item in data['data']}
+
+    async def fetch_streams(self, usernames: Iterable[str]) -> Tuple[Dict[str, Stream], Set[str]]:
+        """
+        Polls all users in chunks of 100 with a bounded number of concurrent requests.
+        Returns the live streams and the usernames whose state is unknown.
+        """
+        usernames = list(usernames)
+        if not usernames:
+            return {}, set()
+
+        await self.check_token()
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(chunk: List[str]) -> Tuple[List[str], Optional[Dict[str, Stream]]]:
+            async with semaphore:
+                try:
+                    return chunk, await self.get_streams(chunk)
+                except Exception as exc:
+                    _log.error('An error was received when executing the request (%s)',
+                               chunk, exc_info=exc)
+                    return chunk, None
+
+        results = await asyncio.gather(*[
+            fetch(usernames[i:i+STREAMS_CHUNK_SIZE])
+            for i in range(0, len(usernames), STREAMS_CHUNK_SIZE)
+        ])
+
+        streams: Dict[str, Stream] = {}
+        failed: Set[str] = set()
+        for chunk, chunk_streams in results:
+            if chunk_streams is None:
+                failed.update(chunk)
+            else:
+                streams.update(chunk_streams)
+        return streams, failed
+
+    async def is_streaming(self, username: str) -> Tuple[bool, Optional[Stream]]:
+        streams = await self.get_streams([username])
+        stream = streams and streams.get(username.lower())
+        return stream is not None, stream
 
 
 class TwNoti(Notification[TwNotiAPI], TwCache):
@@ -160,19 +203,40 @@ class TwNoti(Notification[TwNotiAPI], TwCache):
                     channel = self.bot.get_channel(data['channel_id'])
                     payload = get_payload(
                         guild=guild, stream=stream, user=user)
-                    mes_data = generate_message(lord_format(
-                        data.get('message', DEFAULT_TWITCH_MESSAGE), payload))
+                    mes_data = render_message(
+                        data.get('message', DEFAULT_TWITCH_MESSAGE), payload)
                     await channel.send(**mes_data)
 
     async def callback_on_stop(self, username: str): ...
 
+    def _register_channel(self, guild_id: int, username: str) -> None:
+        self.usernames.add(username)
+        self.directed_data[username].add(guild_id)
+
     async def add_channel(self, guild_id: int, username: str) -> None:
         if username not in self.usernames:
             with_started, _ = await self.api.is_streaming(username)
             if with_started:
                 self.twitch_streaming.add(username)
-            self.usernames.add(username)
-        self.directed_data[username].add(guild_id)
+        self._register_channel(guild_id, username)
+
+    async def poll(self) -> None:
+        usernames = set(self.usernames)
+        streams, failed = await self.api.fetch_streams(usernames)
+
+        started = {uid for uid in usernames if uid.lower() in streams}
+        checked = self.twitch_streaming - failed
+
+        tasks = [self.callback_on_start(streams[uid.lower()])
+                 for uid in started - checked]
+        tasks.extend(self.callback_on_stop(uid)
+                     for uid in checked - started)
+
+        self.twitch_streaming = started | (self.twitch_streaming & failed)
+
+        _log.trace('Twitch polling: %d users, %d live, %d failed',
+                   len(usernames), len(started), len(failed))
+        await asyncio.gather(*tasks)
 
     async def parse(self) -> None:
         if self._running:
@@ -190,12 +254,11 @@ class TwNoti(Notification[TwNotiAPI], TwCache):
         for gm in gms:
             for data in gm.twitch_notification.values():
                 _log.trace('LOAD DATA %s %s', gm.id, data)
-                await self.add_channel(gm.id, data['username'])
+                self._register_channel(gm.id, data['username'])
 
-        for uid in self.usernames:
-            with_started, _ = await self.api.is_streaming(uid)
-            if with_started:
-                self.twitch_streaming.add(uid)
+        streams, _ = await self.api.fetch_streams(self.usernames)
+        self.twitch_streaming = {uid for uid in self.usernames
+                                 if uid.lower() in streams}
 
         self._running = True
         while True:
@@ -204,25 +267,9 @@ class TwNoti(Notification[TwNotiAPI], TwCache):
                 break
             self.last_heartbeat = time.time()
 
-            tasks = []
-            for uid in self.usernames:
-                try:
-                    with_started, data = await self.api.is_streaming(uid)
-                except Exception as exp:
-                    _log.error('An error was received when executing the request (%s)',
-                               uid,
-                               exc_info=exp)
-                    continue
-
-                if with_started and uid not in self.twitch_streaming:
-                    self.twitch_streaming.add(uid)
-                    tasks.append(self.callback_on_start(data))
-                if not with_started and uid in self.twitch_streaming:
-                    self.twitch_streaming.remove(uid)
-                    tasks.append(self.callback_on_stop(uid))
-
-                _log.trace(
-                    'Data about the user %s has been received: %s %s', uid, with_started, data)
-            await asyncio.gather(*tasks)
+            try:
+                await self.poll()
+            except Exception as exc:
+                _log.error('Twitch polling failed', exc_info=exc)
 
         _log.debug('Parsing %s ending', type(self).__name__)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, List, Optional
+from xml.etree.ElementTree import Element, XMLPullParser
+
+try:
+    from .types import ShortChannel, Stats, Thumbnail, Timestamp, Video
+except ImportError:
+    from bot.misc.noti.youtube.types import ShortChannel, Stats, Thumbnail, Timestamp, Video
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+YT = '{http://www.youtube.com/xml/schemas/2015}'
+MEDIA = '{http://search.yahoo.com/mrss/}'
+
+
+class FeedParser:
+    """
+    Incremental parser of a channel Atom feed.
+
+    Data can be fed by chunks while the response is downloaded.
+    The feed lists entries from the newest one, so parsing stops
+    at the first video id for which ``stop_at`` returns True.
+    """
+
+    def __init__(self, stop_at: Optional[Callable[[str], bool]] = None) -> None:
+        self.stop_at = stop_at
+        self.videos: List[Video] = []
+        self.done = False
+
+        self._parser = XMLPullParser(('start', 'end'))
+        self._root: Optional[Element] = None
+        self._in_entry = False
+        self._published: Optional[datetime] = None
+
+    def feed(self, data: bytes) -> bool:
+        "Returns False once no more data is needed"
+        if self.done:
+            return False
+
+        self._parser.feed(data)
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                elif elem.tag == ATOM+'entry':
+                    self._in_entry = True
+                continue
+
+            if elem.tag == YT+'videoId' and self.stop_at is not None and self.stop_at(elem.text):
+                self.done = True
+                return False
+            elif elem.tag == ATOM+'published' and not self._in_entry:
+                self._published = datetime.fromisoformat(elem.text)
+            elif elem.tag == ATOM+'entry':
+                self._in_entry = False
+                self.videos.append(self._parse_entry(elem))
+                self._root.remove(elem)
+
+        return True
+
+    def close(self) -> List[Video]:
+        if not self.done:
+            self.done = True
+            self._parser.close()
+        return self.videos
+
+    def _parse_entry(self, entry: Element) -> Video:
+        author = entry.find(ATOM+'author')
+        group = entry.find(MEDIA+'group')
+
+        channel = ShortChannel(
+            id=entry.findtext(YT+'channelId'),
+            name=author.findtext(ATOM+'name'),
+            url=author.findtext(ATOM+'uri'),
+            created_at=self._published
+        )
+
+        media_thumbnail = group.find(MEDIA+'thumbnail')
+        thumbnail = Thumbnail(
+            url=media_thumbnail.get('url'),
+            width=int(media_thumbnail.get('width')),
+            height=int(media_thumbnail.get('height')),
+        )
+
+        stats = None
+        community = group.find(MEDIA+'community')
+        if community is not None:
+            stats = Stats(
+                likes=int(community.find(MEDIA+'starRating').get('count')),
+                views=int(community.find(MEDIA+'statistics').get('views')),
+            )
+
+        timestamp = Timestamp(
+            published=datetime.strptime(
+                entry.findtext(ATOM+'published'), "%Y-%m-%dT%H:%M:%S%z"),
+            updated=datetime.strptime(
+                entry.findtext(ATOM+'updated'), "%Y-%m-%dT%H:%M:%S%z")
+        )
+
+        return Video(
+            id=entry.findtext(YT+'videoId'),
+            title=entry.findtext(ATOM+'title'),
+            description=group.findtext(MEDIA+'description') or "",
+            url=entry.find(ATOM+'link').get('href'),
+            thumbnail=thumbnail,
+            stats=stats,
+            timestamp=timestamp,
+            channel=channel
+        )
+
+
+def parse_feed(body: bytes, stop_at: Optional[Callable[[str], bool]] = None) -> List[Video]:
+    parser = FeedParser(stop_at)
+    parser.feed(body)
+    return parser.close()
@@ -4,27 +4,34 @@ import asyncio
 from collections import defaultdict
 import logging
 import time
-from typing import List,  TYPE_CHECKING,  Dict, Set
-import xmltodict
+from typing import Callable, List, Optional, TYPE_CHECKING, Dict, Set, Tuple
 from datetime import datetime
+from xml.etree.ElementTree import ParseError
+
+from aiohttp import ClientConnectionError
 
 from bot.databases.handlers.guildHD import GuildDateBases
 from bot.databases.models import GuildModel, Q
 from bot.misc.env import YOUTUBE_API_KEY
 from bot.misc.noti.base import Notification, NotificationApi
-from bot.misc.utils import get_payload, generate_message, lord_format
+from bot.misc.utils import get_payload, render_message
 from bot.resources.info import DEFAULT_YOUTUBE_MESSAGE
 
 try:
-    from .types import Channel, Thumbnail, Stats, Timestamp, Video, ShortChannel, VideoHistory
+    from .feed import FeedParser
+    from .types import Channel, Video, VideoHistory
 except ImportError:
-    from bot.misc.noti.youtube.types import Channel, Thumbnail, Stats, Timestamp, Video, ShortChannel, VideoHistory
+    from bot.misc.noti.youtube.feed import FeedParser
+    from bot.misc.noti.youtube.types import Channel, Video, VideoHistory
 
 if TYPE_CHECKING:
     from bot.misc.lordbot import LordBot
 
 _log = logging.getLogger(__name__)
 
+MAX_CONCURRENT_REQUESTS = 8
+FEED_CHUNK_SIZE = 4096
+
 
 class YtCache:
     if TYPE_CHECKING:
@@ -32,12 +39,15 @@ class YtCache:
         video_history: VideoHistory
         user_info:  Dict[int, Channel]
         directed_data: Dict[str, Set[int]]
+        feed_validators: Dict[str, Tuple[Optional[str], Optional[str]]]
 
     def __init__(self) -> None:
         self.channel_ids = set()
         self.video_history = VideoHistory()
         self.directed_data = defaultdict(set)
         self.user_info = {}
+        # channel id -> (ETag, Last-Modified) of the last fetched feed
+        self.feed_validators = {}
 
 
 class YtNotiApi(NotificationApi):
@@ -70,63 +80,63 @@ class YtNotiApi(NotificationApi):
         self.cache.user_info[channel.id] = channel
         return channel
 
-    def get_videos_from_body(self, body: dict) -> List[Video]:
-        videos = []
-        entries = body["feed"]["entry"] if isinstance(
-            body["feed"]["entry"], list) else [body["feed"]["entry"]]
-
-        for entry in entries:
-            channel = ShortChannel(
-                id=entry["yt:channelId"],
-                name=entry["author"]["name"],
-                url=entry["author"]["uri"],
-                created_at=datetime.fromisoformat(body["feed"]["published"])
-            )
-
-            thumbnail = Thumbnail(
-                url=entry["media:group"]["media:thumbnail"]["@url"],
-                width=int(entry["media:group"]["media:thumbnail"]["@width"]),
-                height=int(entry["media:group"]["media:thumbnail"]["@height"]),
-            )
-
-            stats = None
-            if "media:community" in entry["media:group"]:
-                stats = Stats(
-                    likes=int(entry["media:group"]["media:community"]
-                              ["media:starRating"]["@count"]),
-                    views=int(entry["media:group"]["media:community"]
-                              ["media:statistics"]["@views"]),
+    async def fetch_feed(
+        self,
+        channel_id: str,
+        stop_at: Optional[Callable[[str], bool]] = None,
+        conditional: bool = True
+    ) -> Optional[List[Video]]:
+        """
+        Downloads and parses the channel feed, newest videos first.
+        Returns an empty list when the feed has not changed since the last request
+        and None if it could not be fetched.
+        """
+        url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+        headers = {}
+        etag, last_modified = self.cache.feed_validators.get(channel_id, (None, None))
+        if conditional and etag:
+            headers['If-None-Match'] = etag
+        if conditional and last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        parser = FeedParser(stop_at)
+        try:
+            async with self.bot.session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return []
+                if not response.ok:
+                    _log.error('It was not possible to get the feed of %s, status: %s',
+                               channel_id, response.status)
+                    return None
+
+                # The rest of the body is still read so the connection can be reused
+                async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+                    parser.feed(chunk)
+                parser.close()
+
+                self.cache.feed_validators[channel_id] = (
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
                 )
+        except (asyncio.TimeoutError, ClientConnectionError) as exc:
+            _log.error('Temporary error in the request', exc_info=exc)
+            return None
+        except ParseError as exc:
+            _log.error('The feed of %s could not be parsed', channel_id, exc_info=exc)
+            return None
 
-            timestamp = Timestamp(
-                published=datetime.strptime(
-                    entry["published"], "%Y-%m-%dT%H:%M:%S%z"),
-                updated=datetime.strptime(
-                    entry["updated"], "%Y-%m-%dT%H:%M:%S%z")
-            )
-
-            videos.append(Video(
-                id=entry["yt:videoId"],
-                title=entry["title"],
-                description=entry["media:group"]["media:description"] or "",
-                url=entry["link"]["@href"],
-                thumbnail=thumbnail,
-                stats=stats,
-                timestamp=timestamp,
-                channel=channel
-            ))
-
-        return videos
+        return parser.videos
 
     async def get_video_history(self, channel_id: str) -> List[Video]:
-        url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
-        body = await self.request('GET', url)
-
-        if body is None:
-            return []
-
-        json = xmltodict.parse(body.decode())
-        return self.get_videos_from_body(json)
+        return await self.fetch_feed(channel_id, conditional=False) or []
+
+    async def get_new_videos(self, channel_id: str) -> Optional[List[Video]]:
+        "Videos of the channel that are newer than the latest seen one"
+        history = self.cache.video_history
+        return await self.fetch_feed(
+            channel_id,
+            lambda video_id: history.has_id(channel_id, video_id)
+        )
 
     async def search(self, query: str) -> List[Channel]:
         ret = []
@@ -187,14 +197,68 @@ class YtNoti(Notification[YtNotiApi]):
         self.cache = YtCache()
         super().__init__(bot, YtNotiApi(bot, self.cache, apikey))
 
-    async def add_channel(self, guild_id: int, channel_id: str) -> None:
-        if channel_id not in self.cache.channel_ids:
-            videos = await self.api.get_video_history(channel_id)
-            _, diff = self.cache.video_history.get_diff(videos)
-            self.cache.video_history.extend(diff)
-            self.cache.channel_ids.add(channel_id)
+    def _register_channel(self, guild_id: int, channel_id: str) -> None:
+        self.cache.channel_ids.add(channel_id)
         self.cache.directed_data[channel_id].add(guild_id)
 
+    async def add_channel(self, guild_id: int, channel_id: str) -> None:
+        self._register_channel(guild_id, channel_id)
+        if not self.cache.video_history.is_tracked(channel_id):
+            await self.poll_channel(channel_id)
+
+    async def remove_channel(self, guild_id: int, channel_id: str) -> None:
+        "Stops polling the channel once its last subscription is removed"
+        yt_data = await GuildDateBases(guild_id).get('youtube_notification')
+        if any(data['yt_id'] == channel_id for data in yt_data.values()):
+            return
+
+        guild_ids = self.cache.directed_data.get(channel_id)
+        if guild_ids is not None:
+            guild_ids.discard(guild_id)
+            if guild_ids:
+                return
+
+        self.cache.directed_data.pop(channel_id, None)
+        self.cache.channel_ids.discard(channel_id)
+        self.cache.feed_validators.pop(channel_id, None)
+        self.cache.video_history.discard(channel_id)
+
+    async def poll_channel(self, channel_id: str) -> List[Video]:
+        """
+        Returns the videos published since the previous poll.
+        The first successful poll of a channel only fills its history.
+        """
+        history = self.cache.video_history
+        tracked = history.is_tracked(channel_id)
+
+        videos = await self.api.get_new_videos(channel_id)
+        if videos is None:
+            return []
+
+        history.track(channel_id)
+        history.extend(videos)
+
+        _log.trace('Data about the user %s has been received: %s',
+                   channel_id, videos)
+        return videos if tracked else []
+
+    async def poll(self) -> List[Video]:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        async def poll_channel(channel_id: str) -> List[Video]:
+            async with semaphore:
+                try:
+                    return await self.poll_channel(channel_id)
+                except Exception as exp:
+                    _log.error('An error was received when executing the request (%s)',
+                               channel_id,
+                               exc_info=exp)
+                    return []
+
+        results = await asyncio.gather(*[poll_channel(cid)
+                                         for cid in list(self.cache.channel_ids)])
+        return [video for videos in results for video in videos]
+
     async def callback(self, video: Video) -> None:
         _log.debug('%s publish new video: %s (%s)',
                    video.channel.name, video.title, video.url)
@@ -207,8 +271,8 @@ class YtNoti(Notification[YtNotiApi]):
                 if data['yt_id'] == video.channel.id:
                     channel = self.bot.get_channel(data['channel_id'])
                     payload = get_payload(guild=guild, video=video)
-                    mes_data = generate_message(lord_format(
-                        data.get('message', DEFAULT_YOUTUBE_MESSAGE), payload))
+                    mes_data = render_message(
+                        data.get('message', DEFAULT_YOUTUBE_MESSAGE), payload)
                     await channel.send(**mes_data)
 
     async def parse(self) -> None:
@@ -220,12 +284,9 @@ class YtNoti(Notification[YtNotiApi]):
         gms = await GuildModel.filter(~Q(youtube_notification={}))
         for gm in gms:
             for data in gm.youtube_notification.values():
-                await self.add_channel(gm.id, data['yt_id'])
+                self._register_channel(gm.id, data['yt_id'])
 
-        for cid in self.cache.channel_ids:
-            videos = await self.api.get_video_history(cid)
-            _, diff = self.cache.video_history.get_diff(videos)
-            self.cache.video_history.extend(diff)
+        await self.poll()
 
         self._running = True
         while True:
@@ -234,23 +295,7 @@ class YtNoti(Notification[YtNotiApi]):
                 break
             self.last_heartbeat = time.time()
 
-            gvhd = []
-            for cid in self.cache.channel_ids:
-                try:
-                    videos = await self.api.get_video_history(cid)
-                except Exception as exp:
-                    _log.error('An error was received when executing the request (%s)',
-                               cid,
-                               exc_info=exp)
-                    videos = []
-
-                vhd, diff = self.cache.video_history.get_diff(videos)
-                self.cache.video_history.extend(diff)
-                gvhd.extend(vhd)
-
-                _log.trace(
-                    'Data about the user %s has been received: %s', cid, diff)
-
+            gvhd = await self.poll()
             await asyncio.gather(*[self.callback(v) for v in gvhd])
 
         _log.debug('Parsing %s ending', type(self).__name__)
@@ -1,8 +1,11 @@
 
-from typing import List, Tuple
+from collections import OrderedDict
+from typing import Dict, List
 from dataclasses import dataclass
 from datetime import datetime
 
+MAX_CHANNEL_HISTORY = 50
+
 
 @dataclass
 class Channel:
@@ -61,32 +64,41 @@ class Video:
 
 
 class VideoHistory:
-    def __init__(self) -> None:
-        self.videos: list[Video] = []
+    """
+    Ids of the already seen videos, per channel and in the order they were published.
+    Only the ``max_videos`` latest ids of a channel are kept, a feed lists 15 entries.
+    """
+
+    def __init__(self, max_videos: int = MAX_CHANNEL_HISTORY) -> None:
+        self.max_videos = max_videos
+        self.channels: Dict[str, OrderedDict[str, None]] = {}
+
+    def __len__(self) -> int:
+        return sum(map(len, self.channels.values()))
+
+    def track(self, channel_id: str) -> None:
+        self.channels.setdefault(channel_id, OrderedDict())
+
+    def is_tracked(self, channel_id: str) -> bool:
+        return channel_id in self.channels
+
+    def discard(self, channel_id: str) -> None:
+        self.channels.pop(channel_id, None)
 
     def add(self, video: Video):
-        self.videos.append(video)
+        self.extend([video])
+
+    def has_id(self, channel_id: str, video_id: str) -> bool:
+        ids = self.channels.get(channel_id)
+        return ids is not None and video_id in ids
 
     def has(self, video: Video):
-        for v in self.videos:
-            if v.id == video.id:
-                return True
-        return False
-
-    def get_diff(self, videos: List[Video]) -> Tuple[List[Video], List[Video]]:
-        ret = []
-        diff = []
-
-        include = True
-        for video in videos:
-            if video not in self.videos:
-                diff.append(video)
-                if include:
-                    ret.append(video)
-            else:
-                include = False
-
-        return ret, diff
+        return self.has_id(video.channel.id, video.id)
 
     def extend(self, videos: List[Video]):
-        return self.videos.extend(videos)
+        "Videos are expected in the feed order, from the newest one"
+        for video in reversed(videos):
+            ids = self.channels.setdefault(video.channel.id, OrderedDict())
+            ids[video.id] = None
+            while len(ids) > self.max_videos:
+                ids.popitem(last=False)
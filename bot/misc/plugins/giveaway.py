@@ -2,6 +2,7 @@ import asyncio
 import nextcord
 from typing import Coroutine, Any, Dict
 from bot.databases.datastore import DataStore
+from bot.databases.handlers.giveawayHD import GiveawayEntriesDB
 from bot.databases.handlers.economyHD import EconomyMemberDB
 from bot.databases.varstructs import GiveawayData
 from bot.databases import GuildDateBases
@@ -62,6 +63,11 @@ class GiveawayConfig:
     date_end: int | float = None
 
 
+# message id -> pending message refresh
+_update_tasks: Dict[int, asyncio.Task] = {}
+MESSAGE_UPDATE_DELAY = 3
+
+
 class Giveaway:
     giveaway_data: GiveawayData
 
@@ -73,6 +79,7 @@ class Giveaway:
         self.guild = guild
         self.message_id = message_id
         self.gdb = GuildDateBases(guild.id)
+        self.entries = GiveawayEntriesDB(guild.id, message_id)
 
     async def fetch_giveaway_data(self) -> None:
         self.giveaways = await self.gdb.get('giveaways')
@@ -107,7 +114,6 @@ class Giveaway:
             "quantity": quantity,
             "date_end": date_end,
             "types": [],
-            "entries_ids": [],
             "completed": False,
             "winners": None,
             "key": key,
@@ -140,17 +146,20 @@ class Giveaway:
 
     async def complete(self) -> None:
         await self.fetch_giveaway_data()
+        if self.giveaway_data is None:
+            return
 
         # TODO: REFACTOING AND FIX
         winner_number = utils.decrypt_token(
             self.giveaway_data.get('key'), self.giveaway_data.get('token'))
         winner_ids = []
-        entries_ids = self.giveaway_data.get('entries_ids').copy()
+        entries_ids = await self.entries.get_ids()
 
         if not entries_ids:
             return
 
-        for _ in range(self.giveaway_data.get('quantity')):
+        entries_count = len(entries_ids)
+        for _ in range(min(self.giveaway_data.get('quantity'), len(entries_ids))):
             win = entries_ids.pop(winner_number % len(entries_ids))
             winner_ids.append(win)
 
@@ -159,7 +168,9 @@ class Giveaway:
 
         self.giveaway_data['winners'] = winner_ids
         self.giveaway_data['completed'] = True
+        self.giveaway_data['entries'] = entries_count
         await self.update_giveaway_data(self.giveaway_data)
+        await self.entries.clear()
 
         channel = self.guild.get_channel(self.giveaway_data.get('channel_id'))
         gw_message = channel.get_partial_message(self.message_id)
@@ -169,20 +180,39 @@ class Giveaway:
             f"Congratulations {', '.join([wu.mention for wu in winners])}! You won the {self.giveaway_data['prize']}!",
             reference=gw_message))
 
+    def schedule_update(self) -> None:
+        "Refreshes the message after a short delay, joins meanwhile share one edit"
+        if self.message_id in _update_tasks:
+            return
+        _update_tasks[self.message_id] = asyncio.create_task(
+            self._delayed_update(), name=f'giveaway:update:{self.message_id}')
+
+    async def _delayed_update(self) -> None:
+        try:
+            await asyncio.sleep(MESSAGE_UPDATE_DELAY)
+        finally:
+            _update_tasks.pop(self.message_id, None)
+        await self.update_message()
+
     async def update_message(self) -> None:
         await self.fetch_giveaway_data()
+        if self.giveaway_data is None:
+            return
+        entries = self.giveaway_data.get('entries')
+        if entries is None:
+            entries = await self.entries.count()
 
         channel = self.guild.get_channel(self.giveaway_data.get('channel_id'))
         message = channel.get_partial_message(self.message_id)
-        embed = self.get_completed_embed() if self.giveaway_data.get(
-            'completed') else self.get_embed(self.giveaway_data)
+        embed = self.get_completed_embed(entries) if self.giveaway_data.get(
+            'completed') else self.get_embed(self.giveaway_data, entries)
         view = views_giveaway.GiveawayView(
         ) if not self.giveaway_data.get('completed') else None
 
         await message.edit(embed=embed, view=view)
 
     @staticmethod
-    def get_embed(giveaway_data: dict) -> nextcord.Embed:
+    def get_embed(giveaway_data: dict, entries: int = 0) -> nextcord.Embed:
         giveaway_description = giveaway_data.get(
             'description')+'\n\n' if giveaway_data.get('description') else ''
         embed = nextcord.Embed(
@@ -191,14 +221,14 @@ class Giveaway:
                 f"{giveaway_description}"
                 f"Ends: <t:{giveaway_data.get('date_end'):.0f}:f> (<t:{giveaway_data.get('date_end'):.0f}:R>)\n"
                 f"Sponsored by <@{giveaway_data.get('sponsor_id')}>\n"
-                f"Entries: **{len(giveaway_data.get('entries_ids'))}**\n"
+                f"Entries: **{entries}**\n"
                 f"Winners: **{giveaway_data.get('quantity')}**"
             )
         )
 
         return embed
 
-    def get_completed_embed(self) -> nextcord.Embed:
+    def get_completed_embed(self, entries: int) -> nextcord.Embed:
         winners = filter(lambda item: item is not None,
                          map(self.guild.get_member,
                              self.giveaway_data.get('winners')))
@@ -210,23 +240,29 @@ class Giveaway:
                 f"{giveaway_description}"
                 f"Ends: <t:{self.giveaway_data.get('date_end'):.0f}:f> (<t:{self.giveaway_data.get('date_end'):.0f}:R>)\n"
                 f"Sponsored by <@{self.giveaway_data.get('sponsor_id')}>\n"
-                f"Entries: **{len(self.giveaway_data.get('entries_ids'))}**\n"
+                f"Entries: **{entries}**\n"
                 f"Winners: **{', '.join([wu.mention for wu in winners])}**"
             )
         )
 
         return embed
 
+    async def delete(self) -> None:
+        "Removes the giveaway and its entries"
+        task = _update_tasks.pop(self.message_id, None)
+        if task is not None:
+            task.cancel()
+
+        self.giveaways = await self.gdb.get('giveaways')
+        if self.giveaways.pop(self.message_id, None) is not None:
+            await self.gdb.set('giveaways', self.giveaways)
+        await self.entries.clear()
+
     async def check_participation(self, member_id: int) -> bool:
-        await self.fetch_giveaway_data()
-        return member_id in self.giveaway_data.get('entries_ids')
+        return await self.entries.has(member_id)
 
-    async def promote_participant(self, member_id: int) -> None:
-        await self.fetch_giveaway_data()
-        self.giveaway_data.get('entries_ids').append(member_id)
-        await self.update_giveaway_data(self.giveaway_data)
+    async def promote_participant(self, member_id: int) -> bool:
+        return await self.entries.add(member_id)
 
-    async def demote_participant(self, member_id: int) -> None:
-        await self.fetch_giveaway_data()
-        self.giveaway_data.get('entries_ids').remove(member_id)
-        await self.update_giveaway_data(self.giveaway_data)
+    async def demote_participant(self, member_id: int) -> bool:
+        return await self.entries.remove(member_id)
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+from collections import defaultdict, deque
 import contextlib
 from dataclasses import dataclass
 import datetime
 from enum import IntEnum
 import functools
 import logging
-from typing import Any, Callable, Coroutine, Dict, List, Optional,  Tuple, TypeVar
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional,  Tuple, TypeVar
 import nextcord
 
 from bot.databases import GuildDateBases
@@ -18,6 +19,12 @@ from bot.misc.utils import cut_back
 _log = logging.getLogger(__name__)
 LT = TypeVar('LT')
 
+LOG_FLUSH_DELAY = 2
+LOG_QUEUE_SIZE = 500
+# Discord limits of a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBEDS_LENGTH = 6000
+
 
 @dataclass
 class Message:
@@ -150,7 +157,16 @@ async def pre_remove_role(member: nextcord.Member, role: nextcord.Role) -> None:
     _roles_db[key][1].append(role)
 
 
-async def get_webhook(channel: nextcord.TextChannel) -> Optional[nextcord.Webhook]:
+# channel id -> webhook used to deliver logs into the channel
+_webhooks: Dict[int, nextcord.Webhook] = {}
+_webhook_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+
+def invalidate_webhook(channel_id: int) -> None:
+    _webhooks.pop(channel_id, None)
+
+
+async def _load_webhook(channel: nextcord.TextChannel) -> Optional[nextcord.Webhook]:
     client = channel._state._get_client()
     webhooks_db = DataStore('logs_webhooks')
     webhook_data = await webhooks_db.get(channel.id)
@@ -178,9 +194,212 @@ async def get_webhook(channel: nextcord.TextChannel) -> Optional[nextcord.Webhoo
     return webhook
 
 
+async def get_webhook(channel: nextcord.TextChannel) -> Optional[nextcord.Webhook]:
+    """
+    The webhook is fetched (or created) once and then kept in memory
+    until sending through it fails, see :func:`invalidate_webhook`.
+    """
+    webhook = _webhooks.get(channel.id)
+    if webhook is not None:
+        return webhook
+
+    async with _webhook_locks[channel.id]:
+        webhook = _webhooks.get(channel.id)
+        if webhook is None:
+            webhook = await _load_webhook(channel)
+            if webhook is not None:
+                _webhooks[channel.id] = webhook
+
+    return webhook
+
+
+class LogSender:
+    """
+    Send queue of one log channel.
+
+    Log messages that only hold embeds are packed together, up to
+    10 embeds and 6000 characters per webhook message. The queue is
+    flushed ``delay`` seconds after the first pending log or at once
+    when a full message can be sent. Sends of a channel never overlap,
+    so a webhook is not pushed past its rate limit bucket.
+    """
+
+    def __init__(
+        self,
+        channel: nextcord.TextChannel,
+        delay: float = LOG_FLUSH_DELAY,
+        maxsize: int = LOG_QUEUE_SIZE
+    ) -> None:
+        self.channel = channel
+        self.delay = delay
+        self.maxsize = maxsize
+
+        self._queue: Deque[Message] = deque()
+        self._embeds = 0
+        self._singles = 0
+        self._flushing = False
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.sent_messages = 0
+        self.sent_logs = 0
+        self.dropped = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @staticmethod
+    def is_packable(mes: Message) -> bool:
+        return mes.content is None and mes.file is None and not mes.files
+
+    @staticmethod
+    def get_embeds(mes: Message) -> List[nextcord.Embed]:
+        return [mes.embed] if mes.embed is not None else list(mes.embeds or ())
+
+    def put(self, mes: Message) -> bool:
+        if len(self._queue) >= self.maxsize:
+            self.dropped += 1
+            _log.warning('Log queue of channel %s is full, the log is dropped',
+                         self.channel.id)
+            return False
+
+        self._queue.append(mes)
+        if self.is_packable(mes):
+            self._embeds += len(self.get_embeds(mes))
+        else:
+            self._singles += 1
+        if self._is_ready():
+            self._full.set()
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(),
+                                             name=f'logs:{self.channel.id}')
+        return True
+
+    def _is_ready(self) -> bool:
+        return (self._flushing
+                or self._singles > 0
+                or self._embeds >= MAX_EMBEDS_PER_MESSAGE)
+
+    def _take(self) -> Tuple[Message, int]:
+        "Pops the next webhook message and the count of logs packed into it"
+        mes = self._queue.popleft()
+        if not self.is_packable(mes):
+            self._singles -= 1
+            return mes, 1
+
+        embeds = self.get_embeds(mes)
+        length = sum(map(len, embeds))
+        count = 1
+        while self._queue and self.is_packable(self._queue[0]):
+            next_embeds = self.get_embeds(self._queue[0])
+            next_length = sum(map(len, next_embeds))
+            if (len(embeds)+len(next_embeds) > MAX_EMBEDS_PER_MESSAGE
+                    or length+next_length > MAX_EMBEDS_LENGTH):
+                break
+            self._queue.popleft()
+            embeds.extend(next_embeds)
+            length += next_length
+            count += 1
+
+        self._embeds -= len(embeds)
+        return Message(embeds=embeds), count
+
+    async def _run(self) -> None:
+        try:
+            while self._queue:
+                if not self._is_ready():
+                    self._full.clear()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(self._full.wait(), self.delay)
+
+                mes, count = self._take()
+                try:
+                    sent = await self._send(mes)
+                except Exception as exc:
+                    sent = False
+                    _log.error('Failed to send %d logs into channel %s',
+                               count, self.channel.id, exc_info=exc)
+
+                if sent:
+                    self.sent_messages += 1
+                    self.sent_logs += count
+                else:
+                    self.dropped += count
+        finally:
+            self._task = None
+
+    async def _send(self, mes: Message) -> bool:
+        webhook = await get_webhook(self.channel)
+        if webhook is None:
+            return False
+
+        try:
+            await webhook.send(**mes)
+        except nextcord.Forbidden:
+            invalidate_webhook(self.channel.id)
+            raise
+        except nextcord.NotFound:
+            # The webhook was deleted, a new one is created for the second attempt
+            invalidate_webhook(self.channel.id)
+            webhook = await get_webhook(self.channel)
+            if webhook is None:
+                return False
+            for file in filter(None, [mes.file, *(mes.files or ())]):
+                file.reset()
+            await webhook.send(**mes)
+        return True
+
+    async def flush(self) -> None:
+        if self._task is None:
+            return
+        self._flushing = True
+        self._full.set()
+        try:
+            await asyncio.shield(self._task)
+        finally:
+            self._flushing = False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'depth': self.depth,
+            'sent_messages': self.sent_messages,
+            'sent_logs': self.sent_logs,
+            'dropped': self.dropped,
+        }
+
+
+# channel id -> send queue of the channel
+_senders: Dict[int, LogSender] = {}
+
+
+def get_sender(channel: nextcord.TextChannel) -> LogSender:
+    sender = _senders.get(channel.id)
+    if sender is None:
+        sender = _senders[channel.id] = LogSender(channel)
+    else:
+        sender.channel = channel
+    return sender
+
+
+async def flush_logs() -> None:
+    await asyncio.gather(*[sender.flush() for sender in list(_senders.values())],
+                         return_exceptions=True)
+
+
+def log_queue_stats() -> Dict[str, int]:
+    stats = {'channels': len(_senders), 'depth': 0,
+             'sent_messages': 0, 'sent_logs': 0, 'dropped': 0}
+    for sender in _senders.values():
+        for key, value in sender.stats().items():
+            stats[key] += value
+    return stats
+
+
 def on_logs(log_type: int):
     def predicte(coro):
-        async def send_log(self: Logs, mes: Message, channel_id: int, logs_types: List[LogType]):
+        def send_log(self: Logs, mes: Message, channel_id: int, logs_types: List[LogType]):
             if log_type not in logs_types:
                 return
 
@@ -188,16 +407,10 @@ def on_logs(log_type: int):
             if channel is None:
                 return
 
-            webhook = await get_webhook(channel)
-            if webhook is None:
-                return
-
-            await webhook.send(**mes)
+            get_sender(channel).put(mes)
 
         @functools.wraps(coro)
         async def wrapped(self: Logs, *args, **kwargs) -> None:
-            tasks = []
-
             if self.guild is None:
                 return
 
@@ -208,11 +421,7 @@ def on_logs(log_type: int):
                 return
 
             for channel_id, logs_types in guild_data.items():
-                tasks.append(asyncio.create_task(
-                    send_log(self, mes, channel_id, logs_types)))
-
-            for task in tasks:
-                await task
+                send_log(self, mes, channel_id, logs_types)
         return wrapped
     return predicte
 
@@ -423,7 +632,7 @@ class Logs:
         return Message(embed=embed)
 
     @on_logs(LogType.economy)
-    async def add_currency_for_ids(self, role: nextcord.Role, amount: int, moderator: Optional[nextcord.Member] = None, reason: Optional[str] = None):
+    async def add_currency_for_ids(self, role: nextcord.Role, amount: int, moderator: Optional[nextcord.Member] = None, reason: Optional[str] = None, count: Optional[int] = None):
         gdb = GuildDateBases(role.guild.id)
         economy_settings = await gdb.get('economic_settings')
         currency_emoji = economy_settings.get('emoji')
@@ -436,6 +645,8 @@ class Logs:
             ),
             timestamp=datetime.datetime.today()
         )
+        if count is not None:
+            embed.description += f'\n> Members: **{count:,}**'
         if moderator:
             embed.description += f'\n> Moderator: **{moderator.name}** (**{moderator.id}**)'
         if reason:
@@ -10,7 +10,7 @@ from typing import Dict,  List, Literal, Optional, Self, Tuple
 from bot.languages import i18n
 from bot.misc import utils
 from bot.misc.plugins import logstool
-from bot.misc.utils import generate_message, get_payload, lord_format
+from bot.misc.utils import render_message, get_payload
 from bot.misc.lordbot import LordBot
 from bot.resources.ether import Emoji
 from bot.views.tickets.categories import CategoryView
@@ -133,8 +133,8 @@ class ModuleTicket:
     @staticmethod
     async def update_message(channel: nextcord.TextChannel, ticket_data: TicketsItemPayload, message_id: Optional[int] = None) -> nextcord.Message:
         panel_message = ticket_data['messages']['panel']
-        msg_data = utils.generate_message(utils.lord_format(
-            panel_message, get_payload(guild=channel.guild)))
+        msg_data = utils.render_message(
+            panel_message, get_payload(guild=channel.guild))
         view = await FAQView(channel.guild.id, ticket_data)
 
         message = None
@@ -299,8 +299,7 @@ class ModuleTicket:
         )
 
         name = utils.lord_format(open_name, payload)
-        message = utils.generate_message(
-            utils.lord_format(open_message, payload))
+        message = utils.render_message(open_message, payload)
         view = await CloseTicketView(self.guild.id, buttons)
 
         channel: nextcord.TextChannel = self.guild.get_channel(channel_id)
@@ -455,7 +454,7 @@ class ModuleTicket:
 
         if category_message is not None:
             payload = get_payload(member=interaction.user)
-            message = generate_message(lord_format(category_message, payload))
+            message = render_message(category_message, payload)
             if 'content' not in message:
                 message['content'] = None
         else:
@@ -489,10 +488,8 @@ class ModuleTicket:
         message = get_data('messages')['close']
         ctrl_message_data = get_data('messages')['controller']
 
-        ctrl_message = utils.generate_message(
-            utils.lord_format(ctrl_message_data, payload))
-        close_message = utils.generate_message(
-            utils.lord_format(message, payload))
+        ctrl_message = utils.render_message(ctrl_message_data, payload)
+        close_message = utils.render_message(message, payload)
         close_name = name and utils.lord_format(name, payload)
 
         view = await ControllerTicketView(self.guild.id, buttons)
@@ -559,8 +556,7 @@ class ModuleTicket:
         name = get_data('names')['open']
         close_name = get_data('names').get('close')
 
-        reopen_message = utils.generate_message(
-            utils.lord_format(message, payload))
+        reopen_message = utils.render_message(message, payload)
         reopen_name = utils.lord_format(name, payload)
 
         if not (self._is_verification(get_data)
@@ -621,8 +617,7 @@ class ModuleTicket:
         user_closed = get_data('user_closed', True)
         message = get_data('messages')['delete']
 
-        delete_message = utils.generate_message(
-            utils.lord_format(message, payload))
+        delete_message = utils.render_message(message, payload)
 
         if (not self._is_verification(get_data, user_closed)
                 or self.status != TicketStatus.closed):
@@ -1,8 +1,41 @@
+from __future__ import annotations
+import asyncio
+import enum
+import logging
 import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, TypedDict
+
 import nextcord
 
-import enum
-from typing import Dict, Optional, TypedDict
+_log = logging.getLogger(__name__)
+
+COOLDOWN_MAXSIZE = 100_000
+SWEEP_INTERVAL = 60
+KEY_PREFIX = 'cooldown:'
+
+# Both scripts keep the theoretical arrival time of the bucket (GCRA):
+# the bucket is full again once it is in the past, so the key expires then.
+HIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+tat = tat + tonumber(ARGV[2])
+redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.ceil((tat - now) * 1000))
+return tostring(tat)
+"""
+REFUND_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat then return 0 end
+tat = tat - tonumber(ARGV[2])
+if tat <= now then
+    redis.call('DEL', KEYS[1])
+else
+    redis.call('SET', KEYS[1], string.format('%.6f', tat), 'PX', math.ceil((tat - now) * 1000))
+end
+return 1
+"""
 
 
 class BucketConfig(TypedDict):
@@ -14,83 +47,205 @@ class GuildBucketConfig(BucketConfig, total=True):
     type: int
 
 
-data: Dict[str, Dict[str, BucketConfig]] = {}
-
-
 class BucketType(enum.IntEnum):
     MEMBER = 0
     SERVER = 1
 
 
-class Cooldown:
+def retry_after(tat: Optional[float], rate: int, per: float, now: float) -> Optional[float]:
+    "Seconds until the bucket has a token again, None if it has one now"
+    if tat is None:
+        return None
+    retry = max(tat, now) + per / rate - per - now
+    if retry <= 0:
+        return None
+    return retry
+
+
+class MemoryCooldownStore:
+    """
+    Token buckets of the process, one float per bucket.
+    Full buckets are dropped on access and by the periodic sweep,
+    the least recently used ones once the store is over its size.
+    """
+
     def __init__(
         self,
-        command_name: str,
-        command_data: GuildBucketConfig,
-        token: str
+        maxsize: int = COOLDOWN_MAXSIZE,
+        interval: float = SWEEP_INTERVAL,
+        clock: Callable[[], float] = time.time
     ) -> None:
-        self.command_name = command_name
-        self.command_data = command_data
-        self.token = token
+        self.maxsize = maxsize
+        self.interval = interval
+        self.clock = clock
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
 
-        self.check_register()
+        self.evictions = 0
+        self.expired = 0
 
-    def check_register(self) -> None:
-        data.setdefault(self.command_name, {})
-        data[self.command_name].setdefault(self.token, {})
+    def _get(self, key: str, now: float) -> Optional[float]:
+        tat = self._entries.get(key)
+        if tat is not None and tat <= now:
+            del self._entries[key]
+            self.expired += 1
+            return None
+        return tat
 
-    def get(self) -> Optional[float]:
-        cooldata = data[self.command_name][self.token]
+    def _set(self, key: str, tat: float) -> None:
+        self._entries[key] = tat
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
 
-        regular_rate: int = self.command_data.get('rate')
-        rate: int = cooldata.get('rate', 0)
-        per: float = cooldata.get('per', 0)
+    async def retry_after(self, key: str, rate: int, per: float) -> Optional[float]:
+        now = self.clock()
+        return retry_after(self._get(key, now), rate, per, now)
 
-        if time.time() >= per:
-            self.reset()
-            return None
+    async def hit(self, key: str, rate: int, per: float) -> None:
+        now = self.clock()
+        tat = self._get(key, now) or now
+        self._set(key, max(tat, now) + per / rate)
 
-        if regular_rate > rate:
-            return None
+    async def refund(self, key: str, rate: int, per: float) -> None:
+        now = self.clock()
+        tat = self._get(key, now)
+        if tat is None:
+            return
+        tat -= per / rate
+        if tat <= now:
+            del self._entries[key]
+        else:
+            self._entries[key] = tat
 
-        return round(per-time.time(), 2)
+    async def reset(self, key: str) -> None:
+        self._entries.pop(key, None)
 
-    def add(self) -> None:
-        global data
+    def sweep(self) -> int:
+        now = self.clock()
+        expired = [key for key, tat in self._entries.items() if tat <= now]
+        for key in expired:
+            del self._entries[key]
+        self.expired += len(expired)
+        return len(expired)
 
-        cooldata = data[self.command_name][self.token]
-        rate = cooldata.get('rate', 0)
-        per = cooldata.get('per', 0)
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = loop or asyncio.get_event_loop()
+        self._task = loop.create_task(self._run(), name='cooldown-sweeper')
 
-        regular_per: int = self.command_data.get('per')
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            count = self.sweep()
+            if count:
+                _log.trace('Swept %d expired cooldowns', count)
 
-        datatime = time.time()+regular_per if rate == 0 else per
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
 
-        data[self.command_name][self.token] = {
-            'rate': rate+1,
-            'per': datatime
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'evictions': self.evictions,
+            'expired': self.expired,
         }
 
-    def take(self) -> None:
-        global data
 
-        cooldata: dict = data[self.command_name][self.token]
-        rate: int = cooldata.get('rate', 0)
-        per: float = cooldata.get('per', 0)
+class RedisCooldownStore:
+    """
+    Token buckets shared by every process through Redis.
+    Hits and refunds are atomic scripts, expiry is left to Redis.
+    """
 
-        datarate = (0 if 0 >= rate-1
-                    else rate-1)
+    def __init__(self, client, clock: Callable[[], float] = time.time) -> None:
+        self.client = client
+        self.clock = clock
+        self._hit = client.register_script(HIT_SCRIPT)
+        self._refund = client.register_script(REFUND_SCRIPT)
 
-        data[self.command_name][self.token] = {
-            'rate': datarate,
-            'per': per
-        }
+    async def retry_after(self, key: str, rate: int, per: float) -> Optional[float]:
+        tat = await self.client.get(KEY_PREFIX + key)
+        return retry_after(tat and float(tat), rate, per, self.clock())
 
-    def reset(self) -> None:
-        data[self.command_name][self.token] = {
-            'rate': 0,
-            'per': 0
-        }
+    async def hit(self, key: str, rate: int, per: float) -> None:
+        await self._hit(keys=[KEY_PREFIX + key], args=[self.clock(), per / rate])
+
+    async def refund(self, key: str, rate: int, per: float) -> None:
+        await self._refund(keys=[KEY_PREFIX + key], args=[self.clock(), per / rate])
+
+    async def reset(self, key: str) -> None:
+        await self.client.delete(KEY_PREFIX + key)
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+
+_store: Optional[MemoryCooldownStore | RedisCooldownStore] = None
+
+
+def get_cooldown_store() -> MemoryCooldownStore | RedisCooldownStore:
+    "Redis store when Redis is configured, otherwise the one of the process"
+    global _store
+    if _store is None:
+        from bot.databases.datastore import cache
+        _store = (RedisCooldownStore(cache) if cache is not None
+                  else MemoryCooldownStore())
+    return _store
+
+
+class Cooldown:
+    """
+    Token bucket of a command: ``rate`` uses that refill over ``per`` seconds.
+    """
+
+    def __init__(
+        self,
+        command_name: str,
+        command_data: GuildBucketConfig,
+        token: str
+    ) -> None:
+        self.command_name = command_name
+        self.command_data = command_data
+        self.token = token
+
+        self.key = f'{command_name}:{token}'
+        self.rate: int = command_data.get('rate') or 0
+        self.per: float = command_data.get('per') or 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.per > 0
+
+    async def get(self) -> Optional[float]:
+        if not self.enabled:
+            return None
+        retry = await get_cooldown_store().retry_after(self.key, self.rate, self.per)
+        if retry is None:
+            return None
+        return max(round(retry, 2), 0.01)
+
+    async def add(self) -> None:
+        if self.enabled:
+            await get_cooldown_store().hit(self.key, self.rate, self.per)
+
+    async def take(self) -> None:
+        if self.enabled:
+            await get_cooldown_store().refund(self.key, self.rate, self.per)
+
+    async def reset(self) -> None:
+        await get_cooldown_store().reset(self.key)
 
     @classmethod
     def from_message(
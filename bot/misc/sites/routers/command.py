@@ -1,7 +1,9 @@
 from __future__ import annotations
 import contextlib
-from typing import TYPE_CHECKING
-from fastapi import APIRouter, Request
+import hashlib
+from typing import TYPE_CHECKING, Dict, Tuple
+import orjson
+from fastapi import APIRouter, Request, Response
 from bot.languages import i18n
 from bot.languages.help import commands
 
@@ -36,12 +38,34 @@ def parse_command(locale: str, cmd: dict):
     return data
 
 
+def build_commands(locale: str) -> Tuple[bytes, str]:
+    "Documentation of every command in the locale and its ETag"
+    answer = []
+    for cmd in commands:
+        with contextlib.suppress(Exception):
+            answer.append(parse_command(locale, cmd))
+
+    body = orjson.dumps(answer)
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    return body, etag
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    for value in header.split(','):
+        value = value.strip().removeprefix('W/')
+        if value == '*' or value == etag:
+            return True
+    return False
+
+
 class CommandRouter:
     def __init__(
         self,
         bot: LordBot
     ) -> None:
         self.bot = bot
+        # Locale -> (i18n revision, body, etag), the documentation only changes with the translations
+        self._responses: Dict[str, Tuple[int, bytes, str]] = {}
 
     def _setup(self, prefix: str = "") -> APIRouter:
         router = APIRouter(prefix=prefix)
@@ -54,10 +78,24 @@ class CommandRouter:
 
         return router
 
+    def get_response(self, locale: str) -> Tuple[bytes, str]:
+        # Unknown locales are translated with the default one, as i18n.t does
+        if locale not in i18n.memoization_dict:
+            locale = i18n.config.get('locale')
+
+        response = self._responses.get(locale)
+        if response is None or response[0] != i18n.revision:
+            response = self._responses[locale] = (i18n.revision, *build_commands(locale))
+        return response[1:]
+
+    def clear_cache(self) -> None:
+        self._responses.clear()
+
     def _get(self, request: Request, locale: str):
-        answer = []
-        for cmd in commands:
-            with contextlib.suppress(Exception):
-                answer.append(parse_command(locale, cmd))
+        body, etag = self.get_response(locale)
+        headers = {'ETag': etag}
 
-        return answer
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type='application/json', headers=headers)
@@ -1,7 +1,7 @@
 from .blackjack import BlackjackGame
 from .payloads import (
     GuildPayload, MemberPayload, IdeaPayload, StreamPayload, VideoPayload,
-    TempletePayload, get_payload
+    TempletePayload, PayloadContext, get_payload
 )
 from .templates import (
     ExpressionTemplate, LordTemplate, lord_format, flatten_dict
@@ -12,7 +12,7 @@ from .co_emoji import (
 )
 from .messages import (
     GeneratorMessage, GeneratorMessageDictPop, generate_message,
-    clone_message
+    render_message, clone_message
 )
 from .timers import (
     LordTimerHandler, LordTimeHandler, ItemLordTimeHandler
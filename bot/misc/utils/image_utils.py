@@ -1,17 +1,96 @@
-import copy
-import logging
-from typing import Tuple
-from PIL import Image, ImageFont, ImageDraw
+import asyncio
 import io
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
 import nextcord
+import numpy as np
+import orjson
 from aiohttp import ClientSession
-
+from PIL import Image, ImageDraw, ImageFont
 
 from bot.misc.utils.templates import lord_format
 from bot.misc.utils.payloads import get_payload
 
 _log = logging.getLogger(__name__)
-cached = {}
+
+RENDER_WORKERS = 2
+RENDER_CONCURRENCY = 4
+ASSET_CACHE_SIZE = 64
+IMAGE_CACHE_SIZE = 128
+FONT_CACHE_SIZE = 32
+LAYER_CACHE_SIZE = 32
+
+Source = Union[bytes, str]
+
+
+class LRUCache:
+    "Thread safe LRU used by the render workers"
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._data), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses}
+
+
+# Downloaded files, decoded and processed images, fonts and the static layers of configs
+asset_cache = LRUCache(ASSET_CACHE_SIZE)
+image_cache = LRUCache(IMAGE_CACHE_SIZE)
+font_cache = LRUCache(FONT_CACHE_SIZE)
+layer_cache = LRUCache(LAYER_CACHE_SIZE)
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS,
+                               thread_name_prefix='welcome-image')
+_render_semaphore = asyncio.Semaphore(RENDER_CONCURRENCY)
+# Cached fonts are shared between the workers, FreeType faces are not thread safe
+_font_lock = threading.Lock()
+
+
+def image_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        'assets': asset_cache.stats(),
+        'images': image_cache.stats(),
+        'fonts': font_cache.stats(),
+        'layers': layer_cache.stats(),
+    }
+
+
+def _open(source: Source) -> Union[io.BytesIO, str]:
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _config_key(data: Any) -> bytes:
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
 
 
 class WelcomeImageGenerator:
@@ -20,31 +99,40 @@ class WelcomeImageGenerator:
         self.session = session
         self.config = config
 
-    async def load_bytes(self, path_or_url: str) -> io.BytesIO | str:
-        if path_or_url in cached:
-            return copy.copy(cached[path_or_url])
-
-        if path_or_url.startswith("http"):
-            async with self.session.get(path_or_url) as resp:
-                if not resp.ok:
-                    raise Exception("Failed to load from %s %s" %
-                                    (path_or_url, resp.status))
-                ret_bytes = await resp.read()
-            ret = io.BytesIO(ret_bytes)
-        else:
-            ret = path_or_url
-        cached[path_or_url] = copy.copy(ret)
-        return ret
-
-    # Функция для загрузки изображени
-    async def load_image(self, path_or_url: str) -> Image.Image:
-        res = await self.load_bytes(path_or_url)
-        return Image.open(res).convert("RGBA")
+    async def load_bytes(self, path_or_url: str, cache: bool = True) -> Source:
+        if not path_or_url.startswith("http"):
+            return path_or_url
+        if cache and (data := asset_cache.get(path_or_url)) is not None:
+            return data
+
+        async with self.session.get(path_or_url) as resp:
+            if not resp.ok:
+                raise Exception("Failed to load from %s %s" %
+                                (path_or_url, resp.status))
+            data = await resp.read()
+        if cache:
+            asset_cache.put(path_or_url, data)
+        return data
+
+    # Функция для загрузки изображения
+    def load_image(self, key: Optional[str], source: Source, size: tuple, border: dict) -> Image.Image:
+        cache_key = key and (key, size, _config_key(border))
+        if cache_key and (img := image_cache.get(cache_key)) is not None:
+            return img
+
+        img = Image.open(_open(source)).convert("RGBA")
+        img = self.process_image(img, size, border)
+        if cache_key:
+            image_cache.put(cache_key, img)
+        return img
 
     # Функция для загрузки шрифта
-    async def load_font(self, path_or_url: str, size: int) -> ImageFont.FreeTypeFont:
-        res = await self.load_bytes(path_or_url)
-        return ImageFont.truetype(res, size)
+    def load_font(self, path_or_url: str, source: Source, size: int) -> ImageFont.FreeTypeFont:
+        font = font_cache.get((path_or_url, size))
+        if font is None:
+            font = ImageFont.truetype(_open(source), size)
+            font_cache.put((path_or_url, size), font)
+        return font
 
     def add_round_corners(self, im: Image.Image, rad: int, border_width: int = 0, border_color: tuple = (0, 0, 0)) -> Image.Image:
         new_width, new_height = im.size
@@ -78,40 +166,38 @@ class WelcomeImageGenerator:
 
     def draw_gradient(self, img: Image.Image, text: str, font: ImageFont.FreeTypeFont, x: int, y: int,
                       color_start: Tuple[int, int, int], color_stop: Tuple[int, int, int], max_width: int):
-        # Определяем ширину и высоту текста
-        w, h = font.getbbox(text)[2:]
+        # Создаем изображение для текста
+        with _font_lock:
+            w, h = font.getbbox(text)[2:]
+            im_text = Image.new("RGBA", (w, h))
+            d = ImageDraw.Draw(im_text)
+            d.text((0, 0), text, font=font)
 
         # Создаем изображение для градиента
-        gradient = Image.new("RGB", (w, h))
-        self._draw_gradient(gradient, color_start, color_stop)
-
-        # Создаем изображение для текста
-        im_text = Image.new("RGBA", (w, h))
-        d = ImageDraw.Draw(im_text)
-        d.text((0, 0), text, font=font)
+        gradient = self._draw_gradient((w, h), color_start, color_stop)
 
         # Позиционируем и вставляем градиент
-        img.draft("RGBA", img.size)
         img.paste(
             gradient, (int(img.size[0] / 2 - im_text.size[0] / 2), y), im_text)
 
-        # Функция для рисования градиента
-    def _draw_gradient(self, img: Image.Image, start: Tuple[int, int, int], end: Tuple[int, int, int]):
-        px = img.load()
-        for y in range(0, img.height):
-            color = tuple(
-                int(start[i] + (end[i] - start[i]) * y / img.height) for i in range(3))
-            for x in range(0, img.width):
-                px[x, y] = color
+    # Функция для рисования вертикального градиента
+    def _draw_gradient(self, size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int]) -> Image.Image:
+        width, height = size
+        start = np.asarray(start[:3], dtype=np.float64)
+        end = np.asarray(end[:3], dtype=np.float64)
 
-    # Функция для рисования текста
+        rows = start + (end - start) * (np.arange(height) / height)[:, None]
+        pixels = np.broadcast_to(rows.astype(np.uint8)[:, None, :],
+                                 (height, width, 3))
+        return Image.fromarray(np.ascontiguousarray(pixels), "RGB")
 
+    # Функция для рисования текста
     def draw_simple_text(self, background: Image.Image, text: str, font: ImageFont.FreeTypeFont, x: int, y: int, fill: str):
         draw = ImageDraw.Draw(background)
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        draw.text((x - text_width // 2, y), text, font=font, fill=fill)
+        with _font_lock:
+            bbox = draw.textbbox((0, 0), text, font=font)
+            text_width = bbox[2] - bbox[0]
+            draw.text((x - text_width // 2, y), text, font=font, fill=fill)
 
     # Функция для обработки изображений (круглое или квадратное)
     def process_image(self, img: Image.Image, size: tuple, border: dict) -> Image.Image:
@@ -124,46 +210,86 @@ class WelcomeImageGenerator:
                 img, border_radius, border_width, border_color)
         return img
 
-    # Функция для обработки всех изображений в конфиге
-    async def process_images(self, background: Image.Image) -> Image.Image:
+    def split_images(self) -> Tuple[List[dict], List[dict]]:
+        "Leading static images are a part of the cached layer, the rest depend on the member"
+        images = self.config.get("images", [])
+        for index, image_conf in enumerate(images):
+            if image_conf.get("type", "image") != "image":
+                return images[:index], images[index:]
+        return images, []
+
+    def get_image_url(self, image_conf: dict) -> Optional[str]:
+        img_type = image_conf.get("type", "image")
+        if img_type == "image":
+            return image_conf["path"]
+        if img_type == "avatar":
+            target = image_conf.get("target", "member")
+            if target == "member":
+                return self.member.display_avatar.url
+            if target == "guild" and self.member.guild.icon:
+                return self.member.guild.icon.url
+            return None
+        raise ValueError(f"Unknown image type: {img_type}")
+
+    async def load_assets(self) -> Dict[str, Source]:
+        urls = {self.config['background']['url']: True}
         for image_conf in self.config.get("images", []):
-            _log.debug('Loading image %s %s', image_conf.get(
-                "type", "image"), image_conf.get("path") or image_conf.get("target", "member"))
-            img_type = image_conf.get("type", "image")
-            img = None
-
-            if img_type == "image":
-                img = await self.load_image(image_conf["path"])
-            elif img_type == "avatar":
-                avatar_url = image_conf.get("target", "member")
-                if avatar_url == "member":
-                    img = await self.load_image(self.member.display_avatar.url)
-                elif avatar_url == "guild":
-                    img = await self.load_image(self.member.guild.icon.url)
-            else:
-                raise ValueError(f"Unknown image type: {img_type}")
-            _log.debug('Image data uploaded')
-
-            size = tuple(image_conf.get("size", (100, 100)))
-            border = image_conf.get("border", {})
-            img = self.process_image(img, size, border)
-
-            pos = tuple(image_conf.get("position", (0, 0)))
-            background.paste(img, pos, mask=img if img.mode ==
-                             "RGBA" else None)
+            url = self.get_image_url(image_conf)
+            if url is not None:
+                urls.setdefault(url, image_conf.get("type", "image") == "image")
+        for text_conf in self.config.get("texts", []):
+            urls[text_conf["font_path"]] = True
+
+        sources = await asyncio.gather(*[self.load_bytes(url, cache)
+                                         for url, cache in urls.items()])
+        return dict(zip(urls, sources))
+
+    def paste_image(self, background: Image.Image, image_conf: dict, assets: Dict[str, Source]) -> None:
+        url = self.get_image_url(image_conf)
+        if url is None:
+            return
+        _log.debug('Loading image %s %s', image_conf.get("type", "image"), url)
+
+        size = tuple(image_conf.get("size", (100, 100)))
+        border = image_conf.get("border", {})
+        cache_key = url if image_conf.get("type", "image") == "image" else None
+        img = self.load_image(cache_key, assets[url], size, border)
+
+        pos = tuple(image_conf.get("position", (0, 0)))
+        background.paste(img, pos, mask=img if img.mode ==
+                         "RGBA" else None)
+
+    def render_layer(self, static_images: List[dict], assets: Dict[str, Source]) -> Image.Image:
+        "Background with the static images, shared by every member of the config"
+        background_conf = self.config['background']
+        key = _config_key([background_conf, static_images])
+        layer = layer_cache.get(key)
+        if layer is not None:
+            return layer
+
+        layer = Image.open(_open(assets[background_conf['url']])).convert("RGBA")
+        layer = layer.resize((background_conf.get("width", 800),
+                              background_conf.get("height", 450)))
+        for image_conf in static_images:
+            self.paste_image(layer, image_conf, assets)
+
+        layer_cache.put(key, layer)
+        return layer
+
+    def render(self, assets: Dict[str, Source], texts: List[Tuple[dict, str]]) -> io.BytesIO:
+        static_images, member_images = self.split_images()
+        background = self.render_layer(static_images, assets).copy()
+        _log.debug('Loaded background')
 
-        return background
+        # Обрабатываем изображения
+        for image_conf in member_images:
+            self.paste_image(background, image_conf, assets)
 
-    # Функция для добавления текста
-    async def process_texts(self, background: Image.Image) -> None:
-        for text_conf in self.config.get("texts", []):
+        # Обрабатываем тексты
+        for text_conf, text in texts:
             _log.debug('Load text %s', text_conf["type"])
-            font_path = text_conf["font_path"]
-            font_size = text_conf["font_size"]
-            font = await self.load_font(font_path, font_size)
-
-            context = get_payload(member=self.member)
-            text = lord_format(text_conf["text"], context)
+            font = self.load_font(text_conf["font_path"], assets[text_conf["font_path"]],
+                                  text_conf["font_size"])
 
             x, y = text_conf.get("x", background.width //
                                  2), text_conf.get("y", 0)
@@ -175,23 +301,27 @@ class WelcomeImageGenerator:
             else:
                 self.draw_simple_text(background, text, font, x, y, color)
 
+        output = io.BytesIO()
+        background.save(output, format="PNG")
+        output.seek(0)
+        return output
+
     # Главная функция для генерации изображения
     async def generate(self) -> io.BytesIO:
+        """
+        Downloads the assets on the event loop, the decoding,
+        compositing and encoding run in the render workers.
+        """
         _log.debug('Start generate image')
-        background = await self.load_image(self.config['background']['url'])
-        background = background.resize((self.config['background'].get(
-            "width", 800), self.config['background'].get("height", 450)))
-        _log.debug('Loaded background')
+        async with _render_semaphore:
+            assets = await self.load_assets()
 
-        # Обрабатываем изображения
-        background = await self.process_images(background)
+            context = get_payload(member=self.member)
+            texts = [(text_conf, lord_format(text_conf["text"], context))
+                     for text_conf in self.config.get("texts", [])]
 
-        # Обрабатываем тексты
-        await self.process_texts(background)
+            loop = asyncio.get_running_loop()
+            output = await loop.run_in_executor(_executor, self.render, assets, texts)
 
         _log.debug('The download is completed.')
-
-        output = io.BytesIO()
-        background.save(output, format="PNG")
-        output.seek(0)
         return output
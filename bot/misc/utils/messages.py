@@ -1,18 +1,34 @@
 import contextlib
+import copy
 import logging
-from typing import Optional, Union, Any
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Union, Any
 
 import orjson
 import nextcord
 import asyncio
 from datetime import datetime
-from functools import lru_cache
 
 
 from .misc import MISSING
+from .templates import lord_format, render_structure
 
 _log = logging.getLogger(__name__)
 
+SKELETON_CACHE_SIZE = 512
+EMBED_DICT_ATTRS = ('_footer', '_image', '_thumbnail',
+                    '_video', '_provider', '_author')
+EMBED_TEXT_ATTRS = ('title', 'description', 'url')
+# Values that are converted while parsing, templates with variables in them are rendered as text first
+PARSED_KEYS = frozenset({'color', 'timestamp', 'flags'})
+# Skeleton of a template that can't be parsed before its variables are rendered
+TEXT_TEMPLATE = 0
+# Skeleton of a plain text template, the whole text is the content
+PLAIN_TEMPLATE = 1
+# Embed parts that are dropped when their rendered url is empty
+EMBED_URL_ATTRS = ('_image', '_thumbnail')
+EMBED_ICON_ATTRS = ('_author', '_footer')
+
 class GenerateMessageError(Exception):
     pass
 
@@ -29,6 +45,109 @@ class GeneratorMessageDictPop(dict):
         return self.data.pop(key)
 
 
+def clone_embed(embed: nextcord.Embed) -> nextcord.Embed:
+    "Copy of the embed that shares nothing mutable with the original"
+    clone = copy.copy(embed)
+    for attr in EMBED_DICT_ATTRS:
+        value = getattr(embed, attr, None)
+        if value is not None:
+            setattr(clone, attr, value.copy())
+    fields = getattr(embed, '_fields', None)
+    if fields is not None:
+        clone._fields = [field.copy() for field in fields]
+    return clone
+
+
+class MessageSkeletonCache:
+    """
+    LRU cache of parsed messages keyed by the template content.
+    A skeleton is either the parsed message or the error status of the template,
+    callers get a copy with cloned embeds.
+    """
+
+    def __init__(self, maxsize: int = SKELETON_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, Union[dict, int]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Union[dict, int]]:
+        skeleton = self._entries.get(key)
+        if skeleton is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return skeleton
+
+    def put(self, key: Hashable, skeleton: Union[dict, int]) -> None:
+        self._entries[key] = skeleton
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+skeleton_cache = MessageSkeletonCache()
+
+
+def _has_parsed_variables(node: Any) -> bool:
+    if isinstance(node, dict):
+        return any((key in PARSED_KEYS and isinstance(value, str) and '{' in value)
+                   or _has_parsed_variables(value)
+                   for key, value in node.items())
+    if isinstance(node, list):
+        return any(_has_parsed_variables(value) for value in node)
+    return False
+
+
+def render_embed(embed: nextcord.Embed, forms: dict) -> nextcord.Embed:
+    "Copy of the parsed embed with the variables of its texts rendered"
+    clone = copy.copy(embed)
+    for attr in EMBED_TEXT_ATTRS:
+        value = getattr(embed, attr, None)
+        if isinstance(value, str):
+            setattr(clone, attr, render_structure(value, forms))
+    for attr in EMBED_DICT_ATTRS:
+        value = getattr(embed, attr, None)
+        if value is not None:
+            setattr(clone, attr, render_structure(value, forms))
+    fields = getattr(embed, '_fields', None)
+    if fields is not None:
+        clone._fields = [render_structure(field, forms) for field in fields]
+
+    # Parsing drops the images without an url, a variable can render an empty one
+    for attr in EMBED_URL_ATTRS:
+        value = getattr(clone, attr, None)
+        if value is not None and not (value.get('url') or '').strip():
+            delattr(clone, attr)
+    for attr in EMBED_ICON_ATTRS:
+        value = getattr(clone, attr, None)
+        if value is not None and 'icon_url' in value and not (value['icon_url'] or '').strip():
+            value.pop('icon_url')
+            value.pop('proxy_icon_url', None)
+    return clone
+
+
 class GeneratorMessage:
     def __init__(self, data: Union[str, dict]) -> None:
         self.data = data
@@ -62,8 +181,41 @@ class GeneratorMessage:
             raise GenerateMessageError(content)
         return {'content': content}
 
-    @lru_cache()
+    def cache_key(self) -> Optional[Hashable]:
+        if isinstance(self.data, str):
+            return self.data
+        if isinstance(self.data, dict):
+            try:
+                return orjson.dumps(self.data, option=orjson.OPT_SORT_KEYS)
+            except TypeError:
+                return None
+        return None
+
+    @staticmethod
+    def clone_skeleton(skeleton: dict) -> dict:
+        ret = skeleton.copy()
+        ret['embeds'] = [clone_embed(embed) for embed in skeleton['embeds']]
+        if 'flags' in ret:
+            ret['flags'] = nextcord.MessageFlags._from_value(ret['flags'].value)
+        return ret
+
     def parse(self, with_empty: bool = False, with_webhook: bool = False, with_exception: bool = True):
+        key = self.cache_key()
+        if key is None:
+            skeleton = self.parse_skeleton(with_empty, with_webhook)
+        else:
+            key = (key, with_empty, with_webhook)
+            skeleton = skeleton_cache.get(key)
+            if skeleton is None:
+                skeleton = self.parse_skeleton(with_empty, with_webhook)
+                skeleton_cache.put(key, skeleton)
+
+        if isinstance(skeleton, int):
+            return self.get_error(skeleton, with_exception)
+        return self.clone_skeleton(skeleton)
+
+    def parse_skeleton(self, with_empty: bool = False, with_webhook: bool = False) -> Union[dict, int]:
+        "Returns the parsed message or the error status"
         data = self.decode_data()
         if isinstance(data, str):
             data = {'content': data}
@@ -78,9 +230,9 @@ class GeneratorMessage:
         avatar_url = data.pop('avatar_url', MISSING)
 
         if content is not MISSING and plain_text is not MISSING:
-            return self.get_error(5415, with_exception)
+            return 5415
         if embed is not MISSING and embeds is not MISSING:
-            return self.get_error(5410, with_exception)
+            return 5410
 
         ret = {}
         ret['content'] = content if content is not MISSING else plain_text if plain_text is not MISSING else None
@@ -94,7 +246,7 @@ class GeneratorMessage:
         if avatar_url is not MISSING and with_webhook:
             ret['avatar_url'] = avatar_url
         if with_empty and self.check_empty(ret):
-            return self.get_error(404, with_exception)
+            return 404
         return ret
 
     def parse_embed(self, data: dict):
@@ -151,6 +303,76 @@ def generate_message(content: str, *, with_empty: bool = False) -> dict:
     message = GeneratorMessage(content)
     return message.parse(with_empty)
 
+
+def parse_template(template: Union[str, dict], with_webhook: bool = False) -> Union[dict, int]:
+    """
+    Skeleton of a message template with its variables left in the texts,
+    PLAIN_TEMPLATE for a text that isn't JSON and TEXT_TEMPLATE
+    if its values have to be rendered before they are parsed.
+    """
+    if isinstance(template, str):
+        try:
+            template = orjson.loads(template)
+        except orjson.JSONDecodeError:
+            return PLAIN_TEMPLATE
+    if not isinstance(template, dict) or _has_parsed_variables(template):
+        return TEXT_TEMPLATE
+    # Parsing pops the keys of the nested embeds
+    return GeneratorMessage(copy.deepcopy(template)).parse_skeleton(with_webhook=with_webhook)
+
+
+def render_message(
+    template: Union[str, dict],
+    forms: dict,
+    *,
+    with_empty: bool = False,
+    with_webhook: bool = False,
+    with_exception: bool = True
+) -> dict:
+    """
+    The same as ``generate_message(lord_format(template, forms))``, but the
+    template is parsed once and only the variables are rendered on every call.
+    """
+    message = GeneratorMessage(template)
+    key = message.cache_key()
+    skeleton = None
+    if key is not None:
+        key = ('template', key, with_webhook)
+        skeleton = skeleton_cache.get(key)
+    if skeleton is None:
+        skeleton = parse_template(template, with_webhook)
+        if key is not None:
+            skeleton_cache.put(key, skeleton)
+
+    if skeleton == PLAIN_TEMPLATE:
+        # The flags of a plain text are applied as they are, ?&quote still escapes it
+        ret = {'content': lord_format(template, forms), 'embeds': []}
+        if with_empty and GeneratorMessage.check_empty(ret):
+            return message.get_error(404, with_exception)
+        return ret
+    if skeleton == TEXT_TEMPLATE:
+        rendered = GeneratorMessage(lord_format(template, forms))
+        skeleton = rendered.parse_skeleton(with_empty, with_webhook)
+        if isinstance(skeleton, int):
+            return rendered.get_error(skeleton, with_exception)
+        return skeleton
+    if isinstance(skeleton, int):
+        return message.get_error(skeleton, with_exception)
+
+    ret = skeleton.copy()
+    ret['content'] = render_structure(ret['content'], forms)
+    ret['embeds'] = [embed for embed in (render_embed(embed, forms) for embed in skeleton['embeds'])
+                     if embed]
+    if 'flags' in ret:
+        ret['flags'] = nextcord.MessageFlags._from_value(ret['flags'].value)
+    for key in ('username', 'avatar_url'):
+        if key in ret:
+            ret[key] = render_structure(ret[key], forms)
+
+    if with_empty and GeneratorMessage.check_empty(ret):
+        return message.get_error(404, with_exception)
+    return ret
+
 if __name__ == '__main__':
     embed_data = {
         "title": "Thumbnail Test",
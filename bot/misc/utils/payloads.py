@@ -1,6 +1,8 @@
 from datetime import datetime
-import inspect
-from typing import Optional, Dict, Any, Union, List, Tuple, Iterable, TYPE_CHECKING
+from functools import lru_cache, partial
+from operator import attrgetter
+from typing import (Optional, Dict, Any, Union, List, Tuple, Iterable, Iterator,
+                    Callable, ClassVar, TYPE_CHECKING)
 
 import nextcord
 
@@ -35,97 +37,206 @@ def parse_prefix(
 
 
 class TempletePayload:
+    """
+    Template variables declared once per class in ``_fields``,
+    field getters take the payload and are only called when the key is used.
+    """
     _prefix: Optional[str] = MISSING
     _as_prefix: bool = False
+    _fields: ClassVar[Dict[str, Callable[[Any], Any]]] = {}
+    _nested: Tuple['TempletePayload', ...] = ()
+
+    def __getattr__(self, name: str) -> Any:
+        getter = type(self)._fields.get(name)
+        if getter is None:
+            raise AttributeError(name)
+        return getter(self)
 
     def _get_prefix(self, prefix: Optional[str], name: str) -> str:
         return f"{prefix}.{name}" if prefix else name
 
-    def _to_dict(self):
+    def _resolvers(self) -> Iterator[Tuple[str, Callable[[], Any]]]:
         prefix = self._prefix if self._prefix is not MISSING else self.__class__.__name__
+        if self._as_prefix and prefix:
+            yield prefix, self.__str__
+        for key, getter in _field_keys(type(self), prefix):
+            yield key, partial(getter, self)
+        for payload in self._nested:
+            yield from payload._resolvers()
+
+    def _to_dict(self):
         base = {}
+        for key, resolver in self._resolvers():
+            value = resolver()
+            if isinstance(value, dict):
+                base.update(parse_prefix(key, value))
+                continue
+            base[key] = value
+        return base
 
-        if self._as_prefix:
-            base[prefix] = str(self)
 
-        for name, arg in inspect.getmembers(self):
-            if name.startswith("_"):
-                continue
+@lru_cache(maxsize=None)
+def _field_keys(cls: type, prefix: Optional[str]) -> Tuple[Tuple[str, Callable[[Any], Any]], ...]:
+    return tuple((f"{prefix}.{name}" if prefix else name, getter)
+                 for name, getter in cls._fields.items())
 
-            self_prefix = self._get_prefix(prefix, name)
-            if isinstance(arg, dict):
-                base.update(parse_prefix(self_prefix, arg))
-                continue
 
-            base[self_prefix] = arg
+class PayloadContext(dict):
+    """
+    Template context that holds payload fields as resolvers
+    and computes each value on its first lookup.
+    Iterating the context resolves every field.
+    """
 
-        return base
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._lazy: Dict[str, Callable[[], Any]] = {}
+
+    def add_payload(self, payload: TempletePayload) -> None:
+        for key, resolver in payload._resolvers():
+            dict.pop(self, key, None)
+            self._lazy[key] = resolver
+
+    def _resolve(self, key: str) -> Any:
+        value = self._lazy.pop(key)()
+        if isinstance(value, dict):
+            super().update(parse_prefix(key, value))
+        dict.__setitem__(self, key, value)
+        return value
+
+    def resolve_all(self) -> None:
+        for key in list(self._lazy):
+            self._resolve(key)
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._lazy:
+            return self._resolve(key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        if key in self._lazy:
+            return self._resolve(key)
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return dict.__contains__(self, key) or key in self._lazy
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._lazy.pop(key, None)
+        super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __len__(self) -> int:
+        return super().__len__() + len(self._lazy)
+
+    def __iter__(self):
+        self.resolve_all()
+        return super().__iter__()
+
+    def keys(self):
+        self.resolve_all()
+        return super().keys()
+
+    def values(self):
+        self.resolve_all()
+        return super().values()
+
+    def items(self):
+        self.resolve_all()
+        return super().items()
+
+    def copy(self) -> 'PayloadContext':
+        context = PayloadContext(dict.copy(self))
+        context._lazy = self._lazy.copy()
+        return context
 
 
 class StreamPayload(TempletePayload):
     _prefix = 'stream'
+    _fields = {
+        'username': attrgetter('_stream.user_name'),
+        'title': attrgetter('_stream.title'),
+        'gameName': attrgetter('_stream.game_name'),
+        'thumbnailUrl': attrgetter('_stream.thumbnail_url'),
+        'avatarUrl': attrgetter('_user.profile_image_url'),
+        'url': attrgetter('_stream.url'),
+    }
 
     def __init__(self, stream: 'TwStream', user: 'TwUser') -> None:
-        self.username = stream.user_name
-        self.title = stream.title
-        self.gameName = stream.game_name
-        self.thumbnailUrl = stream.thumbnail_url
-        self.avatarUrl = user.profile_image_url
-        self.url = stream.url
+        self._stream = stream
+        self._user = user
 
 
 class VideoPayload(TempletePayload):
     _prefix = 'video'
+    _fields = {
+        'username': attrgetter('_video.channel.name'),
+        'title': attrgetter('_video.title'),
+        'description': attrgetter('_video.description'),
+        'url': attrgetter('_video.url'),
+        'videoIcon': attrgetter('_video.thumbnail.url'),
+    }
 
     def __init__(self, video: 'YtVideo') -> None:
-        self.username = video.channel.name
-        self.title = video.title
-        self.description = video.description
-        self.url = video.url
-        self.videoIcon = video.thumbnail.url
+        self._video = video
 
 
 class GuildPayload(TempletePayload):
     _prefix = 'guild'
     _as_prefix = True
+    _fields = {
+        'color': lambda self: GuildDateBases(self._guild.id).get_cache('color'),
+        'id': attrgetter('_guild.id'),
+        'name': attrgetter('_guild.name'),
+        'memberCount': attrgetter('_guild.member_count'),
+        'createdAt': lambda self: self._guild.created_at.timestamp(),
+        'createdDt': lambda self: self._guild.created_at.isoformat(),
+        'premiumSubscriptionCount': attrgetter('_guild.premium_subscription_count'),
+        'icon': lambda self: self._guild.icon.url if self._guild.icon and self._guild.icon.url else None,
+    }
 
     def __init__(self, guild: nextcord.Guild) -> None:
-        gdb = GuildDateBases(guild.id)
-
-        self.color: int = gdb.get_cache('color')
-        self.id: int = guild.id
-        self.name: str = guild.name
-        self.memberCount: int = guild.member_count
-        self.createdAt: int = guild.created_at.timestamp()
-        self.createdDt: str = guild.created_at.isoformat()
-        self.premiumSubscriptionCount: int = guild.premium_subscription_count
-
-        self.icon = guild.icon.url if guild.icon and guild.icon.url else None
+        self._guild = guild
 
     def __str__(self) -> str:
-        return self.name
+        return self._guild.name
 
 
 class MemberPayload(TempletePayload):
     _prefix = 'member'
     _as_prefix = True
+    _fields = {
+        'id': attrgetter('_member.id'),
+        'mention': attrgetter('_member.mention'),
+        'username': attrgetter('_member.name'),
+        'name': attrgetter('_member.name'),
+        'displayName': attrgetter('_member.display_name'),
+        'discriminator': attrgetter('_member.discriminator'),
+        'tag': lambda self: f'{self._member.name}#{self._member.discriminator}',
+        'avatar': attrgetter('_member.display_avatar.url'),
+    }
 
     def __init__(self, member: nextcord.Member) -> None:
-        self.id: int = member.id
-        self.mention: str = member.mention
-        self.username: str = member.name
-        self.name: str = member.name
-        self.displayName: str = member.display_name
-        self.discriminator: str = member.discriminator
-        self.tag = f'{member.name}#{member.discriminator}'
-        self.avatar = member.display_avatar.url
+        self._member = member
 
     def __str__(self) -> str:
-        return self.mention
+        return self._member.mention
 
 
 class IdeaPayload(TempletePayload):
     _prefix = 'idea'
+    _fields = {
+        'content': attrgetter('content'),
+        'image': attrgetter('image'),
+        'reason': attrgetter('reason'),
+        'promotedCount': attrgetter('promotedCount'),
+        'demotedCount': attrgetter('demotedCount'),
+    }
 
     def __init__(
         self,
@@ -144,8 +255,8 @@ class IdeaPayload(TempletePayload):
 
         if moderator is not None:
             mod = MemberPayload(moderator)
-            mod._prefix = None
-            self.mod = mod._to_dict()
+            mod._prefix = 'idea.mod'
+            self._nested = (mod,)
 
 
 def get_payload(
@@ -160,7 +271,7 @@ def get_payload(
     ticket_count: Optional[dict] = None,
     voice_count: Optional[dict] = None,
     idea: Optional[IdeaPayload] = None
-) -> dict:
+) -> PayloadContext:
     bot_payload = None
     if guild is None and isinstance(member, nextcord.Member):
         guild = member.guild
@@ -169,22 +280,23 @@ def get_payload(
         bot_payload = MemberPayload(bot)
         bot_payload._prefix = 'bot'
 
-    data = {
-        'today_dt': datetime.today().isoformat(),
-        'todayDt': datetime.today().isoformat(),
-    }
+    today = datetime.today().isoformat()
+    data = PayloadContext({
+        'today_dt': today,
+        'todayDt': today,
+    })
     if member is not None:
-        data.update(MemberPayload(member)._to_dict())
+        data.add_payload(MemberPayload(member))
     if guild is not None:
-        data.update(GuildPayload(guild)._to_dict())
+        data.add_payload(GuildPayload(guild))
     if stream and user:
-        data.update(StreamPayload(stream, user)._to_dict())
+        data.add_payload(StreamPayload(stream, user))
     if video:
-        data.update(VideoPayload(video)._to_dict())
+        data.add_payload(VideoPayload(video))
     if bot_payload:
-        data.update(bot_payload._to_dict())
+        data.add_payload(bot_payload)
     if idea:
-        data.update(idea._to_dict())
+        data.add_payload(idea)
     if voice_count:
         data.update(parse_prefix('voice.count', voice_count))
     if inputs:
@@ -1,18 +1,33 @@
 import re
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import orjson
 
+TEMPLATE_CACHE_SIZE = 2048
+
 available_flags: Dict[str, Callable[[str], str]] = {
     'upper': lambda s: s.upper(),
     'lower': lambda s: s.lower(),
     'quote': lambda s: s.replace('"', '\\"').replace('\n', '\\n')
 }
+# Values of structured templates are not embedded into JSON text, there is nothing to escape
+structured_flags: Dict[str, Callable[[str], str]] = {
+    **available_flags,
+    'quote': lambda s: s
+}
+
+REGEXP_EXPRESSION = re.compile(r'{%\s*(.*?)\s*=>\s*(.*?)\s*%}')
+REGEXP_VARIABLE = re.compile(
+    r'{\s*([a-zA-Z0-9\.\-=_]+(?:\?&[a-zA-Z0-9]+)*)(?:\s*\|\s*([^{}]*))?\s*}'
+)
+
 
 def _strip_quotes(text: str) -> str:
     """Удаляет кавычки и пробелы"""
     return text.strip().strip('"\'') if isinstance(text, str) else text
 
+
 def flatten_dict(data: dict, prefix: str = ''):
     new_data = {}
     for k, v in data.items():
@@ -23,14 +38,153 @@ def flatten_dict(data: dict, prefix: str = ''):
     return new_data
 
 
+def get_value(key: str, data: Dict[str, Any]) -> Any:
+    if key in data:
+        return data[key]
+    value = data
+    for part in key.split('.'):
+        if isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+        if value is None:
+            break
+    return value
+
+
+def _get_leaf(key: str, data: Dict[str, Any]) -> Any:
+    "Value as it would be found in the flattened data"
+    value = get_value(key, data)
+    return None if isinstance(value, dict) else value
+
+
+class Condition:
+    __slots__ = ('var', 'operator', 'expected')
+
+    def __init__(self, condition: str) -> None:
+        condition = condition.strip()
+        self.operator = None
+        self.expected = None
+
+        for operator in ('==', '!='):
+            if operator in condition:
+                var, val = map(str.strip, condition.split(operator, 1))
+                self.var = var
+                self.operator = operator
+                self.expected = _strip_quotes(val)
+                break
+        else:
+            self.var = condition
+
+    def evaluate(self, data: Dict[str, Any]) -> bool:
+        value = _get_leaf(self.var, data)
+        if self.operator == '==':
+            return str(value) == self.expected
+        if self.operator == '!=':
+            return str(value) != self.expected
+        return bool(value)
+
+
+class Variable:
+    __slots__ = ('key', 'default', 'flags')
+
+    def __init__(self, name: str, default: Optional[str]) -> None:
+        key, *flags = name.split('?&')
+        self.key = key
+        self.flags = [flag for flag in flags if flag]
+        self.default = _strip_quotes(default.strip()) if default else None
+
+    def render(self, data: Dict[str, Any], flags: Dict[str, Callable[[str], str]]) -> str:
+        value = get_value(self.key, data)
+
+        if isinstance(value, dict) or value in (None, '', []):
+            value = self.default
+        else:
+            for flag in self.flags:
+                execute = flags.get(flag)
+                if execute is not None:
+                    value = execute(str(value))
+
+        return str(value) if value is not None else ''
+
+
+class Expression:
+    "{% условие => значение || дефолт %}, the chosen text may hold variables"
+    __slots__ = ('condition', 'value', 'default')
+
+    def __init__(self, condition: str, result: str) -> None:
+        self.condition = Condition(condition)
+        if '||' in result:
+            value, default = map(_strip_quotes, result.split('||', 1))
+        else:
+            value, default = _strip_quotes(result), None
+        self.value = compile_variables(value)
+        self.default = compile_variables(default or '')
+
+    def render(self, data: Dict[str, Any], flags: Dict[str, Callable[[str], str]]) -> str:
+        if self.condition.evaluate(data):
+            return self.value.render(data, flags)
+        return self.default.render(data, flags)
+
+
+class CompiledTemplate:
+    """
+    Template split once into literal text and nodes,
+    rendering is a single join over the parts.
+    """
+    __slots__ = ('parts',)
+
+    def __init__(self, parts: List[Union[str, Variable, Expression]]) -> None:
+        self.parts = parts
+
+    def render(
+        self,
+        data: Dict[str, Any],
+        flags: Dict[str, Callable[[str], str]] = available_flags
+    ) -> str:
+        return ''.join([part if isinstance(part, str) else part.render(data, flags)
+                        for part in self.parts])
+
+
+def _split_variables(text: str) -> List[Union[str, Variable]]:
+    parts = []
+    pos = 0
+    for match in REGEXP_VARIABLE.finditer(text):
+        if match.start() > pos:
+            parts.append(text[pos:match.start()])
+        parts.append(Variable(match.group(1), match.group(2)))
+        pos = match.end()
+    if pos < len(text):
+        parts.append(text[pos:])
+    return parts
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_variables(template: str) -> CompiledTemplate:
+    "Compiles only the {variable} placeholders"
+    return CompiledTemplate(_split_variables(template))
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str) -> CompiledTemplate:
+    "Compiles the expressions and the variables of the template"
+    parts = []
+    pos = 0
+    for match in REGEXP_EXPRESSION.finditer(template):
+        parts.extend(_split_variables(template[pos:match.start()]))
+        parts.append(Expression(*match.groups()))
+        pos = match.end()
+    parts.extend(_split_variables(template[pos:]))
+    return CompiledTemplate(parts)
+
+
 class ExpressionTemplate:
     def __init__(self, context: dict):
         self.context = flatten_dict(context)
 
     def render(self, template: str) -> str:
         """Основной метод рендеринга шаблона"""
-        pattern = r'{%\s*(.*?)\s*=>\s*(.*?)\s*%}'
-        return re.sub(pattern, self._process_match, template)
+        return REGEXP_EXPRESSION.sub(self._process_match, template)
 
     def _process_match(self, match: re.Match) -> str:
         """Обработка выражения {% условие => значение || дефолт %}"""
@@ -45,16 +199,7 @@ class ExpressionTemplate:
 
     def _eval_condition(self, condition: str) -> bool:
         """Оценивает логическое условие"""
-        condition = condition.strip()
-
-        if '==' in condition:
-            var, val = map(str.strip, condition.split('==', 1))
-            return str(self.context.get(var)) == _strip_quotes(val)
-        elif '!=' in condition:
-            var, val = map(str.strip, condition.split('!=', 1))
-            return str(self.context.get(var)) != _strip_quotes(val)
-        else:
-            return bool(self.context.get(condition))
+        return Condition(condition).evaluate(self.context)
 
     def _parse_variable_with_default(self, result: str) -> Tuple[str, Optional[str]]:
         """Извлекает переменную и дефолтное значение из выражения"""
@@ -63,17 +208,14 @@ class ExpressionTemplate:
             return value, default
         return _strip_quotes(result), None
 
+
 class LordTemplate:
-    REGEXP_FORMAT = re.compile(
-        r'{\s*([a-zA-Z0-9\.\-=_]+(?:\?&[a-zA-Z0-9]+)*)(?:\s*\|\s*([^{}]*))?\s*}'
-    )
-    
-    
+    REGEXP_FORMAT = REGEXP_VARIABLE
+
     def findall(self, string: str) -> List[Tuple[str, str]]:
-        return [(match.group(0), f"{match.group(1)}{' | ' + match.group(2) if match.group(2) else ''}") 
+        return [(match.group(0), f"{match.group(1)}{' | ' + match.group(2) if match.group(2) else ''}")
                 for match in self.REGEXP_FORMAT.finditer(string)]
 
-
     def execute_flags(self, value: str, flags: List[str]):
         for flag in flags:
             execute = available_flags.get(flag)
@@ -82,69 +224,53 @@ class LordTemplate:
             value = execute(value)
         return value
 
-    def parse_flag(self, name: str):
-        pattern = r'(\?&([a-zA-Z0-9]|\?&)+)$'
-        flags = []
+    def parse_flag(self, name: str) -> Tuple[str, List[str]]:
+        name, *flags = name.split('?&')
+        return name, [flag for flag in flags if flag]
 
-        results = re.findall(pattern, name)
-        if results:
-            flags = list(filter(bool, results[0][0].split('?&')))
-            name = name.removesuffix(results[0][0])
-        return name, flags
-
-    def parse_key(self, var: str) -> Tuple[str, Optional[str]]:
+    def parse_key(self, var: str) -> Tuple[str, Optional[str], List[str]]:
         name, *default = [part.strip() for part in var.split('|', 1)]
-        if len(default) == 0:
-            default = None
-        else:
-            default = _strip_quotes(default[0])
-        name, flags = self.parse_flag(name)
-        return name, default, flags
-
-    def get_value(self, key: str, data: Dict[str, Any]) -> Any:
-        if key in data:
-            return data[key]
-        parts = key.split('.')
-        value = data
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return None
-            if value is None:
-                break
-        return value
+        variable = Variable(name, default[0] if default else None)
+        return variable.key, variable.default, variable.flags
 
-    def parse_value(self, variables: List[Tuple[str, str]], forms: Dict[str, Any]) -> Dict[str, Any]:
+    def parse_value(self, variables: List[Tuple[str, str]], forms: Dict[str, Any]) -> Dict[str, str]:
         result = {}
         for original, var in variables:
-            key, default, flags = self.parse_key(var)
-            value = self.get_value(key, forms)
-
-            if isinstance(value, dict):
-                result[original] = default
-            elif value not in (None, '', []):
-                value = self.execute_flags(value, flags)
-                result[original] = value
-            else:
-                result[original] = default
+            name, *default = [part.strip() for part in var.split('|', 1)]
+            result[original] = Variable(name, default[0] if default else None).render(
+                forms, available_flags)
         return result
 
+    def get_value(self, key: str, data: Dict[str, Any]) -> Any:
+        return get_value(key, data)
+
     def render(self, template: str, data: Dict[str, Any]) -> str:
-        variables = self.findall(template)
-        values = self.parse_value(variables, data)
-        for original, replacement in values.items():
-            template = template.replace(original, str(
-                replacement) if replacement is not None else '')
-        return template
+        return compile_variables(template).render(data)
+
+
+def render_structure(node: Any, forms: dict) -> Any:
+    "Renders every string of a decoded message template in place of its JSON text"
+    if isinstance(node, str):
+        if '{' not in node:
+            return node
+        return compile_template(node).render(forms, structured_flags)
+    if isinstance(node, dict):
+        return {key: render_structure(value, forms) for key, value in node.items()}
+    if isinstance(node, list):
+        return [render_structure(value, forms) for value in node]
+    return node
 
 
-def lord_format(string: Any, forms: dict) -> str:
+def lord_format(string: Any, forms: dict) -> Union[str, dict]:
+    """
+    Dict message templates are rendered node by node and returned as a dict,
+    which :func:`generate_message` accepts without parsing JSON again.
+    """
+    if isinstance(string, dict):
+        return render_structure(string, forms)
     if not isinstance(string, str):
         string = orjson.dumps(string).decode()
-    string = ExpressionTemplate(forms).render(string)
-    result = LordTemplate().render(string, forms)
-    return result
+    return compile_template(string).render(forms)
 
 
 if __name__ == "__main__":
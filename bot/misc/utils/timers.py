@@ -1,11 +1,20 @@
 import asyncio
+import heapq
 import logging
-from typing import Coroutine, Dict, Optional, Union
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple, Union
 from asyncio import TimerHandle
 from dataclasses import dataclass, field
 
+from bot.databases.models import TimerJobModel
+
 _log = logging.getLogger(__name__)
 
+# Persistent jobs due within this window are kept in memory
+ARM_WINDOW = 60 * 60
+
+JobHandler = Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]
+
 
 class LordTimerHandler:
     def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
@@ -59,6 +68,14 @@ class LordTimeHandler:
         self.loop = loop
         self.data: Dict[Union[str, int], ItemLordTimeHandler] = {}
 
+        # Persistent jobs: kind -> handler, and the armed window
+        self.kinds: Dict[str, JobHandler] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._armed: Dict[str, Tuple[float, str, Dict[str, Any]]] = {}
+        self._window_end = 0.0
+        self._wakeup_handle: Optional[TimerHandle] = None
+        self._started = False
+
     def create(self, delay: float, coro: Coroutine, key: Union[str, int]) -> ItemLordTimeHandler:
         _log.debug('Create new temp task %s (%s)', coro.__name__, key)
         ilth = ItemLordTimeHandler(delay, coro, key)
@@ -98,3 +115,127 @@ class LordTimeHandler:
 
     def get(self, key: Union[str, int]) -> Optional[ItemLordTimeHandler]:
         return self.data.get(key)
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        "Sets the coroutine function that completes the persistent jobs of the kind"
+        self.kinds[kind] = handler
+
+    async def schedule(
+        self,
+        kind: str,
+        key: str,
+        due_at: float,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Stores a job that survives restarts. A job with the same key is replaced.
+        Only jobs due within the armed window are kept in memory.
+        """
+        payload = payload or {}
+        await TimerJobModel.update_or_create(
+            key=key,
+            defaults={'kind': kind, 'due_at': due_at, 'payload': payload}
+        )
+        _log.debug('Schedule persistent job %s (%s)', kind, key)
+
+        self._armed.pop(key, None)
+        if self._started and due_at < self._window_end:
+            self._push(key, due_at, kind, payload)
+            self._arm()
+
+    async def cancel(self, key: str) -> bool:
+        self._armed.pop(key, None)
+        return bool(await TimerJobModel.filter(key=key).delete())
+
+    async def reschedule(self, key: str, due_at: float) -> bool:
+        job = await TimerJobModel.get_or_none(key=key)
+        if job is None:
+            return False
+        await self.schedule(job.kind, key, due_at, job.payload)
+        return True
+
+    async def start(self) -> None:
+        "Loads the jobs of the first window, one indexed range query"
+        if self._started:
+            return
+        self._started = True
+        await self._refill()
+
+    def _push(self, key: str, due_at: float, kind: str, payload: Dict[str, Any]) -> None:
+        self._armed[key] = (due_at, kind, payload)
+        heapq.heappush(self._heap, (due_at, key))
+
+    async def _refill(self) -> None:
+        window_end = time.time() + ARM_WINDOW
+        try:
+            jobs = await TimerJobModel.filter(due_at__lt=window_end)
+        except Exception as exc:
+            _log.error('Failed to load persistent jobs', exc_info=exc)
+            self._window_end = time.time() + 60
+            self._arm()
+            return
+
+        self._window_end = window_end
+        for job in jobs:
+            # Jobs scheduled while the query was running are already armed
+            if self._armed.get(job.key, (None,))[0] != job.due_at:
+                self._push(job.key, job.due_at, job.kind, job.payload)
+
+        _log.debug('Armed %d persistent jobs until %.0f',
+                   len(jobs), self._window_end)
+        self._arm()
+
+    def _arm(self) -> None:
+        "Sets the single timer handle to the next due job or to the end of the window"
+        if self._wakeup_handle is not None:
+            self._wakeup_handle.cancel()
+
+        # Drop cancelled and replaced jobs from the top of the heap
+        while self._heap and self._armed.get(self._heap[0][1], (None,))[0] != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        when = min(self._heap[0][0], self._window_end) if self._heap else self._window_end
+        self._wakeup_handle = self.loop.call_later(
+            max(when - time.time(), 0), self._wakeup)
+
+    def _wakeup(self) -> None:
+        self._wakeup_handle = None
+        now = time.time()
+
+        while self._heap and self._heap[0][0] <= now:
+            due_at, key = heapq.heappop(self._heap)
+            job = self._armed.get(key)
+            if job is None or job[0] != due_at:
+                continue
+            del self._armed[key]
+            self.loop.create_task(self._run_job(key, due_at, job[1], job[2]), name=key)
+
+        if now >= self._window_end:
+            self.loop.create_task(self._refill())
+        else:
+            self._arm()
+
+    async def _run_job(self, key: str, due_at: float, kind: str, payload: Dict[str, Any]) -> None:
+        handler = self.kinds.get(kind)
+        if handler is None:
+            _log.warning('No handler for persistent job %s (%s)', kind, key)
+            return
+
+        # The row is removed first: a job that was cancelled or rescheduled
+        # meanwhile is not found, and a failing job is not repeated after every restart
+        if not await TimerJobModel.filter(key=key, due_at=due_at).delete():
+            return
+
+        _log.debug('Complete persistent job %s (%s)', kind, key)
+        try:
+            await handler(payload)
+        except Exception as exc:
+            _log.error('Persistent job %s (%s) failed', kind, key, exc_info=exc)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_memory': len(self.data),
+            'armed': len(self._armed),
+            'window_end': self._window_end,
+            'kinds': sorted(self.kinds),
+        }
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import asyncio
 import nextcord
-import time
 from typing import TYPE_CHECKING, Optional
 from bot.databases.handlers.guildHD import GuildDateBases
 from bot.languages import i18n
@@ -231,10 +230,11 @@ class GiveawaySettingsView(nextcord.ui.View):
         ), name=f'giveaway:delete:{interaction.message.id}')
         giveaway = await misc_giveaway.Giveaway.create_as_config(interaction.guild, self.giveaway_config)
         await giveaway.fetch_giveaway_data()
-        interaction.client.lord_handler_timer.create(
-            giveaway.giveaway_data.get('date_end')-time.time(),
-            giveaway.complete(),
-            f'giveaway:{giveaway.message_id}'
+        await interaction.client.lord_handler_timer.schedule(
+            'giveaway',
+            f'giveaway:{giveaway.message_id}',
+            giveaway.giveaway_data.get('date_end'),
+            {'guild_id': interaction.guild_id, 'message_id': giveaway.message_id}
         )
 
     @nextcord.ui.button(label="Prize", style=nextcord.ButtonStyle.grey)
@@ -266,8 +266,8 @@ class GiveawayConfirmView(nextcord.ui.View):
         if not await self.giveaway.check_participation(interaction.user.id):
             return
 
-        await self.giveaway.demote_participant(interaction.user.id)
-        await self.giveaway.update_message()
+        if await self.giveaway.demote_participant(interaction.user.id):
+            self.giveaway.schedule_update()
 
 
 class GiveawayView(nextcord.ui.View):
@@ -288,6 +288,5 @@ class GiveawayView(nextcord.ui.View):
                                                     ephemeral=True)
             return
 
-        await giveaway.promote_participant(interaction.user.id)
-
-        await giveaway.update_message()
+        if await giveaway.promote_participant(interaction.user.id):
+            giveaway.schedule_update()
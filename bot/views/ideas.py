@@ -1,23 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
 from dataclasses import dataclass
 import logging
 import nextcord
 import time
 
-from typing import Dict, List, Literal, Optional, Union, Tuple
+from typing import Dict, Literal, Optional, Union, Tuple
 
 import re
 import jmespath
 import nextcord.state
 from bot.misc.plugins import logstool
 from bot.misc.time_transformer import display_time
-from bot.misc.utils import AsyncSterilization, IdeaPayload, generate_message, get_payload, lord_format
+from bot.misc.utils import AsyncSterilization, IdeaPayload, render_message, get_payload, lord_format
 
 from bot.databases.varstructs import (ButtonPayload, IdeasPayload, IdeasReactionsPayload,
                                       IdeasReactionSystem as ReactionSystemType, IdeasSuggestSystem)
-from bot.databases import GuildDateBases
+from bot.databases import GuildDateBases, IdeaVotesDB
 from bot.databases.datastore import DataStore
+from bot.databases.handlers.ideasHD import DEMOTE, PROMOTE, Vote
 from bot.languages import i18n
 from bot.resources.info import (
     DEFAULT_IDEAS_ALLOW_IMAGE,
@@ -36,6 +39,15 @@ MessageType = Literal['reject', 'deny', 'accept', 'approved']
 
 timeout_data: Dict[int, Dict[int, float]] = {}
 
+VOTES_REFRESH_DELAY = 2
+# message id -> pending refresh of the vote counters and the last voter
+_refresh_tasks: Dict[int, asyncio.Task] = {}
+_refresh_voters: Dict[int, nextcord.Member] = {}
+
+LEGACY_VOTES_CHECKED_SIZE = 10_000
+# Ideas whose votes kept in the idea data by older versions were already imported
+_legacy_votes_checked: OrderedDict[int, None] = OrderedDict()
+
 
 @dataclass
 class BanData:
@@ -81,8 +93,7 @@ def _get_message(type: MessageType, locale: str, payload: dict, reason: str, ide
     ):
         message_data = ideas_data.get(
             'messages', DEFAULT_IDEAS_MESSAGES).get(type)
-    return generate_message(lord_format(message_data,
-                                        payload))
+    return render_message(message_data, payload)
 
 
 def get_payload_idea(
@@ -121,6 +132,78 @@ class Timeout:
         return timeout and time.time() > timeout
 
 
+async def get_idea_votes(message_id: int, idea_data: Optional[dict] = None) -> IdeaVotesDB:
+    votes = IdeaVotesDB(message_id)
+    if message_id in _legacy_votes_checked:
+        return votes
+
+    mdb = DataStore('ideas')
+    if idea_data is None:
+        idea_data = await mdb.get(message_id, {})
+    if 'promoted' in idea_data or 'demoted' in idea_data:
+        await votes.import_lists(idea_data.pop('promoted', []),
+                                 idea_data.pop('demoted', []))
+        await mdb.set(message_id, idea_data)
+
+    _legacy_votes_checked[message_id] = None
+    while len(_legacy_votes_checked) > LEGACY_VOTES_CHECKED_SIZE:
+        _legacy_votes_checked.popitem(last=False)
+    return votes
+
+
+async def delete_idea(message_id: int) -> bool:
+    "Removes the data and the votes of a deleted idea message, False if it isn't an idea"
+    if not await DataStore('ideas').delete(message_id):
+        return False
+    _legacy_votes_checked.pop(message_id, None)
+    cancel_votes_refresh(message_id)
+    await IdeaVotesDB(message_id).clear()
+    return True
+
+
+def schedule_votes_refresh(message: nextcord.Message, voter: nextcord.Member) -> None:
+    "Votes that arrive during the delay are shown with a single message edit"
+    _refresh_voters[message.id] = voter
+    if message.id in _refresh_tasks:
+        return
+    _refresh_tasks[message.id] = asyncio.create_task(
+        _refresh_votes(message), name=f'ideas:votes:{message.id}')
+
+
+def cancel_votes_refresh(message_id: int) -> None:
+    "Drops the pending refresh of a closed or deleted idea"
+    task = _refresh_tasks.pop(message_id, None)
+    _refresh_voters.pop(message_id, None)
+    if task is not None:
+        task.cancel()
+
+
+async def _refresh_votes(message: nextcord.Message) -> None:
+    try:
+        await asyncio.sleep(VOTES_REFRESH_DELAY)
+    finally:
+        # A cancelled refresh may already be replaced by a newer one
+        if _refresh_tasks.get(message.id) is asyncio.current_task():
+            del _refresh_tasks[message.id]
+    voter = _refresh_voters.pop(message.id, None)
+
+    try:
+        gdb = GuildDateBases(message.guild.id)
+        ideas_data: IdeasPayload = await gdb.get('ideas')
+        promoted, demoted = await IdeaVotesDB(message.id).get_counts()
+
+        view = await ReactionConfirmView(message.guild)
+        payload = get_payload_idea(voter, None, None, promoted, demoted)
+        view.change_votes(ideas_data, payload)
+
+        await message.edit(view=view)
+    except nextcord.NotFound:
+        _log.debug('Idea message %s is gone, votes are not refreshed', message.id)
+    except nextcord.HTTPException as exc:
+        _log.warning('Failed to refresh the votes of idea %s',
+                     message.id, exc_info=exc)
+
+
 def get_reactions(locale: str, ideas_data: IdeasPayload) -> Tuple[ReactionSystemType, Optional[IdeasReactionsPayload]]:
     DEFAULT_IDEAS_REACTIONS = get_default_payload(locale)['reactions']
     return (ideas_data.get('reaction_system', ReactionSystemType.REACTIONS),
@@ -200,7 +283,7 @@ class VotingModal(nextcord.ui.Modal):
                 pass
 
     @staticmethod
-    def get_counts(locale: str, msg: nextcord.Message, idea_data: dict, ideas_data: IdeasPayload) -> Tuple[int, int]:
+    async def get_counts(locale: str, msg: nextcord.Message, idea_data: dict, ideas_data: IdeasPayload) -> Tuple[int, int]:
         reaction_type, reactions = get_reactions(locale, ideas_data)
         if reaction_type == ReactionSystemType.REACTIONS:
             rs = nextcord.utils.get(msg.reactions, emoji=reactions['success'])
@@ -208,8 +291,11 @@ class VotingModal(nextcord.ui.Modal):
             rc = nextcord.utils.get(msg.reactions, emoji=reactions['crossed'])
             demoted = rc.count if rc else 0
         elif reaction_type == ReactionSystemType.BUTTONS:
-            promoted = len(idea_data.get('promoted', []))
-            demoted = len(idea_data.get('demoted', []))
+            counts = idea_data.get('votes')
+            if counts is None:
+                votes = await get_idea_votes(msg.id, idea_data)
+                counts = await votes.get_counts()
+            promoted, demoted = counts
 
         return promoted, demoted
 
@@ -227,9 +313,11 @@ class VotingModal(nextcord.ui.Modal):
             'idea'), idea_data.get('image'), idea_data.get('user_id')
         idea_author = interaction.guild.get_member(idea_author_id)
 
+        # The closed view must not be overwritten by a pending refresh of the votes
+        cancel_votes_refresh(interaction.message.id)
+        counts = await self.get_counts(self.locale, interaction.message, idea_data, ideas_data)
         payload = get_payload_idea(idea_author, idea_content, idea_image,
-                                   *self.get_counts(self.locale, interaction.message, idea_data, ideas_data),
-                                   interaction.user, reason)
+                                   *counts, interaction.user, reason)
 
         await self.process_send_messages(interaction, idea_data, ideas_data, payload, reason)
         if self.voting_type == 'accept':
@@ -240,6 +328,11 @@ class VotingModal(nextcord.ui.Modal):
         await self.process_delete_thread(ideas_data, interaction.message.thread)
         await self.process_delete_dnd_message(ideas_data, idea_data, interaction._state)
 
+        # The voting is closed, a later revote shows the counts it ended with
+        idea_data['votes'] = list(counts)
+        await mdb.set(interaction.message.id, idea_data)
+        await IdeaVotesDB(interaction.message.id).clear()
+
 
 @AsyncSterilization
 class ConfirmModal(VotingModal):
@@ -412,9 +505,6 @@ class ConfirmView(nextcord.ui.View):
 
 @AsyncSterilization
 class ReactionConfirmView(nextcord.ui.View):
-    promoted_data: List[int]
-    demoted_data: List[int]
-
     async def __init__(self, guild: Optional[nextcord.Guild] = None):
         super().__init__(timeout=None)
 
@@ -442,71 +532,23 @@ class ReactionConfirmView(nextcord.ui.View):
     def change_votes(self, ideas_data: IdeasPayload, payload: dict) -> None:
         refresh_view(self, self.locale, ideas_data, payload)
 
-    async def save_data(self, message_id) -> None:
-        mdb = DataStore('ideas')
-        idea_data = await mdb.get(message_id)
-        idea_data.update({
-            'promoted': self.promoted_data,
-            'demoted': self.demoted_data
-        })
-        await mdb.set(message_id, idea_data)
+    async def vote(self, interaction: nextcord.Interaction, vote: Vote) -> None:
+        await interaction.response.defer()
 
-    async def load_data(self, guild_id: int, message_id: int) -> None:
-        gdb = GuildDateBases(guild_id)
-        self.locale = await gdb.get('language')
+        votes = await get_idea_votes(interaction.message.id)
+        await votes.toggle(interaction.user.id, vote)
 
-        mdb = DataStore('ideas')
-        idea_data = await mdb.get(message_id)
-        self.promoted_data = idea_data.get('promoted', [])
-        self.demoted_data = idea_data.get('demoted', [])
+        schedule_votes_refresh(interaction.message, interaction.user)
 
     @nextcord.ui.button(label="0", emoji="👍", row=1, custom_id="reactions-ideas-confirm:promote")
     async def promote(self, button: nextcord.ui.Button,
                       interaction: nextcord.Interaction):
-        await interaction.response.defer()
-        await self.load_data(interaction.guild_id, interaction.message.id)
-
-        gdb = GuildDateBases(interaction.guild.id)
-        ideas_data: IdeasPayload = await gdb.get('ideas')
-
-        if interaction.user.id in self.promoted_data:
-            self.promoted_data.remove(interaction.user.id)
-        elif interaction.user.id in self.demoted_data:
-            self.demoted_data.remove(interaction.user.id)
-            self.promoted_data.append(interaction.user.id)
-        else:
-            self.promoted_data.append(interaction.user.id)
-
-        payload = get_payload_idea(interaction.user, None, None, len(
-            self.promoted_data), len(self.demoted_data))
-        self.change_votes(ideas_data, payload)
-
-        await self.save_data(interaction.message.id)
-        await interaction.message.edit(view=self)
+        await self.vote(interaction, PROMOTE)
 
     @nextcord.ui.button(label="0", emoji="👎", row=1, custom_id="reactions-ideas-confirm:demote")
     async def demote(self, button: nextcord.ui.Button,
                      interaction: nextcord.Interaction):
-        await interaction.response.defer()
-        await self.load_data(interaction.guild_id, interaction.message.id)
-
-        gdb = GuildDateBases(interaction.guild.id)
-        ideas_data: IdeasPayload = await gdb.get('ideas')
-
-        if interaction.user.id in self.demoted_data:
-            self.demoted_data.remove(interaction.user.id)
-        elif interaction.user.id in self.promoted_data:
-            self.promoted_data.remove(interaction.user.id)
-            self.demoted_data.append(interaction.user.id)
-        else:
-            self.demoted_data.append(interaction.user.id)
-
-        payload = get_payload_idea(interaction.user, None, None, len(
-            self.promoted_data), len(self.demoted_data))
-        self.change_votes(ideas_data, payload)
-
-        await self.save_data(interaction.message.id)
-        await interaction.message.edit(view=self)
+        await self.vote(interaction, DEMOTE)
 
     @nextcord.ui.button(label="Approve",
                         style=nextcord.ButtonStyle.green,
@@ -611,8 +653,8 @@ class IdeaModal(nextcord.ui.Modal):
         DEFAULT_IDEAS_MESSAGES = get_default_payload(self.locale)['messages']
         created_message_data = ideas_data.get(
             'messages', DEFAULT_IDEAS_MESSAGES).get('created')
-        created_message = generate_message(lord_format(created_message_data,
-                                                       payload))
+        created_message = render_message(created_message_data,
+                                         payload)
 
         mes = await self.get_message(self.locale, ideas_data, channel, created_message)
         await self.create_thread(self.locale, mes, ideas_data, payload)
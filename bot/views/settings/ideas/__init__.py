@@ -7,7 +7,7 @@ from bot.resources.info import DEFAULT_IDEAS_NAMES, DEFAULT_IDEAS_NAMES_RU, DEFA
 from bot.views.settings._view import DefaultSettingsView
 from bot.views.settings.ideas.distribution.base import FunctionOptionItem, ViewOptionItem
 from bot.views.settings.ideas.embeds import get_embed
-from bot.misc.utils import AsyncSterilization, generate_message, get_payload, lord_format
+from bot.misc.utils import AsyncSterilization, render_message, get_payload
 from bot.views.ideas import IdeaView, get_default_payload
 from .distribution import distrubuters
 
@@ -164,8 +164,8 @@ class IdeasView(DefaultSettingsView):
 
         view = await IdeaView(interaction.guild)
         suggestion_message_data = ideas.get('messages').get('suggestion')
-        suggestion_message = generate_message(lord_format(suggestion_message_data,
-                                                          get_payload(guild=interaction.guild)))
+        suggestion_message = render_message(suggestion_message_data,
+                                            get_payload(guild=interaction.guild))
         message_suggest = await suggestion_channel.send(**suggestion_message, view=view)
         message_suggest_id = message_suggest.id
 
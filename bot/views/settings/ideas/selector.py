@@ -1,7 +1,7 @@
 from typing import Optional
 import nextcord
 
-from bot.misc.utils import AsyncSterilization, generate_message, get_payload, lord_format
+from bot.misc.utils import AsyncSterilization, render_message, get_payload
 from bot.views.ideas import IdeaView, get_default_payload
 from bot.resources.info import DEFAULT_IDEAS_PAYLOAD, DEFAULT_IDEAS_PAYLOAD_RU
 
@@ -127,8 +127,8 @@ class IdeasSelectorView(DefaultSettingsView):
             view = await IdeaView(interaction.guild)
 
             suggestion_message_data = data.get('messages').get('suggestion')
-            suggestion_message = generate_message(lord_format(suggestion_message_data,
-                                                              get_payload(guild=interaction.guild)))
+            suggestion_message = render_message(suggestion_message_data,
+                                                get_payload(guild=interaction.guild))
             message_suggest = await self.selected_suggest.send(**suggestion_message, view=view)
             message_suggest_id = message_suggest.id
         else:
@@ -6,7 +6,7 @@ import nextcord
 from bot.databases.handlers.guildHD import GuildDateBases
 from bot.languages import i18n
 from bot.misc.lordbot import LordBot
-from bot.misc.utils import AsyncSterilization, generate_message, get_payload, lord_format
+from bot.misc.utils import AsyncSterilization, render_message, get_payload
 from bot.views.information_dd import get_info_dd
 from bot.views.settings import notification
 from bot.views.settings._view import DefaultSettingsView
@@ -137,8 +137,7 @@ class FarewellView(DefaultSettingsView):
 
         payload = get_payload(member=interaction.user)
 
-        message_format = lord_format(message, payload)
-        data = generate_message(message_format)
+        data = render_message(message, payload)
         await interaction.response.send_message(**data, ephemeral=True)
 
     @nextcord.ui.button(label='Change message', style=nextcord.ButtonStyle.blurple, row=1)
@@ -176,13 +176,11 @@ class WelcomerView(DefaultSettingsView):
         greeting_message: dict = await self.gdb.get('greeting_message')
         content: str = greeting_message.get('message')
         payload = utils.get_payload(member=interaction.user)
-        message_format = utils.lord_format(content, payload)
-        message_data = utils.generate_message(message_format)
+        message_data = utils.render_message(content, payload)
 
         content: str = greeting_message.get('message')
 
-        message_format = utils.lord_format(content, payload)
-        message_data = utils.generate_message(message_format)
+        message_data = utils.render_message(content, payload)
 
         if (image_config := greeting_message.get('image')) and isinstance(image_config, dict):
             wig = WelcomeImageGenerator(
@@ -266,20 +266,27 @@ class YoutubeItemView(nextcord.ui.View):
     @nextcord.ui.button(label='Save changes', style=nextcord.ButtonStyle.green, row=1, disabled=True)
     async def save(self, button: nextcord.ui.Button, interaction: nextcord.Interaction[LordBot]):
         gdb = GuildDateBases(interaction.guild_id)
+        youtube_data = await gdb.get('youtube_notification')
+        previous_id = youtube_data.get(self.selected_id, {}).get('yt_id')
         await gdb.set_on_json('youtube_notification', self.selected_id, self.data)
 
         await interaction.client.ytnoti.add_channel(interaction.guild_id, self.data['yt_id'])
+        if previous_id and previous_id != self.data['yt_id']:
+            await interaction.client.ytnoti.remove_channel(interaction.guild_id, previous_id)
 
         view = await YoutubeItemView(interaction.guild, self.selected_id)
         await interaction.response.edit_message(embed=view.embed, view=view)
 
     @nextcord.ui.button(label='Delete', style=nextcord.ButtonStyle.red, row=1, disabled=True)
-    async def delete(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
+    async def delete(self, button: nextcord.ui.Button, interaction: nextcord.Interaction[LordBot]):
         gdb = GuildDateBases(interaction.guild_id)
         youtube_data = await gdb.get('youtube_notification')
-        youtube_data.pop(self.selected_id, None)
+        data = youtube_data.pop(self.selected_id, None)
         await gdb.set('youtube_notification', youtube_data)
 
+        if data is not None:
+            await interaction.client.ytnoti.remove_channel(interaction.guild_id, data['yt_id'])
+
     @nextcord.ui.button(label='Preview message', style=nextcord.ButtonStyle.success, row=2)
     async def view_message(self, button: nextcord.ui.Button, interaction: nextcord.Interaction):
         message = self.data.get('message', DEFAULT_YOUTUBE_MESSAGE)
@@ -5,7 +5,7 @@ import orjson
 from bot.databases.handlers.guildHD import GuildDateBases
 from bot.databases.varstructs import TicketsPayload
 from bot.languages import i18n
-from bot.misc.utils import AsyncSterilization, generate_message, get_payload, lord_format
+from bot.misc.utils import AsyncSterilization, render_message, get_payload
 from bot.resources.ether import Emoji
 from bot.resources.info import DEFAULT_TICKET_PAYLOAD, DEFAULT_TICKET_PAYLOAD_RU
 from .base import OptionItem, ViewOptionItem
@@ -147,7 +147,7 @@ class TicketMessagesView(ViewOptionItem):
         message_data = messages.get(self.selected_value)
         if message_data is not None and len(message_data) > 0:
             payload = get_payload(member=interaction.user)
-            message = generate_message(lord_format(message_data, payload))
+            message = render_message(message_data, payload)
         else:
             message = {'content': i18n.t(
                 locale, 'settings.tickets.messages.error.null')}
@@ -2,7 +2,7 @@ import nextcord
 from bot.databases import GuildDateBases
 from bot.databases.varstructs import CategoryPayload, TicketsButtonsPayload, TicketsItemPayload, TicketsPayload, FaqItemPayload
 from bot.languages import i18n
-from bot.misc.utils import AsyncSterilization, generate_message, lord_format, get_payload
+from bot.misc.utils import AsyncSterilization, render_message, get_payload
 from typing import List, Optional
 from bot.resources.info import DEFAULT_TICKET_FAQ_TYPE
 
@@ -37,8 +37,8 @@ class FAQDropDown(nextcord.ui.StringSelect):
         items = tickets.get(interaction.message.id).get('faq').get('items')
         response = items[int(self.values[0])]
         
-        data = generate_message(lord_format(
-            response['response'], get_payload(member=interaction.user)))
+        data = render_message(
+            response['response'], get_payload(member=interaction.user))
         await interaction.response.send_message(**data, ephemeral=True)
 
 
@@ -52,8 +52,8 @@ class FAQTempDropDown(FAQDropDown.cls):
 
     async def callback(self, interaction: nextcord.Interaction) -> None:
         response = self.faq_items[int(self.values[0])]
-        data = generate_message(lord_format(
-            response['response'], get_payload(member=interaction.user)))
+        data = render_message(
+            response['response'], get_payload(member=interaction.user))
         await interaction.response.send_message(**data, ephemeral=True)
 
 
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+if True:
+    from bot.databases.handlers.commandHD import EMPTY_PLAN, CommandPlan, CommandPlanCache
+
+
+class TestCommandPlan(unittest.TestCase):
+
+    def test_empty(self):
+        self.assertIs(CommandPlan.compile({}), EMPTY_PLAN)
+        self.assertTrue(EMPTY_PLAN.operate)
+        self.assertIsNone(EMPTY_PLAN.failed_rule([1], 2, None))
+
+    def test_disabled(self):
+        self.assertFalse(CommandPlan.compile({'operate': 0}).operate)
+
+    def test_roles(self):
+        plan = CommandPlan.compile({'distribution': {
+            'allow-role': [1, 2],
+            'deny-role': [3],
+        }})
+        self.assertIsNone(plan.failed_rule([2], 10, None))
+        self.assertEqual(plan.failed_rule([4], 10, None), 'allow-role')
+        self.assertEqual(plan.failed_rule([1, 3], 10, None), 'deny-role')
+
+    def test_channels(self):
+        plan = CommandPlan.compile({'distribution': {
+            'allow-channel': {'channels': [10], 'categories': [20]},
+            'deny-channel': {'channels': [11], 'categories': []},
+        }})
+        self.assertIsNone(plan.failed_rule([], 10, None))
+        self.assertIsNone(plan.failed_rule([], 12, 20))
+        self.assertEqual(plan.failed_rule([], 12, 21), 'allow-channel')
+
+        plan = CommandPlan.compile({'distribution': {
+            'deny-channel': {'channels': [11], 'categories': [20]}}})
+        self.assertEqual(plan.failed_rule([], 12, 20), 'deny-channel')
+
+    def test_cooldown_is_kept_apart(self):
+        cooldown = {'type': 0, 'rate': 1, 'per': 5}
+        plan = CommandPlan.compile({'distribution': {'cooldown': cooldown}})
+        self.assertEqual(plan.rules, ())
+        self.assertEqual(plan.cooldown, cooldown)
+
+    def test_cache(self):
+        cache = CommandPlanCache(maxsize=1)
+        self.assertIsNone(cache.get(1))
+        plans = cache.put(1, {'ping': {'operate': 0}})
+        self.assertFalse(plans['ping'].operate)
+        self.assertIs(cache.get(1), plans)
+        cache.put(2, {})
+        self.assertIsNone(cache.get(1))
+        cache.invalidate(2)
+        self.assertEqual(cache.stats()['guilds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,15 @@
 import os
 import sys
 import unittest
+from unittest import mock
 import orjson
 from nextcord import Embed
 
 sys.path.append(os.getcwd())
 
 if True:
-    from bot.misc.utils.messages import GeneratorMessage, generate_message, GenerateMessageError
+    from bot.misc.utils.messages import (GeneratorMessage, generate_message, render_message,
+                                         GenerateMessageError, skeleton_cache)
 
 
 class TestGeneratorMessage(unittest.TestCase):
@@ -148,6 +150,71 @@ class TestGeneratorMessage(unittest.TestCase):
         self.assertEqual(result['embeds'][0].title, "First Embed")
         self.assertEqual(result['embeds'][1].title, "Second Embed")
 
+    def test_cached_skeleton_is_cloned(self):
+        data = orjson.dumps({
+            "title": "Cached",
+            "fields": [{"name": "a", "value": "b"}],
+            "footer": {"text": "footer"}
+        }).decode()
+        first = generate_message(data)
+        first['embeds'][0].title = "Changed"
+        first['embeds'][0].add_field(name="c", value="d")
+        first['embeds'][0].set_footer(text="changed")
+
+        hits = skeleton_cache.hits
+        second = generate_message(data)
+        self.assertEqual(skeleton_cache.hits, hits + 1)
+        self.assertEqual(second['embeds'][0].title, "Cached")
+        self.assertEqual(len(second['embeds'][0].fields), 1)
+        self.assertEqual(second['embeds'][0].footer.text, "footer")
+
+    def test_cached_error(self):
+        data = orjson.dumps({"content": "a", "plainText": "b"}).decode()
+        for _ in range(2):
+            with self.assertRaises(GenerateMessageError):
+                generate_message(data)
+
+    def test_render_template_parsed_once(self):
+        template = orjson.dumps({
+            "content": "Hi {member.mention}",
+            "title": "Welcome, {member.name}!",
+            "fields": [{"name": "Name", "value": "{member.name}"}]
+        }).decode()
+        with mock.patch.object(GeneratorMessage, 'parse_skeleton', autospec=True,
+                               side_effect=GeneratorMessage.parse_skeleton) as parse:
+            first = render_message(template, {'member.name': 'Alice "A"',
+                                              'member.mention': '<@1>'})
+            second = render_message(template, {'member.name': 'Bob',
+                                               'member.mention': '<@2>'})
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(first['content'], "Hi <@1>")
+        self.assertEqual(first['embeds'][0].title, 'Welcome, Alice "A"!')
+        self.assertEqual(second['content'], "Hi <@2>")
+        self.assertEqual(second['embeds'][0].title, "Welcome, Bob!")
+        self.assertEqual(second['embeds'][0].fields[0].value, "Bob")
+
+    def test_render_plain_text_template(self):
+        result = render_message("Bye, {member.name}", {'member.name': 'Alice'})
+        self.assertEqual(result['content'], "Bye, Alice")
+        self.assertEqual(result['embeds'], [])
+
+        result = render_message("{member.name?&quote}", {'member.name': 'A "B"'})
+        self.assertEqual(result['content'], 'A \\"B\\"')
+
+    def test_render_drops_empty_image(self):
+        template = orjson.dumps({
+            "title": "{guild.name}",
+            "image": {"url": "{guild.icon}"},
+            "author": {"name": "{guild.name}", "icon_url": "{guild.icon}"}
+        }).decode()
+        embed = render_message(template, {'guild.name': 'G', 'guild.icon': None})['embeds'][0]
+        self.assertIsNone(embed.image.url)
+        self.assertEqual(embed.author.name, 'G')
+        self.assertNotIn('icon_url', embed.to_dict()['author'])
+
+        embed = render_message(template, {'guild.name': 'G', 'guild.icon': 'https://i/a.png'})['embeds'][0]
+        self.assertEqual(embed.image.url, 'https://i/a.png')
+
 
 if __name__ == '__main__':
     unittest.main()
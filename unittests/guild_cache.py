@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+if True:
+    from bot.databases.misc.guild_cache import GuildSettingsCache, MISSING
+
+
+class TestGuildSettingsCache(unittest.TestCase):
+
+    def test_miss_and_hit(self):
+        cache = GuildSettingsCache()
+        self.assertIs(cache.get(1, 'prefix'), MISSING)
+        cache.put(1, 'prefix', 'l.')
+        self.assertEqual(cache.get(1, 'prefix'), 'l.')
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_mutable_values_are_copied(self):
+        cache = GuildSettingsCache()
+        cache.put(1, 'reactions', {1: ['a']})
+        data = cache.get(1, 'reactions')
+        data[1].append('b')
+        self.assertEqual(cache.get(1, 'reactions'), {1: ['a']})
+
+    def test_lru_eviction(self):
+        cache = GuildSettingsCache(maxsize=2)
+        cache.put(1, 'prefix', 'a')
+        cache.put(2, 'prefix', 'b')
+        cache.get(1, 'prefix')
+        cache.put(3, 'prefix', 'c')
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiration(self):
+        cache = GuildSettingsCache(ttl=-1)
+        cache.put(1, 'prefix', 'a')
+        self.assertIs(cache.get(1, 'prefix'), MISSING)
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_peek(self):
+        cache = GuildSettingsCache()
+        cache.put(1, 'reactions', {1: ['a']})
+        cache.peek(1, 'reactions')[1].append('b')
+        self.assertEqual(cache.peek(1, 'reactions'), {1: ['a']})
+        self.assertEqual(cache.stats()['hits'], 0)
+
+    def test_peek_item(self):
+        cache = GuildSettingsCache()
+        self.assertIs(cache.peek_item(1, 'giveaways', 5), MISSING)
+        cache.put(1, 'giveaways', {5: {'prize': 'a'}})
+        cache.peek_item(1, 'giveaways', 5)['prize'] = 'b'
+        self.assertEqual(cache.peek_item(1, 'giveaways', 5), {'prize': 'a'})
+        self.assertIsNone(cache.peek_item(1, 'giveaways', 6))
+
+        expired = GuildSettingsCache(ttl=-1)
+        expired.put(1, 'prefix', 'a')
+        self.assertIsNone(expired.peek(1, 'prefix'))
+
+    def test_invalidate(self):
+        cache = GuildSettingsCache()
+        cache.put_many(1, {'prefix': 'a', 'color': 1})
+        cache.invalidate(1, ['prefix'])
+        self.assertFalse(cache.has(1, 'prefix'))
+        self.assertTrue(cache.has(1, 'color'))
+        cache.invalidate(1)
+        self.assertNotIn(1, cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+if True:
+    from bot.databases.misc import rank_index
+    from bot.databases.misc.rank_index import RankIndex, RankIndexCache
+
+
+class TestRankIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RankIndex([(1, 100, 0), (2, 50, 100), (3, 0, 0), (4, 10, 40)])
+
+    def test_ranks(self):
+        self.assertEqual(self.index.rank(2), 1)
+        self.assertEqual(self.index.rank(1), 2)
+        self.assertEqual(self.index.rank(4), 3)
+        self.assertIsNone(self.index.rank(3))
+        self.assertEqual(len(self.index), 3)
+
+    def test_ties_are_ordered_by_member_id(self):
+        self.index.update(5, 100, 0)
+        self.assertEqual(self.index.rank(1), 2)
+        self.assertEqual(self.index.rank(5), 3)
+
+    def test_update_moves_member(self):
+        self.index.update(4, 500, 0)
+        self.assertEqual(self.index.rank(4), 1)
+        self.index.remove(2)
+        self.assertIsNone(self.index.rank(2))
+        self.assertEqual(self.index.page(0, 10), [(4, 500, 0, 500), (1, 100, 0, 100)])
+
+    def test_page(self):
+        self.assertEqual(self.index.page(1, 1), [(1, 100, 0, 100)])
+        self.assertEqual(self.index.page(3, 2), [])
+
+
+class TestRankIndexCache(unittest.TestCase):
+
+    def test_loads_once_and_updates_in_place(self):
+        loads = []
+
+        async def loader(guild_id):
+            loads.append(guild_id)
+            return [(1, 10, 0)]
+
+        async def main():
+            cache = RankIndexCache(loader)
+            first = await cache.get(1)
+            cache.update(1, 2, 20, 0)
+            second = await cache.get(1)
+            self.assertIs(first, second)
+            self.assertEqual(second.rank(2), 1)
+
+            cache.invalidate(1)
+            await cache.get(1)
+            self.assertEqual(loads, [1, 1])
+
+        asyncio.run(main())
+
+    def test_departed_members_are_not_ranked(self):
+        async def loader(guild_id):
+            return [(1, 10, 0), (2, 20, 0), (3, 30, 0)]
+
+        async def main():
+            cache = RankIndexCache(loader)
+            index = await cache.get(1)
+            self.assertEqual(index.rank(2), 2)
+            self.assertEqual(index.page(0, 10)[0], (3, 30, 0, 30))
+
+            rank_index.remove_member(1, 3)
+            self.assertIsNone(index.rank(3))
+            self.assertEqual(index.rank(2), 1)
+
+            cache.update(1, 4, 50, 0)
+            self.assertNotIn(4, index)
+
+        rank_index.set_member_filter(lambda guild_id, member_id: member_id != 4)
+        try:
+            asyncio.run(main())
+        finally:
+            rank_index.set_member_filter(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
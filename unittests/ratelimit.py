@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+if True:
+    from bot.misc.ratelimit import MemoryCooldownStore
+
+
+class TestMemoryCooldownStore(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.store = MemoryCooldownStore(maxsize=2, clock=lambda: self.now)
+
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_bucket(self):
+        store = self.store
+        for _ in range(2):
+            self.assertIsNone(self.run_async(store.retry_after('cmd:1', 2, 10)))
+            self.run_async(store.hit('cmd:1', 2, 10))
+        self.assertEqual(self.run_async(store.retry_after('cmd:1', 2, 10)), 5)
+
+        self.now += 5
+        self.assertIsNone(self.run_async(store.retry_after('cmd:1', 2, 10)))
+
+    def test_refund(self):
+        store = self.store
+        self.run_async(store.hit('cmd:1', 1, 10))
+        self.assertEqual(self.run_async(store.retry_after('cmd:1', 1, 10)), 10)
+        self.run_async(store.refund('cmd:1', 1, 10))
+        self.assertIsNone(self.run_async(store.retry_after('cmd:1', 1, 10)))
+        self.assertEqual(store.stats()['size'], 0)
+
+    def test_expiry_and_size(self):
+        store = self.store
+        self.run_async(store.hit('cmd:1', 1, 10))
+        self.run_async(store.hit('cmd:2', 1, 20))
+        self.now += 15
+        self.assertEqual(store.sweep(), 1)
+
+        self.run_async(store.hit('cmd:3', 1, 10))
+        self.run_async(store.hit('cmd:4', 1, 10))
+        self.assertEqual(store.stats()['size'], 2)
+        self.assertEqual(store.stats()['evictions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
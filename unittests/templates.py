@@ -140,5 +140,18 @@ class TestLordTemplate(unittest.TestCase):
         self.log_result(result, "{\"name\": \"Guest\"}")
         self.assertEqual(result, "{\"name\": \"Guest\"}")  # Ожидаем, что строка не изменится
 
+    def test_structured_template(self):
+        """Тест рендеринга dict-шаблона без JSON"""
+        from bot.misc.utils.templates import lord_format
+        template = {"content": "{% vip => VIP || %}{name?&quote}",
+                    "embeds": [{"title": "{name?&upper}", "color": 5}]}
+        data = {"name": 'alice "the best"', "vip": True}
+        result = lord_format(template, data)
+        expected = {"content": 'VIPalice "the best"',
+                    "embeds": [{"title": 'ALICE "THE BEST"', "color": 5}]}
+        self.log_result(result, expected)
+        self.assertEqual(result, expected)
+        self.assertEqual(template["embeds"][0]["title"], "{name?&upper}")
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)